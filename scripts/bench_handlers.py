@@ -0,0 +1,168 @@
+"""
+Benchmark por marca de los handlers sobre fixtures grabadas (sin Firecrawl ni API key).
+
+Para cada fixture corre los handle_<marca> que declara la marca, extract_image_urls_from_html
+y la extracción local de ModelData, y reporta por marca y etapa la latencia (mediana y p95 por
+página) y el pico de memoria (tracemalloc). Compara contra un baseline guardado y marca las
+regresiones; termina con código 1 si hay alguna.
+
+Uso:
+    python scripts/bench_handlers.py [carpeta_fixtures] [repeticiones] [--save-baseline] [--network]
+    python scripts/bench_handlers.py record <urls.txt> [carpeta_fixtures] [sitio]
+
+- record graba las fixtures con Firecrawl (requiere FIRECRAWL_API_KEY), una por URL.
+- --save-baseline guarda los resultados como nuevo baseline (<carpeta_fixtures>/bench_baseline.json).
+- --network suma a la etapa images el complete_images de la marca (HEAD de vento y auteco_tvs);
+  por defecto solo se miden los handlers, que no usan la red.
+"""
+
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.scraper.fixtures import FIXTURES_DIR, iter_fixtures, record_urls  # noqa: E402
+from src.core.scraper.registry import get_brand, get_handler_hook, run_handler  # noqa: E402
+from src.core.scraper.structured_data import extract_model_fields  # noqa: E402
+from src.core.scraper.utils import extract_image_urls_from_html  # noqa: E402
+
+# Una etapa es regresión si empeora más que la tolerancia y más que el piso de ruido
+TOLERANCE = 0.2
+MIN_DELTA_MS = 0.5
+MIN_DELTA_KB = 64
+
+
+def targets_for(record: dict, network: bool) -> dict:
+    """ Etapa -> función sin argumentos que procesa la fixture """
+    brand, url, doc = record["brand"], record["url"], record["document"]
+    html = getattr(doc, "html", None)
+    targets = {}
+    for handle_type in (get_brand(brand) or {}).get("scrape", {}):
+        targets[handle_type] = lambda handle_type=handle_type: run_handler(brand, handle_type, url, doc)
+    complete = get_handler_hook(brand, "complete_images") if network else None
+    if complete is not None and "images" in targets:
+        targets["images"] = lambda: complete(run_handler(brand, "images", url, doc), doc)
+    if html:
+        targets["image_urls"] = lambda: extract_image_urls_from_html(html, base_url=url)
+        targets["model_data"] = lambda: extract_model_fields(html, brand)
+    return targets
+
+
+def measure(func, repeat: int) -> tuple[float | None, int | None, str | None]:
+    """ Mejor tiempo (ms) de varias repeticiones y pico de memoria (KB) de una corrida aparte """
+    best = float("inf")
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    except Exception as exc:
+        return None, None, f"{type(exc).__name__}: {exc}"
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return best * 1000, peak // 1024, None
+
+
+def run_bench(fixtures_dir: Path, repeat: int, network: bool) -> dict:
+    """ {marca: {etapa: {pages, median_ms, p95_ms, total_ms, peak_kb, errors}}} """
+    samples = {}
+    for record in iter_fixtures(fixtures_dir):
+        for stage, func in targets_for(record, network).items():
+            elapsed, peak, error = measure(func, repeat)
+            entry = samples.setdefault(record["brand"], {}).setdefault(stage, {"ms": [], "peak_kb": [], "errors": []})
+            if error is not None:
+                entry["errors"].append(f"{record['url']}: {error}")
+                continue
+            entry["ms"].append(elapsed)
+            entry["peak_kb"].append(peak)
+
+    results = {}
+    for brand, stages in samples.items():
+        for stage, entry in stages.items():
+            times = sorted(entry["ms"])
+            results.setdefault(brand, {})[stage] = {
+                "pages": len(times),
+                "median_ms": round(statistics.median(times), 3) if times else None,
+                "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3) if times else None,
+                "total_ms": round(sum(times), 3),
+                "peak_kb": max(entry["peak_kb"]) if entry["peak_kb"] else None,
+                "errors": entry["errors"],
+            }
+    return results
+
+
+def regressions(results: dict, baseline: dict) -> list[str]:
+    found = []
+    for brand, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(brand, {}).get(stage)
+            if not previous:
+                continue
+            now_ms, base_ms = current["median_ms"], previous.get("median_ms")
+            if now_ms is not None and base_ms and now_ms > base_ms * (1 + TOLERANCE) and now_ms - base_ms > MIN_DELTA_MS:
+                found.append(f"{brand}/{stage}: mediana {base_ms:.2f} -> {now_ms:.2f} ms")
+            now_kb, base_kb = current["peak_kb"], previous.get("peak_kb")
+            if now_kb is not None and base_kb and now_kb > base_kb * (1 + TOLERANCE) and now_kb - base_kb > MIN_DELTA_KB:
+                found.append(f"{brand}/{stage}: memoria {base_kb} -> {now_kb} KB")
+            if len(current["errors"]) > len(previous.get("errors", [])):
+                found.append(f"{brand}/{stage}: errores {len(previous.get('errors', []))} -> {len(current['errors'])}")
+    return found
+
+
+def print_results(results: dict, baseline: dict) -> None:
+    print(f"{'marca':<12} {'etapa':<16} {'págs':>5} {'mediana ms':>11} {'p95 ms':>9} {'pico KB':>8} {'vs base':>8} {'errores':>8}")
+    for brand in sorted(results):
+        for stage, row in sorted(results[brand].items()):
+            base_ms = baseline.get(brand, {}).get(stage, {}).get("median_ms")
+            delta = f"{(row['median_ms'] / base_ms - 1) * 100:+.0f}%" if base_ms and row["median_ms"] is not None else "-"
+            median = f"{row['median_ms']:.2f}" if row["median_ms"] is not None else "-"
+            p95 = f"{row['p95_ms']:.2f}" if row["p95_ms"] is not None else "-"
+            peak = row["peak_kb"] if row["peak_kb"] is not None else "-"
+            print(f"{brand:<12} {stage:<16} {row['pages']:>5} {median:>11} {p95:>9} {peak:>8} {delta:>8} {len(row['errors']):>8}")
+            for error in row["errors"][:3]:
+                print(f"    {error}")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if args and args[0] == "record":
+        urls = [line.strip() for line in Path(args[1]).read_text(encoding="utf-8").splitlines() if line.strip()]
+        fixtures_dir = Path(args[2]) if len(args) > 2 else FIXTURES_DIR
+        paths = record_urls(urls, fixtures_dir, sitio=args[3] if len(args) > 3 else None)
+        print(f"{len(paths)} de {len(urls)} URLs grabadas en {fixtures_dir}")
+        return
+
+    fixtures_dir = Path(args[0]) if args else FIXTURES_DIR
+    repeat = int(args[1]) if len(args) > 1 else 5
+    baseline_path = fixtures_dir / "bench_baseline.json"
+    results = run_bench(fixtures_dir, repeat, network="--network" in sys.argv)
+    if not results:
+        print(f"No hay fixtures en {fixtures_dir}/<marca>/*.json.gz (grabarlas con: record <urls.txt>)")
+        return
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    print_results(results, baseline)
+    if "--save-baseline" in sys.argv:
+        baseline_path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nBaseline guardado en {baseline_path}")
+        return
+
+    found = regressions(results, baseline)
+    if found:
+        print("\nRegresiones contra el baseline:")
+        for line in found:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark de extract_image_urls_from_html.
+
+Compara la extracción en una sola pasada contra la versión anterior de tres regex
+(incluida abajo como referencia) y reporta el throughput en MB/s.
+
+Uso:
+    python scripts/bench_image_urls.py [carpeta_paginas] [repeticiones]
+
+Usa todos los .html bajo <carpeta_paginas> (por defecto src/data/pages). Si no hay,
+genera una página sintética estilo VTEX de ~2 MB.
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config.settings import DATA_DIR  # noqa: E402
+from src.core.scraper.utils import extract_image_urls_from_html, iter_image_urls  # noqa: E402
+
+
+def extract_image_urls_three_regex(html: str) -> list:
+    """ Versión anterior: tres recorridos completos del HTML """
+    urls = []
+    seen = set()
+
+    def add_url(url: str):
+        cleaned = url.strip().strip("\"'")
+        if not cleaned or cleaned.startswith("data:") or cleaned in seen:
+            return
+        seen.add(cleaned)
+        urls.append(cleaned)
+
+    img_src_pattern = re.compile(
+        r"<img[^>]+(?:src|data-src|data-lazy-src|data-original)\s*=\s*['\"]([^'\"]+)['\"]",
+        re.IGNORECASE,
+    )
+    for match in img_src_pattern.findall(html):
+        add_url(match)
+    srcset_pattern = re.compile(r"srcset\s*=\s*['\"]([^'\"]+)['\"]", re.IGNORECASE)
+    for srcset in srcset_pattern.findall(html):
+        for part in srcset.split(","):
+            add_url(part.strip().split(" ")[0])
+    url_pattern = re.compile(r"url\(([^)]+)\)", re.IGNORECASE)
+    for match in url_pattern.findall(html):
+        candidate = match.strip().strip("\"'")
+        if re.search(r"\.(js|css|woff2?|ttf|eot|map)(\?|#|$)", candidate, re.IGNORECASE):
+            continue
+        add_url(candidate)
+    return urls
+
+
+def synthetic_page(target_bytes: int = 2 * 1024 * 1024) -> str:
+    block = (
+        '<div class="vtex-store-components-3-x-productImage" style="background-image:url(/arquivos/ids/{i}/bg.jpg)">'
+        '<img src="https://italikamx.vteximg.com.br/arquivos/ids/{i}-800-auto?width=800&height=auto" '
+        'srcset="/arquivos/ids/{i}-400-auto 400w, /arquivos/ids/{i}-1200-auto 1200w" alt="Moto {i}">'
+        '<span class="vtex-product-price">$ 25,999</span><script>var x{i} = "{i}";</script></div>\n'
+    )
+    parts = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        part = block.format(i=i)
+        parts.append(part)
+        size += len(part)
+        i += 1
+    return "<html><body>" + "".join(parts) + "</body></html>"
+
+
+def throughput(func, html: str, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = len(func(html))
+        best = min(best, time.perf_counter() - start)
+    return len(html.encode("utf-8")) / (1024 * 1024) / best, found
+
+
+def main():
+    pages_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_DIR / "pages"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pages = {page.name: page.read_text(encoding="utf-8", errors="replace") for page in sorted(pages_dir.rglob("*.html"))}
+    if not pages:
+        print(f"No hay páginas en {pages_dir}, se usa una página sintética")
+        pages = {"sintetica-vtex.html": synthetic_page()}
+
+    def streamed(html: str) -> list:
+        chunks = (html[i:i + 64 * 1024] for i in range(0, len(html), 64 * 1024))
+        return list(iter_image_urls(chunks))
+
+    candidates = {
+        "tres regex": extract_image_urls_three_regex,
+        "una pasada": extract_image_urls_from_html,
+        "una pasada (chunks 64KB)": streamed,
+    }
+    for name, html in pages.items():
+        print(f"\n{name}: {len(html) / 1024:.0f} KB")
+        for label, func in candidates.items():
+            mb_per_s, found = throughput(func, html, repeat)
+            print(f"  {label:<26} {mb_per_s:>8.1f} MB/s  {found} URLs")
+
+
+if __name__ == "__main__":
+    main()
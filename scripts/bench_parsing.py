@@ -0,0 +1,76 @@
+"""
+Benchmark del parseo parcial de HTML por marca.
+
+Compara, sobre páginas guardadas, el parseo completo que hacían los handlers
+(BeautifulSoup(html, "html.parser") + find) contra parse_subtree con cada backend disponible.
+
+Uso:
+    python scripts/bench_parsing.py [carpeta_paginas] [repeticiones]
+
+Las páginas se buscan en <carpeta_paginas>/<marca>/*.html (por defecto src/data/pages).
+"""
+
+import importlib
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from src.config.settings import DATA_DIR  # noqa: E402
+from src.core.scraper.parsing import available_backends, parse_subtree  # noqa: E402
+
+# Selector que declara cada handler: (módulo, atributo)
+BRAND_TARGETS = {
+    "honda": ("src.core.scraper.brands.honda.technical_specs.executor", "SPECS_SELECTOR"),
+    "italika": ("src.core.scraper.brands.italika.technical_specs.executor", "SPECS_SELECTOR"),
+    "tvs": ("src.core.scraper.brands.tvs.technical_specs.executor", "SPECS_SELECTOR"),
+    "yamaha": ("src.core.scraper.brands.yamaha.technical_specs.executor", "SPECS_SELECTOR"),
+    "ryder": ("src.core.scraper.brands.ryder.images.executor", "VARIANTS_SELECTOR"),
+    "zmoto": ("src.core.scraper.backends.odoo", "VARIANTS_SELECTOR"),
+}
+
+
+def time_it(func, repeat: int) -> float:
+    """ Devuelve el mejor tiempo (ms) de varias repeticiones """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_brand(brand: str, pages: list[Path], repeat: int) -> None:
+    module_name, attribute = BRAND_TARGETS[brand]
+    selector = getattr(importlib.import_module(module_name), attribute)
+    htmls = [page.read_text(encoding="utf-8", errors="replace") for page in pages]
+    size_kb = sum(len(html) for html in htmls) / 1024
+
+    baseline = time_it(lambda: [BeautifulSoup(html, "html.parser").select(selector) for html in htmls], repeat)
+    print(f"\n{brand}: {len(htmls)} páginas, {size_kb:.0f} KB, selector {selector!r}")
+    print(f"  {'html.parser completo':<24} {baseline:>9.1f} ms")
+    for backend in available_backends():
+        elapsed = time_it(lambda: [parse_subtree(html, selector, backend=backend) for html in htmls], repeat)
+        print(f"  {'subtree ' + backend:<24} {elapsed:>9.1f} ms  x{baseline / elapsed:.1f}")
+
+
+def main():
+    pages_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_DIR / "pages"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(f"Backends disponibles: {available_backends()}")
+    found = False
+    for brand in BRAND_TARGETS:
+        pages = sorted((pages_dir / brand).glob("*.html"))
+        if pages:
+            found = True
+            bench_brand(brand, pages, repeat)
+    if not found:
+        print(f"No se encontraron páginas en {pages_dir}/<marca>/*.html")
+
+
+if __name__ == "__main__":
+    main()
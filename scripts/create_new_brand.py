@@ -2,25 +2,35 @@
 Script para crear la estructura de carpetas y archivos de una nueva marca.
 
 Uso:
-    python scripts/create_new_brand.py <nombre_marca>
+    python scripts/create_new_brand.py <nombre_marca> [dominio] [sitio]
 
 Ejemplo:
-    python scripts/create_new_brand.py suzuki
-    python scripts/create_new_brand.py auteco_victory
+    python scripts/create_new_brand.py suzuki suzukimotos.com.mx
+    python scripts/create_new_brand.py auteco_victory auteco.com.co victory
+
+Si el dominio ya está registrado por otra marca, el sitio es obligatorio: es lo que distingue
+a las marcas que comparten host en resolve_brand.
 """
 
 import os
 import sys
 from pathlib import Path
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
 
 def get_handle_template(brand_name: str) -> str:
     """
     Genera el contenido del archivo handle.py para la marca especificada.
     """
-    return f'''from src.core.scraper.brands.{brand_name}.images.executor import handle_images
+    return f'''import logging
+
+from src.core.scraper.brands.{brand_name}.images.executor import handle_images
 from src.core.scraper.brands.{brand_name}.technical_specs.executor import handle_technical_specs
 
+logger = logging.getLogger(__name__)
+
 
 def handle_{brand_name}(handle_type:str, content: list[str]) -> list:
     """
@@ -28,16 +38,58 @@ def handle_{brand_name}(handle_type:str, content: list[str]) -> list:
     """
 
     if handle_type == "images":
-        print("Tipo de contenido: Images")
+        logger.debug("Tipo de contenido: Images")
         return handle_images(content)
 
     if handle_type == "technical_specs":
-        print("Tipo de contenido: Technical Specs")
+        logger.debug("Tipo de contenido: Technical Specs")
         return handle_technical_specs(content)
 '''
 
 
-def create_brand_structure(brand_name: str) -> None:
+def get_brand_template(brand_name: str, host: str | None = None, sitio: str | None = None) -> str:
+    """
+    Genera el contenido del archivo brand.py: la declaración con la que la marca
+    se registra (dominios y opciones de scrape por tipo de contenido).
+    """
+    hosts = f'["{host}"],' if host else '[],  # TODO: agregar el dominio del sitio, p. ej. "marca.com.mx"'
+    site_url = f'"https://www.{host}/",' if host else 'None,  # TODO: home del sitio para el inventario de URLs'
+    sitio_line = (
+        f'\n    # {host} vende varias marcas: se distingue con el parámetro sitio\n    "sitio": "{sitio}",' if sitio else ""
+    )
+    return f'''BRAND = {{
+    "name": "{brand_name}",
+    "hosts": {hosts}
+    "site_url": {site_url}{sitio_line}
+    # "product_url": r"/p$",  # regex de las URLs de producto para el inventario
+    # "rate_limit": [4, 8],  # peticiones por segundo y ráfaga contra el sitio (por defecto 8 y 16)
+    # Perfil de scrape por tipo de contenido: pedir solo los formatos y el html que lee el handler
+    "scrape": {{
+        "images": {{
+            "formats": ["images"],
+            # "ready": condiciones de listo en lugar de wait_for fijo, p. ej. ["div#specs"] o [{{"images_stable": 3}}]
+            # "exclude_tags": ["header", "footer", "nav"],  # partes de la página que no aportan imágenes del modelo
+        }},
+        "technical_specs": {{
+            "formats": ["html"],
+            # TODO: reemplazar por el selector del contenedor de la ficha que usa el handler, p. ej. ["div#specs"]
+            # "include_tags": ["div#specs"],  # Firecrawl devuelve solo ese elemento en lugar de la página completa
+            # "only_main_content": False,  # con include_tags, para que el filtro de contenido principal no lo quite
+        }},
+    }},
+}}
+'''
+
+
+def registered_brands_for_host(host: str) -> dict[str, str | None]:
+    """ Marcas ya registradas con ese dominio -> su sitio """
+    from src.core.scraper.registry import get_brands
+
+    return {name: brand.get("sitio") for name, brand in get_brands().items()
+            if host in [registered.lower() for registered in brand.get("hosts", [])]}
+
+
+def create_brand_structure(brand_name: str, host: str | None = None, sitio: str | None = None) -> None:
     """
     Crea la estructura de carpetas y archivos para una nueva marca.
     """
@@ -80,17 +132,24 @@ def create_brand_structure(brand_name: str) -> None:
     handle_path.write_text(handle_content, encoding="utf-8")
     print(f"Archivo creado: {handle_path}")
 
+    # Crear brand.py con la declaración para el registro de marcas
+    brand_declaration_path = brand_path / "brand.py"
+    brand_declaration_path.write_text(get_brand_template(brand_name, host, sitio), encoding="utf-8")
+    print(f"Archivo creado: {brand_declaration_path}")
+
     print(f"\n✓ Estructura de marca '{brand_name}' creada exitosamente.")
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("Uso: python scripts/create_new_brand.py <nombre_marca>")
-        print("Ejemplo: python scripts/create_new_brand.py suzuki")
-        print("Ejemplo: python scripts/create_new_brand.py auteco_victory")
+    if len(sys.argv) not in (2, 3, 4):
+        print("Uso: python scripts/create_new_brand.py <nombre_marca> [dominio] [sitio]")
+        print("Ejemplo: python scripts/create_new_brand.py suzuki suzukimotos.com.mx")
+        print("Ejemplo: python scripts/create_new_brand.py auteco_victory auteco.com.co victory")
         sys.exit(1)
 
     brand_name = sys.argv[1].lower().strip()
+    host = sys.argv[2].lower().strip() if len(sys.argv) >= 3 else None
+    sitio = sys.argv[3].lower().strip() if len(sys.argv) == 4 else None
 
     # Validación básica del nombre: permite letras, números y guiones bajos
     # Debe empezar con una letra
@@ -103,7 +162,21 @@ def main():
         print("Error: El nombre de la marca solo puede contener letras, números y guiones bajos (_).")
         sys.exit(1)
 
-    create_brand_structure(brand_name)
+    if sitio and not host:
+        print("Error: El sitio solo aplica junto con un dominio.")
+        sys.exit(1)
+
+    # Un dominio compartido sin sitio haría que la marca nueva y las existentes se confundan
+    registered = registered_brands_for_host(host) if host else {}
+    if registered and not sitio:
+        print(f"Error: {host} ya está registrado por {', '.join(sorted(registered))}; "
+              "indique el sitio de la marca nueva como tercer argumento.")
+        sys.exit(1)
+    if sitio and sitio in registered.values():
+        print(f"Error: El sitio '{sitio}' ya lo usa otra marca de {host}.")
+        sys.exit(1)
+
+    create_brand_structure(brand_name, host, sitio)
 
 
 if __name__ == "__main__":
@@ -2,3 +2,5 @@ from pathlib import Path
 
 CURRENT_FILE = Path(__file__).resolve()
 SRC_DIR = CURRENT_FILE.parents[1]
+DATA_DIR = SRC_DIR / "data"
+CACHE_DIR = DATA_DIR / "cache"
@@ -0,0 +1,211 @@
+"""
+Corre el scraper sobre una lista de URLs sin el notebook.
+
+Uso:
+    python -m src.core.scraper run urls.txt --what images,specs,model --jobs 16 --out resultados.jsonl
+    python -m src.core.scraper render ../src/data/images --out ../src/data/renditions --workers 4
+
+- urls.txt: una URL por línea; opcionalmente un sitio separado por espacio (auteco). Las líneas
+  vacías o que empiezan con # se ignoran. Sin sitio, se infiere de la URL.
+- Cada resultado se agrega a --out como una línea JSON apenas termina.
+- Con --parsers N el parseo de los handlers corre en N procesos (ScrapePipeline) en lugar de
+  compartir los hilos del scrape.
+- El checkpoint (--checkpoint, por defecto <out>.checkpoint) guarda las URLs terminadas sin
+  errores: al relanzar el mismo comando se saltan y se reintentan solo las que fallaron o faltaron.
+  Si una URL aparece varias veces en --out, vale la última línea.
+- render genera las renditions (tamaños y formatos) de las imágenes descargadas; solo codifica
+  las imágenes cuyo contenido no tiene renditions todavía (requiere Pillow).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+
+from src.core.scraper.instrumentation import configure_logging, get_metrics
+from src.core.scraper.processor import WANT_TO_ARTIFACT, ImagesProcessor
+
+logger = logging.getLogger("src.core.scraper.cli")
+
+
+def read_urls(path: Path) -> list[tuple[str, str | None]]:
+    """ [(url, sitio)] sin repetir, en el orden del archivo """
+    entries = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        entries.setdefault(parts[0], parts[1] if len(parts) > 1 else None)
+    return list(entries.items())
+
+
+def read_checkpoint(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    return {line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()}
+
+
+def result_to_json(result: dict) -> dict:
+    """ ModelData y SpecRecord a tipos JSON """
+    serialized = {}
+    for key, value in result.items():
+        if hasattr(value, "model_dump"):
+            value = value.model_dump()
+        elif isinstance(value, list):
+            value = [item._asdict() if hasattr(item, "_asdict") else item for item in value]
+        serialized[key] = value
+    return serialized
+
+
+class RunWriter:
+    """ Escribe resultados y checkpoint con flush por línea: un corte no pierde lo ya terminado """
+
+    def __init__(self, out_path: Path, checkpoint_path: Path):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        self.out = out_path.open("a", encoding="utf-8")
+        self.checkpoint = checkpoint_path.open("a", encoding="utf-8")
+        self.counts = {"ok": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def write(self, result: dict) -> None:
+        failed = bool(result.get("errors")) or result.get("website") is None
+        with self._lock:
+            self.out.write(json.dumps(result_to_json(result), ensure_ascii=False, default=str) + "\n")
+            self.out.flush()
+            if not failed:
+                self.checkpoint.write(result["url"] + "\n")
+                self.checkpoint.flush()
+            self.counts["errors" if failed else "ok"] += 1
+
+    def close(self) -> None:
+        self.out.close()
+        self.checkpoint.close()
+
+
+async def run_urls(processor: ImagesProcessor, entries: list, want: set, jobs: int, per_domain: int, writer: RunWriter) -> None:
+    # process_many recibe un solo sitio: las URLs se agrupan por el sitio explícito de su línea
+    by_sitio = {}
+    for url, sitio in entries:
+        by_sitio.setdefault(sitio, []).append(url)
+    total = len(entries)
+    for sitio, urls in by_sitio.items():
+        async for result in processor.process_many(urls, want, concurrency=jobs, per_domain=per_domain, sitio=sitio):
+            writer.write(result)
+            done = writer.counts["ok"] + writer.counts["errors"]
+            logger.info("[%d/%d] %s", done, total, result["url"],
+                        extra={"brand": result.get("website"), "url": result["url"], "errors": result.get("errors") or None})
+
+
+async def run_pipeline(processor: ImagesProcessor, entries: list, want: set, args: argparse.Namespace, writer: RunWriter) -> None:
+    from src.core.scraper.pipeline import ScrapePipeline
+
+    by_sitio = {}
+    for url, sitio in entries:
+        by_sitio.setdefault(sitio, []).append(url)
+    pipeline = ScrapePipeline(processor, fetchers=args.jobs, per_domain=args.per_domain, parsers=args.parsers)
+    for sitio, urls in by_sitio.items():
+        await pipeline.run(urls, want, sink=writer.write, sitio=sitio)
+    logger.info("Pipeline: %s", pipeline.counts)
+
+
+def command_run(args: argparse.Namespace) -> int:
+    want = {name.strip() for name in args.what.split(",") if name.strip()}
+    unknown = want - set(WANT_TO_ARTIFACT)
+    if unknown:
+        logger.error("Tipos de contenido no soportados: %s (opciones: %s)", sorted(unknown), ", ".join(WANT_TO_ARTIFACT))
+        return 2
+
+    out_path = Path(args.out)
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else out_path.with_name(out_path.name + ".checkpoint")
+    entries = read_urls(Path(args.urls))
+    if args.sitio:
+        entries = [(url, sitio or args.sitio) for url, sitio in entries]
+    done = read_checkpoint(checkpoint_path)
+    pending = [(url, sitio) for url, sitio in entries if url not in done]
+    logger.info("%d URLs, %d ya terminadas, %d pendientes", len(entries), len(entries) - len(pending), len(pending))
+    if not pending:
+        return 0
+
+    writer = RunWriter(out_path, checkpoint_path)
+    try:
+        if args.parsers:
+            asyncio.run(run_pipeline(ImagesProcessor(), pending, want, args, writer))
+        else:
+            asyncio.run(run_urls(ImagesProcessor(), pending, want, args.jobs, args.per_domain, writer))
+    except KeyboardInterrupt:
+        logger.warning("Interrumpido: relanzar el mismo comando retoma desde el checkpoint")
+        return 130
+    except OSError as exc:
+        # p. ej. disco lleno al escribir --out: lo ya escrito queda en el checkpoint
+        logger.error("Corrida cortada: %s (relanzar el mismo comando retoma desde el checkpoint)", exc)
+        return 1
+    finally:
+        writer.close()
+        if args.metrics:
+            get_metrics().export(args.metrics)
+    get_metrics().log_payload_by_brand()
+    logger.info("Terminado: %d sin errores, %d con errores (se reintentan al relanzar)", writer.counts["ok"], writer.counts["errors"])
+    return 0 if writer.counts["errors"] == 0 else 1
+
+
+def command_render(args: argparse.Namespace) -> int:
+    from src.core.scraper.renditions import DEFAULT_RENDITIONS, ImageRenditions, parse_renditions
+
+    try:
+        renditions = parse_renditions(args.sizes) if args.sizes else DEFAULT_RENDITIONS
+        report = ImageRenditions(args.out, renditions, workers=args.workers).render_all(args.sources, brand=args.brand)
+    except (RuntimeError, ValueError) as exc:
+        logger.error("%s", exc)
+        return 2
+    finally:
+        if args.metrics:
+            get_metrics().export(args.metrics)
+    saved = report["bytes_saved"] / report["source_bytes"] * 100 if report["source_bytes"] else 0
+    logger.info("%d imágenes: %d generadas, %d sin cambios, %d con error. %d -> %d bytes (%.0f%% menos)",
+                report["images"], report["rendered"], report["cached"], report["failed"], report["source_bytes"],
+                report["source_bytes"] - report["bytes_saved"], saved)
+    return 0 if report["failed"] == 0 else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.core.scraper", description="Scraper de fichas de motocicletas")
+    parser.add_argument("--log-level", default="INFO")
+    parser.add_argument("--log-json", action="store_true", help="logs como JSON lines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="procesa una lista de URLs con checkpoint")
+    run.add_argument("urls", help="archivo con una URL por línea (opcionalmente seguida del sitio)")
+    run.add_argument("--what", default=",".join(WANT_TO_ARTIFACT), help="images,specs,model (por defecto los tres)")
+    run.add_argument("--jobs", type=int, default=16, help="URLs en vuelo a la vez")
+    run.add_argument("--per-domain", type=int, default=4, help="URLs en vuelo por dominio")
+    run.add_argument("--out", default="resultados.jsonl", help="archivo JSONL de resultados (se agrega al final)")
+    run.add_argument("--checkpoint", help="archivo de URLs terminadas (por defecto <out>.checkpoint)")
+    run.add_argument("--parsers", type=int, help="procesos para el parseo (pipeline por etapas); sin esto se parsea en los hilos")
+    run.add_argument("--sitio", help="sitio para las líneas que no lo indican (auteco: tvs, victory, ceronte)")
+    run.add_argument("--metrics", help="carpeta donde exportar las métricas (.jsonl y .prom) al terminar")
+    run.set_defaults(func=command_run)
+
+    render = commands.add_parser("render", help="genera las renditions de imágenes descargadas")
+    render.add_argument("sources", nargs="+", help="archivos o carpetas con las imágenes descargadas")
+    render.add_argument("--out", default="renditions", help="carpeta de salida (una subcarpeta por sha256 de la fuente)")
+    render.add_argument("--sizes", help="nombre:lado[:formato[:calidad]] separados por coma (por defecto large, medium y thumb en webp)")
+    render.add_argument("--workers", type=int, help="procesos para decodificar y codificar (por defecto uno por núcleo)")
+    render.add_argument("--brand", help="marca para las métricas")
+    render.add_argument("--metrics", help="carpeta donde exportar las métricas (.jsonl y .prom) al terminar")
+    render.set_defaults(func=command_render)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level.upper(), structured=args.log_json)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
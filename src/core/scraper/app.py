@@ -1,24 +1,131 @@
-import os
-from firecrawl import Firecrawl
+import time
+
+from src.core.scraper.cache import ScrapeCache, make_cache_key
+from src.core.scraper.instrumentation import Metrics, credits_used, get_metrics, payload_bytes
+from src.core.scraper.transport import CircuitOpenError, call_with_retries, firecrawl_host, get_firecrawl, is_timeout
 from src.core.scraper.utils import get_urls_from_firecrawl_map
+from src.core.scraper.waits import DEFAULT_WAIT_FOR, WaitTuner, get_wait_tuner, readiness_actions
 
 class ScrapingUtils:
-    def __init__(self):
-        self.api_key = os.getenv("FIRECRAWL_API_KEY")
-        self.firecrawl = Firecrawl(api_key=self.api_key)
-
-    def get_content_from_website(self, url: str, formats: list | None = None, **scrape_kwargs):
-        """ Trae contenido de la web según el formato dado """
-        wait_for = scrape_kwargs.pop("wait_for", 1200)
-        doc = self.firecrawl.scrape(
-            url=url,
-            formats=formats,
-            wait_for=wait_for,
-            **scrape_kwargs,
-        )
+    def __init__(
+        self,
+        cache: ScrapeCache | None = None,
+        use_cache: bool = True,
+        wait_tuner: WaitTuner | None = None,
+        metrics: Metrics | None = None,
+    ):
+        # Un solo cliente de Firecrawl por proceso, aunque se creen varios ScrapingUtils
+        self.firecrawl = get_firecrawl()
+        self.cache = (cache or ScrapeCache()) if use_cache else None
+        self.wait_tuner = wait_tuner or get_wait_tuner()
+        self.metrics = metrics or get_metrics()
+
+    def _scrape_options(self, brand: str | None, scrape_kwargs: dict) -> tuple[dict, dict]:
+        """
+        Prepara las opciones de una petición.
+        - Con condiciones de listo ("ready") se agregan como acciones de espera y no hay wait_for fijo.
+        - Sin ellas se mantiene wait_for (1200 ms por defecto).
+        El timeout sale del histograma de latencia de la marca; no forma parte de la llave de cache.
+        Returns:
+            key_kwargs: opciones que identifican el contenido (llave de cache)
+            call_kwargs: opciones que se envían a Firecrawl
+        """
+        scrape_kwargs = dict(scrape_kwargs)
+        ready = scrape_kwargs.pop("ready", None)
+        if ready:
+            scrape_kwargs.setdefault("wait_for", None)
+            scrape_kwargs["actions"] = list(scrape_kwargs.get("actions") or []) + readiness_actions(ready)
+        else:
+            scrape_kwargs.setdefault("wait_for", DEFAULT_WAIT_FOR)
+        key_kwargs = {key: value for key, value in scrape_kwargs.items() if value is not None}
+        call_kwargs = dict(key_kwargs)
+        call_kwargs.setdefault("timeout", self.wait_tuner.timeout_for(brand))
+        key_kwargs.pop("timeout", None)
+        return key_kwargs, call_kwargs
+
+    def _scrape(self, url: str, formats: list | None, brand: str | None, call_kwargs: dict):
+        """
+        Llama a Firecrawl y registra la latencia observada (o el timeout, si venció) en el tuner,
+        y latencia, bytes por formato y créditos en las métricas (etapa llm si pide el formato json).
+        Los errores transitorios se reintentan; si la marca tiene el circuito abierto falla sin pedir nada.
+        """
+        stage = "llm" if any(isinstance(fmt, dict) and fmt.get("type") == "json" for fmt in formats or []) else "scrape"
+        start = time.perf_counter()
+        try:
+            doc = call_with_retries(
+                self.firecrawl.scrape, url=url, formats=formats, host=firecrawl_host(), breaker=brand, **call_kwargs
+            )
+        except CircuitOpenError as exc:
+            self.metrics.record(stage, brand, error=str(exc), url=url)
+            raise
+        except Exception as exc:
+            # Solo un timeout dice algo de la latencia de la marca: un 4xx o un error de red no llegó a esperar la página
+            if is_timeout(exc):
+                self.wait_tuner.record(brand, call_kwargs["timeout"])
+            self.metrics.record(stage, brand, seconds=time.perf_counter() - start, error=f"{type(exc).__name__}: {exc}", url=url)
+            raise
+        seconds = time.perf_counter() - start
+        self.wait_tuner.record(brand, seconds * 1000)
+        self.metrics.record(stage, brand, seconds=seconds, payload=payload_bytes(doc), credits=credits_used(doc), url=url)
+        return doc
+
+    def get_content_from_website(
+        self,
+        url: str,
+        formats: list | None = None,
+        brand: str | None = None,
+        force_refresh: bool = False,
+        **scrape_kwargs,
+    ):
+        """
+        Trae contenido de la web según el formato dado.
+        Si hay cache, reutiliza la respuesta de una petición idéntica (url, formats y kwargs)
+        mientras no expire el TTL de la marca. force_refresh=True ignora lo cacheado.
+        """
+        key_kwargs, call_kwargs = self._scrape_options(brand, scrape_kwargs)
+        if self.cache is None:
+            return self._scrape(url, formats, brand, call_kwargs)
+
+        key = make_cache_key(url, formats, **key_kwargs)
+        if not force_refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record("cache", brand, url=url)
+                return cached
+
+        doc = self._scrape(url, formats, brand, call_kwargs)
+        self.cache.set(key, doc, url=url, brand=brand)
         return doc
 
     def get_all_urls_from_website(self, url: str):
         """ Trae todas las URLs de un sitio web """
-        url_list = self.firecrawl.map(url=url)
-        return get_urls_from_firecrawl_map(url_list)
\ No newline at end of file
+        url_list = call_with_retries(self.firecrawl.map, url=url, host=firecrawl_host())
+        return get_urls_from_firecrawl_map(url_list)
+
+    def remember_content(self, url: str, doc, formats: list | None = None, brand: str | None = None, **scrape_kwargs):
+        """ Guarda en cache un Document obtenido por otra vía (p. ej. batch scrape) con la misma llave que get_content_from_website """
+        if self.cache is None:
+            return
+        key_kwargs, _ = self._scrape_options(brand, scrape_kwargs)
+        key = make_cache_key(url, formats, **key_kwargs)
+        self.cache.set(key, doc, url=url, brand=brand)
+
+    def start_batch_scrape(self, urls: list[str], formats: list | None = None, brand: str | None = None, **scrape_kwargs) -> str:
+        """ Envía muchas URLs como un solo job de batch scrape y devuelve el id del job """
+        _, call_kwargs = self._scrape_options(brand, scrape_kwargs)
+        job = call_with_retries(self.firecrawl.start_batch_scrape, urls, formats=formats, host=firecrawl_host(), **call_kwargs)
+        return job.id
+
+    def get_batch_scrape_status(self, job_id: str, skip: int = 0):
+        """
+        Trae el estado del job y una página de Documents completados, desde la posición skip.
+        No auto-pagina: status.next indica que hay más páginas (la siguiente empieza en skip + len(data)).
+        """
+        if skip:
+            # Misma forma que la URL next que devuelve Firecrawl
+            return call_with_retries(self.firecrawl.get_batch_scrape_status_page, f"/v2/batch/scrape/{job_id}?skip={skip}",
+                                     host=firecrawl_host())
+        from firecrawl.v2.types import PaginationConfig
+
+        return call_with_retries(self.firecrawl.get_batch_scrape_status, job_id,
+                                 pagination_config=PaginationConfig(auto_paginate=False), host=firecrawl_host())
@@ -0,0 +1,220 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlparse
+
+import requests
+
+from src.core.scraper.parsing import parse_subtree
+from src.core.scraper.specs import extract_specs
+from src.core.scraper.structured_data import extract_model_fields, parse_price
+from src.core.scraper.transport import DEFAULT_TIMEOUT, get_session
+from src.core.scraper.utils import extract_image_urls_from_html
+
+COMBINATION_INFO_PATH = "/website_sale/get_combination_info"
+# Inputs de variantes de website_sale y los labels con su nombre
+VARIANTS_SELECTOR = "input.js_product_change, input.js_variant_change, input.product_id, input.product_template_id, label"
+SPECS_SELECTOR = "div#product_specifications"
+IMAGE_SIZE = "image_1024"
+_COLOR_IN_NAME = re.compile(r"\(([^)]+)\)\s*$")
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def variant_image_url(origin: str, product_id, name: str | None = None) -> str:
+    """ /web/image/product.product/<id>/image_1024[/nombre]; el nombre solo sirve como nombre de archivo """
+    url = f"{origin}/web/image/product.product/{product_id}/{IMAGE_SIZE}"
+    return f"{url}/{quote(name)}" if name else url
+
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _label_text(input_tag) -> str | None:
+    """ Texto del label de un radio: el label que lo envuelve o el siguiente """
+    label = input_tag.find_parent("label") or input_tag.find_next("label")
+    if label is None:
+        return None
+    return label.get_text(" ", strip=True) or None
+
+
+def parse_variants(html: str) -> dict:
+    """
+    Lee del HTML estático (sin render) el template, la variante actual y las variantes:
+    - js_product_change: cada radio ya es una product.product (value = id de la variante)
+    - js_variant_change: cada radio es un valor de atributo (value = product.template.attribute.value)
+    """
+    soup = parse_subtree(html, VARIANTS_SELECTOR)
+    try:
+        template_input = soup.select_one("input.product_template_id")
+        product_input = soup.select_one("input.product_id")
+        products = []
+        for input_tag in soup.select("input.js_product_change"):
+            name = _label_text(input_tag)
+            match = _COLOR_IN_NAME.search(name or "")
+            products.append({
+                "product_id": _int(input_tag.get("value")),
+                "name": name,
+                "color": match.group(1).strip() if match else None,
+                "price": parse_price(input_tag.get("data-price")),
+                "list_price": parse_price(input_tag.get("data-lst_price")),
+            })
+
+        attribute_values = []
+        for input_tag in soup.select("input.js_variant_change"):
+            attribute_values.append({
+                "value_id": _int(input_tag.get("value")),
+                "name": input_tag.get("data-value_name") or input_tag.get("title") or _label_text(input_tag),
+                "attribute": input_tag.get("data-attribute_name"),
+                "checked": input_tag.has_attr("checked"),
+            })
+        return {
+            "template_id": _int(template_input.get("value")) if template_input else None,
+            "product_id": _int(product_input.get("value")) if product_input else None,
+            "products": [product for product in products if product["product_id"]],
+            "attribute_values": [value for value in attribute_values if value["value_id"]],
+        }
+    finally:
+        soup.decompose()
+
+
+def _color_values(attribute_values: list[dict]) -> list[dict]:
+    """ Valores del atributo de color; si el sitio no nombra los atributos, se toman todos """
+    colors = [value for value in attribute_values if "color" in (value["attribute"] or "").lower()]
+    return colors or [value for value in attribute_values if not value["attribute"]] or attribute_values
+
+
+def get_combination_info(origin: str, template_id: int, combination: list[int], session: requests.Session | None = None) -> dict:
+    """ JSON-RPC de website_sale: variante (product.product), nombre y precios de una combinación de atributos """
+    session = session or get_session()
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "call",
+        "params": {"product_template_id": template_id, "product_id": False, "combination": combination, "add_qty": 1},
+    }
+    response = session.post(f"{origin}{COMBINATION_INFO_PATH}", json=payload, timeout=DEFAULT_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    if "error" in data:
+        raise ValueError(f"Odoo get_combination_info: {data['error'].get('message')}")
+    return data.get("result") or {}
+
+
+def _needs_combination_info(parsed: dict) -> bool:
+    """ Los colores son valores de atributo (js_variant_change): sus variantes solo salen del JSON-RPC """
+    return not parsed["products"] and bool(parsed["attribute_values"]) and bool(parsed["template_id"])
+
+
+def _with_images(origin: str, variants: list[dict], parsed: dict) -> list[dict]:
+    if not variants and parsed["product_id"]:
+        # Producto sin variantes (o solo la variante seleccionada)
+        variants = [{"product_id": parsed["product_id"], "name": None, "color": None, "price": None, "list_price": None}]
+    for variant in variants:
+        variant["image"] = variant_image_url(origin, variant["product_id"], variant["name"])
+    return variants
+
+
+def variants_from_html(url: str, html: str) -> list[dict]:
+    """
+    Variantes que se leen del HTML sin red (lo que usa el handler, en el pool de procesos):
+    las de js_product_change o, si no hay, la variante seleccionada. Las de js_variant_change
+    se completan después con complete_images.
+    """
+    parsed = parse_variants(html)
+    return _with_images(_origin(url), parsed["products"], parsed)
+
+
+def complete_images(url: str, html: str, images: list, session: requests.Session | None = None) -> list:
+    """
+    Etapa posterior al handler, en el proceso principal: si los colores de la página son valores
+    de atributo, agrega la imagen de la variante de cada color (get_combination_info).
+    """
+    parsed = parse_variants(html)
+    if not _needs_combination_info(parsed):
+        return images
+    variant_images = [variant["image"] for variant in resolve_variants(url, html, session=session)]
+    known = {image.split(f"/{IMAGE_SIZE}")[0] for image in variant_images}
+    return variant_images + [image for image in images or [] if image.split(f"/{IMAGE_SIZE}")[0] not in known]
+
+
+def resolve_variants(url: str, html: str, session: requests.Session | None = None) -> list[dict]:
+    """
+    Devuelve [{product_id, name, color, price, list_price, image}] de cada variante.
+    Con js_product_change alcanza con el HTML; con js_variant_change se pide get_combination_info
+    por color (en paralelo, sobre la sesión compartida).
+    """
+    origin = _origin(url)
+    parsed = parse_variants(html)
+    variants = parsed["products"]
+
+    if _needs_combination_info(parsed):
+        colors = _color_values(parsed["attribute_values"])
+        color_ids = {value["value_id"] for value in colors}
+        # El resto de los atributos (p. ej. versión) se deja en el valor seleccionado por defecto
+        fixed = [value["value_id"] for value in parsed["attribute_values"] if value["checked"] and value["value_id"] not in color_ids]
+
+        def fetch(color: dict) -> dict:
+            info = get_combination_info(origin, parsed["template_id"], [color["value_id"], *fixed], session=session)
+            return {
+                "product_id": info.get("product_id"),
+                "name": info.get("display_name"),
+                "color": color["name"],
+                "price": info.get("price"),
+                "list_price": info.get("list_price"),
+            }
+
+        with ThreadPoolExecutor(max_workers=min(8, len(colors))) as executor:
+            variants = [variant for variant in executor.map(fetch, colors) if variant["product_id"]]
+
+    return _with_images(origin, variants, parsed)
+
+
+def fetch_artifacts(url: str, brand: str | None = None, session: requests.Session | None = None) -> dict | None:
+    """ Una descarga del HTML estático de la página (sin navegador) y, si hace falta, JSON-RPC por color """
+    session = session or get_session()
+    response = session.get(url, timeout=DEFAULT_TIMEOUT)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    html = response.text
+
+    variants = resolve_variants(url, html, session=session)
+    if not variants:
+        return None
+
+    # Galería: imágenes extra del producto (product.image) y de variantes que ya vienen en el HTML
+    images = [variant["image"] for variant in variants]
+    known = {image.split(f"/{IMAGE_SIZE}")[0] for image in images}
+    for image in extract_image_urls_from_html(html, base_url=url):
+        if f"/{IMAGE_SIZE}" in image and image.split(f"/{IMAGE_SIZE}")[0] not in known:
+            known.add(image.split(f"/{IMAGE_SIZE}")[0])
+            images.append(image)
+
+    fields, sources = extract_model_fields(html, brand)
+    colors = [variant["color"] for variant in variants if variant["color"]]
+    if colors:
+        fields["colors"] = list(dict.fromkeys(colors))
+        sources["colors"] = "odoo"
+    priced = next((variant for variant in variants if variant["price"]), None)
+    if priced is not None:
+        fields["net_price"] = priced["price"]
+        fields["base_price"] = priced["list_price"] or priced["price"]
+        fields["discount_amount"] = (fields["base_price"] - fields["net_price"]) if fields["base_price"] > fields["net_price"] else None
+        sources.update({"net_price": "odoo", "base_price": "odoo"})
+        if fields["discount_amount"] is not None:
+            sources["discount_amount"] = "odoo"
+        else:
+            sources.pop("discount_amount", None)
+
+    return {
+        "images": images,
+        "technical_specs": extract_specs(html, SPECS_SELECTOR, brand=brand) or None,
+        "model_data": {**fields, "field_sources": sources},
+        "variants": variants,
+    }
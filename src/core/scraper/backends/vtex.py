@@ -0,0 +1,157 @@
+from urllib.parse import quote, urlparse
+
+import requests
+
+from src.core.scraper.specs import build_spec_records
+from src.core.scraper.transport import DEFAULT_TIMEOUT, get_session
+
+SEARCH_PATH = "/api/catalog_system/pub/products/search"
+# VTEX devuelve como máximo 50 productos por página (_from/_to inclusivos)
+PAGE_SIZE = 50
+# Y no pagina más allá de este índice: categorías más grandes se parten con fq
+MAX_OFFSET = 2500
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def product_slug(url: str) -> str | None:
+    """ https://www.italika.mx/moto-ft150/p -> moto-ft150 """
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    if len(parts) >= 2 and parts[-1] == "p":
+        return parts[-2]
+    return None
+
+
+def _get(url: str, params: dict | None = None, session: requests.Session | None = None) -> list:
+    session = session or get_session()
+    response = session.get(url, params=params, timeout=DEFAULT_TIMEOUT)
+    # 206 Partial Content es la respuesta normal de una página de resultados
+    if response.status_code == 404:
+        return []
+    response.raise_for_status()
+    return response.json()
+
+
+def search_by_slug(url: str, session: requests.Session | None = None) -> dict | None:
+    slug = product_slug(url)
+    if slug is None:
+        return None
+    products = _get(f"{_origin(url)}{SEARCH_PATH}/{quote(slug)}/p", session=session)
+    return products[0] if products else None
+
+
+def search_by_id(base_url: str, product_id: str | int, session: requests.Session | None = None) -> dict | None:
+    products = _get(f"{_origin(base_url)}{SEARCH_PATH}", params={"fq": f"productId:{product_id}"}, session=session)
+    return products[0] if products else None
+
+
+def iter_category(base_url: str, category_path: str = "", fq: list[str] | None = None, session: requests.Session | None = None):
+    """
+    Recorre todos los productos de una categoría (p. ej. "motocicletas/trabajo") o de un filtro fq,
+    página por página con _from/_to. Entrega los productos crudos de la API.
+    """
+    url = f"{_origin(base_url)}{SEARCH_PATH}/{category_path.strip('/')}".rstrip("/")
+    for start in range(0, MAX_OFFSET, PAGE_SIZE):
+        params = {"_from": start, "_to": start + PAGE_SIZE - 1}
+        if fq:
+            params["fq"] = fq
+        products = _get(url, params=params, session=session)
+        yield from products
+        if len(products) < PAGE_SIZE:
+            return
+
+
+def _offer(item: dict) -> dict:
+    """ commertialOffer del primer vendedor con stock (o del primero si ninguno tiene) """
+    sellers = item.get("sellers") or []
+    for seller in sellers:
+        offer = seller.get("commertialOffer") or {}
+        if offer.get("IsAvailable") or offer.get("AvailableQuantity"):
+            return offer
+    return (sellers[0].get("commertialOffer") or {}) if sellers else {}
+
+
+def _color(item: dict) -> str | None:
+    for variation in item.get("variations") or []:
+        name = variation if isinstance(variation, str) else variation.get("name", "")
+        if "color" in name.lower():
+            values = item.get(name) or (variation.get("values") if isinstance(variation, dict) else None)
+            if values:
+                return values[0]
+    return None
+
+
+def parse_product(product: dict) -> dict:
+    """
+    Normaliza un producto de la API de catálogo: precios, SKUs con color, imágenes y especificaciones.
+    """
+    skus = []
+    images = []
+    for item in product.get("items") or []:
+        offer = _offer(item)
+        item_images = [image["imageUrl"] for image in item.get("images") or [] if image.get("imageUrl")]
+        for image in item_images:
+            if image not in images:
+                images.append(image)
+        skus.append({
+            "sku_id": item.get("itemId"),
+            "name": item.get("nameComplete") or item.get("name"),
+            "color": _color(item),
+            "images": item_images,
+            "net_price": offer.get("Price"),
+            "base_price": offer.get("ListPrice") or offer.get("PriceWithoutDiscount"),
+            "available": bool(offer.get("IsAvailable") or offer.get("AvailableQuantity")),
+        })
+
+    specs = []
+    for group in product.get("allSpecificationsGroups") or []:
+        for name in product.get(group) or []:
+            specs.append((group, name, ", ".join(str(value) for value in product.get(name) or [])))
+    grouped = {name for _, name, _ in specs}
+    for name in product.get("allSpecifications") or []:
+        if name not in grouped:
+            specs.append((None, name, ", ".join(str(value) for value in product.get(name) or [])))
+
+    priced = next((sku for sku in skus if sku["available"] and sku["net_price"]), skus[0] if skus else {})
+    net_price = priced.get("net_price")
+    base_price = priced.get("base_price") or net_price
+    colors = []
+    for sku in skus:
+        if sku["color"] and sku["color"] not in colors:
+            colors.append(sku["color"])
+    return {
+        "product_id": product.get("productId"),
+        "name": product.get("productName"),
+        "brand": product.get("brand"),
+        "link": product.get("link"),
+        "net_price": net_price,
+        "base_price": base_price,
+        "discount_amount": (base_price - net_price) if base_price and net_price and base_price > net_price else None,
+        "colors": colors or None,
+        "images": images,
+        "skus": skus,
+        "specs": specs,
+    }
+
+
+def product_artifacts(product: dict, brand: str | None = None) -> dict:
+    """ Lleva el producto normalizado a las mismas formas que devuelven los handlers de la marca """
+    model_data = {field: product[field] for field in ("base_price", "net_price", "discount_amount", "colors")}
+    model_data["model"] = product["name"]
+    model_data["field_sources"] = {field: "vtex" for field, value in model_data.items() if value is not None}
+    return {
+        "images": product["images"],
+        "technical_specs": build_spec_records(product["specs"], brand),
+        "model_data": model_data,
+    }
+
+
+def fetch_artifacts(url: str, brand: str | None = None, session: requests.Session | None = None) -> dict | None:
+    """ Una sola llamada JSON por modelo en lugar de renderizar la página """
+    product = search_by_slug(url, session=session)
+    if product is None:
+        return None
+    return product_artifacts(parse_product(product), brand)
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Iterable
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncScrapingUtils:
+    """
+    Corre el scraping síncrono (ScrapingUtils / ImagesProcessor) en un pool de hilos
+    con un límite global de concurrencia y otro por dominio.
+    """
+
+    def __init__(self, processor=None, concurrency: int = 16, per_domain: int = 4):
+        if processor is None:
+            from src.core.scraper.processor import ImagesProcessor
+            processor = ImagesProcessor()
+        self.processor = processor
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scraper")
+        self._global_semaphore: asyncio.Semaphore | None = None
+        self._domain_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphores(self, url: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.concurrency)
+        domain = urlparse(url).netloc.lower()
+        if domain not in self._domain_semaphores:
+            self._domain_semaphores[domain] = asyncio.Semaphore(self.per_domain)
+        return self._global_semaphore, self._domain_semaphores[domain]
+
+    async def _run_limited(self, url: str, func, *args, **kwargs):
+        global_semaphore, domain_semaphore = self._semaphores(url)
+        # Primero el dominio: una URL esperando su dominio no ocupa un cupo global
+        async with domain_semaphore:
+            async with global_semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_content_from_website(self, url: str, formats: list | None = None, **scrape_kwargs):
+        """ Versión async de ScrapingUtils.get_content_from_website """
+        return await self._run_limited(
+            url,
+            self.processor.scraper.get_content_from_website,
+            url,
+            formats,
+            **scrape_kwargs,
+        )
+
+    async def process(self, url: str, want: set | list | None = None, **kwargs) -> dict:
+        """ Versión async de ImagesProcessor.process; los errores quedan en result['errors'] """
+        try:
+            return await self._run_limited(url, self.processor.process, url, want, **kwargs)
+        except Exception as exc:
+            logger.error("Error en la URL: %s (%s)", url, exc, extra={"url": url})
+            return {"url": url, "website": None, "errors": {"process": str(exc)}}
+
+    async def process_many(
+        self,
+        urls: Iterable[str],
+        want: set | list | None = None,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        """
+        Procesa muchas URLs en paralelo y entrega cada resultado apenas termina.
+        Uso (notebook):
+            async for result in AsyncScrapingUtils().process_many(urls, want={"images"}):
+                ...
+        """
+        tasks = [asyncio.ensure_future(self.process(url, want, **kwargs)) for url in urls]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # Si el consumidor corta la iteración se cancelan las URLs pendientes
+            for task in tasks:
+                task.cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
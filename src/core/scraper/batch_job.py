@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from src.config.settings import DATA_DIR
+from src.core.scraper.utils import get_document_source_url
+
+BATCH_JOBS_DIR = DATA_DIR / "batch_jobs"
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_url(url: str) -> str:
+    return url.strip().rstrip("/")
+
+
+class FirecrawlBatchJob:
+    """
+    Job de batch scrape de Firecrawl con polling con backoff y estado persistido en disco.
+    Si el proceso se interrumpe, volver a correr con el mismo nombre retoma el mismo job
+    y omite los Documents ya entregados. Cada poll pide solo las páginas desde el último
+    Document leído (offset persistido), no todos los Documents del job.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        name: str,
+        state_dir: Path | str | None = None,
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 30.0,
+        backoff: float = 1.5,
+        timeout: float = 3 * 60 * 60,
+    ):
+        self.scraper = scraper
+        self.name = name
+        self.state_path = Path(state_dir or BATCH_JOBS_DIR) / f"{name}.json"
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.missing: list[str] = []
+
+    def _load_state(self) -> dict | None:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, state: dict) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+    def _request_fingerprint(self, urls: list[str], options: dict) -> str:
+        raw = json.dumps({"urls": sorted(urls), "options": options}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def run(self, urls: list[str], **options) -> Iterator[tuple[str, Any]]:
+        """
+        Envía (o retoma) el job y entrega (url, Document) a medida que Firecrawl los completa.
+        Las URLs que no llegaron al terminar el job quedan en self.missing.
+        """
+        fingerprint = self._request_fingerprint(urls, options)
+        state = self._load_state()
+        if state is None or state.get("fingerprint") != fingerprint:
+            job_id = self.scraper.start_batch_scrape(list(urls), **dict(options))
+            state = {
+                "job_id": job_id,
+                "fingerprint": fingerprint,
+                "urls": list(urls),
+                "processed": [],
+                "started_at": time.time(),
+            }
+            self._save_state(state)
+            logger.info("Batch scrape iniciado: %s (%d URLs)", job_id, len(urls), extra={"job_id": job_id})
+        else:
+            logger.info("Retomando batch scrape: %s (%d ya procesadas)", state["job_id"], len(state["processed"]),
+                        extra={"job_id": state["job_id"]})
+
+        # Firecrawl puede devolver la URL con o sin barra final
+        url_by_key = {_normalize_url(url): url for url in urls}
+        processed = set(state["processed"])
+        interval = self.poll_interval
+        deadline = time.time() + self.timeout
+        status = None
+
+        while time.time() < deadline:
+            received = False
+            while True:
+                status = self.scraper.get_batch_scrape_status(state["job_id"], skip=state.get("offset", 0))
+                documents = getattr(status, "data", None) or []
+                for doc in documents:
+                    source_url = get_document_source_url(doc)
+                    url = url_by_key.get(_normalize_url(source_url or ""), source_url)
+                    state["offset"] = state.get("offset", 0) + 1
+                    if url is None or url in processed:
+                        continue
+                    yield url, doc
+                    processed.add(url)
+                    state["processed"].append(url)
+                    self._save_state(state)
+                    received = True
+                self._save_state(state)
+                if not documents or not getattr(status, "next", None):
+                    break
+
+            if getattr(status, "status", None) in FINISHED_STATUSES:
+                break
+            # Si no llegó nada nuevo se espacia el polling, si llegó se vuelve al intervalo base
+            interval = self.poll_interval if received else min(interval * self.backoff, self.max_poll_interval)
+            time.sleep(interval)
+        else:
+            logger.warning("Batch scrape %s superó el timeout, se puede retomar luego", state["job_id"], extra={"job_id": state["job_id"]})
+            return
+
+        self.missing = [url for url in urls if url not in processed]
+        if self.missing:
+            logger.warning("Batch scrape %s terminó sin %d URLs", state["job_id"], len(self.missing), extra={"job_id": state["job_id"]})
+        logger.info("Batch scrape %s estado final: %s", state["job_id"], getattr(status, "status", None), extra={"job_id": state["job_id"]})
+        self.state_path.unlink(missing_ok=True)
@@ -1,6 +1,10 @@
+import logging
+
 from src.core.scraper.brands.akt.images.executor import handle_images
 from src.core.scraper.brands.akt.technical_specs.executor import handle_technical_specs
 
+logger = logging.getLogger(__name__)
+
 
 def handle_akt(handle_type:str, content: list[str]) -> list:
     """
@@ -8,9 +12,9 @@ def handle_akt(handle_type:str, content: list[str]) -> list:
     """
 
     if handle_type == "images":
-        print("Tipo de contenido: Images")
+        logger.debug("Tipo de contenido: Images")
         return handle_images(content)
 
     if handle_type == "technical_specs":
-        print("Tipo de contenido: Technical Specs")
+        logger.debug("Tipo de contenido: Technical Specs")
         return handle_technical_specs(content)
@@ -0,0 +1,21 @@
+BRAND = {
+    "name": "auteco_tvs",
+    "hosts": ["auteco.com.co"],
+    "site_url": "https://www.auteco.com.co/",
+    "product_url": r"/moto-tvs-[\w-]+/p$",
+    # auteco.com.co vende varias marcas: se distingue con el parámetro sitio
+    "sitio": "tvs",
+    # Tienda VTEX: imágenes, precios y ficha salen de la API de catálogo, sin renderizar la página
+    "backend": "vtex",
+    # Reglas DOM para ModelData cuando la página no trae JSON-LD / microdata completos
+    "model_data": {
+        "base_price": "span.vtex-product-price-1-x-listPriceValue",
+        "net_price": "span.vtex-product-price-1-x-sellingPriceValue",
+        "model": "span.vtex-store-components-3-x-productBrand",
+        "colors": "div.vtex-store-components-3-x-skuSelectorItemTextValue",
+    },
+    "scrape": {
+        # El handler arma la galería a partir de la primera imagen "interna-de-producto"
+        "images": {"formats": ["images"], "ready": ['img[src*="interna-de-producto"]']},
+    },
+}
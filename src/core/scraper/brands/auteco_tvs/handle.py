@@ -1,6 +1,10 @@
-from src.core.scraper.brands.auteco_tvs.images.executor import handle_images
+import logging
+
+from src.core.scraper.brands.auteco_tvs.images.executor import complete_images as resolve_images, handle_images
 # from src.core.scraper.brands.auteco_tvs.technical_specs.executor import handle_technical_specs
 
+logger = logging.getLogger(__name__)
+
 
 def handle_auteco_tvs(handle_type:str, content: list[str]) -> list:
     """
@@ -8,9 +12,16 @@ def handle_auteco_tvs(handle_type:str, content: list[str]) -> list:
     """
 
     if handle_type == "images":
-        print("Tipo de contenido: Images")
+        logger.debug("Tipo de contenido: Images")
         return handle_images(content)
 
     # if handle_type == "technical_specs":
-    #     print("Tipo de contenido: Technical Specs")
+    #     logger.debug("Tipo de contenido: Technical Specs")
     #     return handle_technical_specs(content)
+
+
+def complete_images(images: list[str], content) -> list[str]:
+    """
+    Resuelve la extensión de las URLs que arma handle_images (HEAD, en el proceso principal)
+    """
+    return resolve_images(images)
@@ -17,35 +17,22 @@ def create_urls_from_pattern(url_base: str):
     return urls_list
 
 def get_images_from_url_pattern(urls_list: list[str]):
-    import requests
+    from src.core.scraper.probe import get_image_prober
     default_extension = "webp"
     alt_extension = "png"
-    url_list_checked = []
-    # Itera entre cada url sin extensión y agrega la extensión por defecto
-    for url in urls_list:
-        url_to_check = f"{url}.{default_extension}"
-        response = requests.get(url_to_check) # Se hace un reuquest para comprobar el status_code que retorne
-        if response.status_code == 404: # Si el status_code es 404, se agrega la extensión alternativa
-            print("No se encontró la imagen con la extensión por defecto, se intenta con la extensión alternativa")
-            url_alt_to_check = f"{url}.{alt_extension}"
-            print("Probando con extensión alternativa: ", url_alt_to_check)
-            response = requests.get(url_alt_to_check) # Se vuelve a hacer el request con la extensión alternativa
-            if response.status_code == 200: # Si el status_code es 200, se agrega la url con la extensión alternativa
-                url_list_checked.append(url_alt_to_check)
-            if response.status_code == 404:
-                print("No se encontró la imagen con ninguna extensión")
-        # Finalmente, si es 200, se agrega.
-        if response.status_code == 200:
-            url_list_checked.append(url_to_check)
-    return url_list_checked
+    # Verifica en paralelo cada url sin extensión: primero la extensión por defecto, luego la alternativa
+    # Las urls que ya dieron 404 en corridas anteriores no se vuelven a pedir
+    return get_image_prober().resolve_extensions(urls_list, (default_extension, alt_extension))
 
 def handle_images(content: list[str]):
     # Detecta el patrón de URL: https://media.autecomobility.com/recursos/marcas/tvs/ntorq-125/interna-de-producto/Galeria-imagen-1.webp
     # Detecta: https://media.autecomobility.com/recursos/marcas/tvs/ntorq-125/interna-de-producto/
     url_base = detect_url_pattern(content.images)
     # Se crea las URLs apartir de la URL base
-    # Crea: {url}/tvs/ntorq-125/interna-de-producto/Galeria-imagen-{N}.webp
-    urls_list = create_urls_from_pattern(url_base)
-    # Se verifica las URLs y se agregan las que existen
-    urls_list_checked = get_images_from_url_pattern(urls_list)
-    return urls_list_checked
+    # Crea: {url}/tvs/ntorq-125/interna-de-producto/Galeria-imagen-{N}
+    # Las URLs quedan sin extensión: complete_images las verifica fuera del pool de procesos
+    return create_urls_from_pattern(url_base)
+
+def complete_images(urls_list: list[str]):
+    # Se verifica las URLs y se agregan las que existen (HEAD en paralelo, sin descargar la imagen)
+    return get_images_from_url_pattern(urls_list)
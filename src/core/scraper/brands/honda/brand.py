@@ -0,0 +1,21 @@
+BRAND = {
+    "name": "honda",
+    "hosts": ["honda.mx"],
+    "site_url": "https://www.honda.mx/",
+    # El handler de imágenes recibe content.images en lugar del Document completo
+    "images_input": "images",
+    "scrape": {
+        "images": {"formats": ["images"], "ready": [{"images_stable": 3}]},
+        "technical_specs": {
+            "formats": ["html"],
+            "actions": [
+                {"type": "click", "selector": "a.btn-specs"},  # click para desplegar la ficha
+            ],
+            # Lista cuando el acordeón de especificaciones está en el DOM, no tras 1200 ms fijos
+            "ready": ["div#specsAcordion"],
+            # El handler solo lee el acordeón: Firecrawl devuelve ese div en lugar de la página completa
+            "include_tags": ["div#specsAcordion"],
+            "only_main_content": False,
+        },
+    },
+}
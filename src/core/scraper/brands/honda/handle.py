@@ -1,16 +1,20 @@
+import logging
+
 from src.core.scraper.brands.honda.images.executor import handle_images
 from src.core.scraper.brands.honda.technical_specs.executor import handle_technical_specs
 # *: Las URLs de interés son aquellas que tienen "width" o "height" incluída.
 
+logger = logging.getLogger(__name__)
+
 def handle_honda(handle_type:str, content: list[str]) -> list:
     """
     Maneja el caso específico de la marca Honda
     """
 
     if handle_type == "images":
-        print("Tipo de contenido: Images")
+        logger.debug("Tipo de contenido: Images")
         return handle_images(content)
 
     if handle_type == "technical_specs":
-        print("Tipo de contenido: Technical Specs")
+        logger.debug("Tipo de contenido: Technical Specs")
         return handle_technical_specs(content)
@@ -1,15 +1,8 @@
-from bs4 import BeautifulSoup
+from src.core.scraper.specs import extract_specs
 
-def handle_technical_specs(content: list[str]) -> list:
-    html = content.html
-    print("Contenido HTML:")
-    print(html)
-
-    soup = BeautifulSoup(html, "html.parser")
-    specs_div = soup.find("div", id="specsAcordion")
-    # Si quieres el HTML completo del div
-    specs_html = str(specs_div) if specs_div else None
-    # Si quieres el texto limpio
-    specs_text = specs_div.get_text(" ", strip=True) if specs_div else None
+# Solo se parsea el acordeón de especificaciones, no la página completa
+SPECS_SELECTOR = "div#specsAcordion"
 
-    return specs_html
\ No newline at end of file
+def handle_technical_specs(content: list[str]) -> list:
+    # Registros (sección, clave, valor, unidad, campo); el árbol HTML se libera al terminar
+    return extract_specs(content.html, SPECS_SELECTOR, brand="honda")
@@ -0,0 +1,29 @@
+BRAND = {
+    "name": "italika",
+    "hosts": ["italika.mx"],
+    # Home del sitio: de aquí se leen robots.txt / sitemap.xml para el inventario de URLs
+    "site_url": "https://www.italika.mx/",
+    # Regex de las URLs de producto; sin ella el inventario guarda todas las URLs del sitio
+    "product_url": r"/p$",
+    # El handler de imágenes recibe content.images en lugar del Document completo
+    "images_input": "images",
+    # Tienda VTEX: imágenes, precios y ficha salen de la API de catálogo, sin renderizar la página
+    "backend": "vtex",
+    # Reglas DOM para ModelData cuando la página no trae JSON-LD / microdata completos
+    "model_data": {
+        "base_price": "span.vtex-product-price-1-x-listPriceValue",
+        "net_price": "span.vtex-product-price-1-x-sellingPriceValue",
+        "model": "span.vtex-store-components-3-x-productBrand",
+        "colors": "div.vtex-store-components-3-x-skuSelectorItemTextValue",
+    },
+    "scrape": {
+        "images": {"formats": ["images"], "ready": [{"images_stable": 3}]},
+        "technical_specs": {
+            "formats": ["html"],
+            "ready": ["div.vtex-flex-layout-0-x-flexColChild--bikes-specs"],
+            # Solo la columna de especificaciones que lee el handler
+            "include_tags": ["div.vtex-flex-layout-0-x-flexColChild--bikes-specs"],
+            "only_main_content": False,
+        },
+    },
+}
@@ -0,0 +1,18 @@
+BRAND = {
+    "name": "ryder",
+    "hosts": ["rydermx.com"],
+    "site_url": "https://www.rydermx.com/",
+    "product_url": r"/shop/(?!category/|cart)[\w-]+-\d+$",
+    # Tienda Odoo: variantes e imágenes salen del HTML estático y de get_combination_info, sin render
+    "backend": "odoo",
+    # Reglas DOM para ModelData cuando la página no trae JSON-LD / microdata completos
+    "model_data": {
+        "base_price": "span.oe_default_price",
+        "net_price": "span.oe_currency_value",
+        "model": 'h1[itemprop="name"]',
+    },
+    "scrape": {
+        "images": {"formats": ["html", "images"], "ready": ["input.js_product_change"]},
+        "technical_specs": {"formats": ["html"]},
+    },
+}
@@ -1,6 +1,9 @@
-from bs4 import BeautifulSoup
+from src.core.scraper.parsing import parse_subtree
 import re
 
+# Solo se parsean el nombre del modelo, los inputs de variantes y los span con los colores
+VARIANTS_SELECTOR = "h1, input.js_product_change, span"
+
 def extract_all_input_values(html_input_with_colors_value):
     values = []
     for input_tag in html_input_with_colors_value:
@@ -26,7 +29,7 @@ def extract_all_colors_name_available_with_values(model_name, html_span_with_col
     return color_dict
 
 def extract_html_content(content: str) -> str:
-    soup = BeautifulSoup(content, "html.parser")
+    soup = parse_subtree(content, VARIANTS_SELECTOR)
     model_name = soup.find("h1").get_text(strip=True)
     html_input_with_colors_value = soup.find_all("input", class_="js_product_change")
     html_span_with_colors_name = soup.find_all("span")
@@ -39,7 +42,7 @@ def handle_main_colors_images(content:list[str]) -> list:
     colors_value_list = extract_all_input_values(html_input_with_colors_value)
     dict_colors_and_values = extract_all_colors_name_available_with_values(model_name, html_span_with_colors_name, colors_value_list)
     for color_dict in dict_colors_and_values:
-        main_images_list.append(f"https://www.rydermx.com/web/image/product.product/{color_dict['value']}/image_1024/{model_name}%20%28{color_dict['color']}%29?unique=b3a6ac0")
+        main_images_list.append(f"https://www.rydermx.com/web/image/product.product/{color_dict['value']}/image_1024/{model_name}%20%28{color_dict['color']}%29")
     return main_images_list
 
 def handle_gallery_images(content: list[str]) -> list:
@@ -0,0 +1,14 @@
+BRAND = {
+    "name": "tvs",
+    "hosts": ["tvsmotor.com"],
+    "site_url": "https://mexico.tvsmotor.com/es/",
+    "scrape": {
+        "technical_specs": {
+            "formats": ["html"],
+            "ready": ["div.premium-specification-container"],
+            # Solo los contenedores de especificaciones que lee el handler
+            "include_tags": ["div.premium-specification-container"],
+            "only_main_content": False,
+        },
+    },
+}
@@ -1,7 +1,8 @@
-from bs4 import BeautifulSoup
+from src.core.scraper.specs import extract_specs
+
+# Solo se parsean los contenedores de especificaciones, no la página completa
+SPECS_SELECTOR = "div.premium-specification-container"
 
 def handle_technical_specs(content: list[str]) -> list:
-    html = content.html
-    soup = BeautifulSoup(html, "html.parser")
-    divs = soup.find_all("div", class_="premium-specification-container")
-    return divs
\ No newline at end of file
+    # Registros (sección, clave, valor, unidad, campo); el árbol HTML se libera al terminar
+    return extract_specs(content.html, SPECS_SELECTOR, brand="tvs")
@@ -0,0 +1,17 @@
+BRAND = {
+    "name": "vento",
+    "hosts": ["vento.com"],
+    "site_url": "https://www.vento.com/",
+    # El handler de imágenes recibe content.images en lugar del Document completo
+    "images_input": "images",
+    "scrape": {
+        "images": {"formats": ["images"], "ready": [{"images_stable": 3}]},
+        "technical_specs": {
+            "formats": ["links"],
+            "ready": ['a[href*="/wp-content/uploads/FT-"]'],
+            # De los links solo interesa el PDF de la ficha (FT-)
+            "include_tags": ['a[href*="/wp-content/uploads/FT-"]'],
+            "only_main_content": False,
+        },
+    },
+}
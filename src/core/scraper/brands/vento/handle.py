@@ -1,4 +1,4 @@
-from src.core.scraper.brands.vento.images.executor import handle_images
+from src.core.scraper.brands.vento.images.executor import complete_images as complete_pattern_images, handle_images
 from src.core.scraper.brands.vento.technical_specs.executor import handle_technical_specs
 
 def handle_vento(handle_type:str, content: list[str]) -> list:
@@ -10,4 +10,11 @@ def handle_vento(handle_type:str, content: list[str]) -> list:
         return handle_images(content)
 
     if handle_type == "technical_specs":
-        return handle_technical_specs(content)
\ No newline at end of file
+        return handle_technical_specs(content)
+
+
+def complete_images(images: list[str], content) -> list[str]:
+    """
+    Verifica por HTTP las imágenes armadas por handle_images (proceso principal, no el pool)
+    """
+    return complete_pattern_images(images, content.images)
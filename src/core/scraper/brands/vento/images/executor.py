@@ -1,4 +1,9 @@
+import logging
+
 from src.core.scraper.brands.vento.utils import create_urls_from_pattern
+from src.core.scraper.probe import get_image_prober
+
+logger = logging.getLogger(__name__)
 
 def detect_url_pattern(images_list: list[str]):
     """
@@ -7,7 +12,7 @@ def detect_url_pattern(images_list: list[str]):
     for image in images_list:
         if image.endswith("-01.jpg"):
             base_url = image.split("-01.jpg")[0]
-            print(base_url)
+            logger.debug("URL base de las imágenes: %s", base_url)
             return base_url
     return None
 
@@ -20,14 +25,17 @@ def extract_main_images(base_url: str, images_list: list[str]):
 
 
 def handle_images(extracted_images_list: list[str]):
-
+    """
+    Imágenes del scrape más las que se arman con el patrón de la URL base, sin verificar:
+    las armadas que no existen se descartan después con complete_images (HEAD, fuera del pool)
+    """
     final_urls_list = []
     # Detecta el patrón de la URL de las imágenes
     base_url = detect_url_pattern(extracted_images_list)
     # Se crea las URLs apartir de la URL base
-    urls_created_from_pattern = create_urls_from_pattern(base_url)
+    urls_created_from_pattern = create_urls_from_pattern(base_url) if base_url else []
     # Se filtran las imágenes principales en base a la url base
-    main_images = extract_main_images(base_url, extracted_images_list)
+    main_images = extract_main_images(base_url, extracted_images_list) if base_url else []
 
     # Se agregan todos los resultados en una sola lista
     for image in main_images:
@@ -36,4 +44,14 @@ def handle_images(extracted_images_list: list[str]):
     for url in urls_created_from_pattern:
         final_urls_list.append(url)
 
-    return final_urls_list
\ No newline at end of file
+    return final_urls_list
+
+
+def complete_images(images: list[str], extracted_images_list: list[str]) -> list[str]:
+    """
+    Descarta las URLs armadas que no existen (HEAD en paralelo), sin verificar las que ya vinieron del scrape
+    """
+    already_found = set(extracted_images_list)
+    to_check = [url for url in images if url not in already_found]
+    existing = already_found | set(get_image_prober().filter_existing(to_check))
+    return [url for url in images if url in existing]
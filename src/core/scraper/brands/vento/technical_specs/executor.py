@@ -1,9 +1,14 @@
 
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 def handle_technical_specs(content: list[str]) -> list:
     content = content.links
     for link in content:
         if "https://www.vento.com/wp-content/uploads/FT-" in link:
-            print(link)
+            logger.debug("Ficha técnica encontrada: %s", link)
             return link
     return content
\ No newline at end of file
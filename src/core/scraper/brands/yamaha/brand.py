@@ -0,0 +1,19 @@
+BRAND = {
+    "name": "yamaha",
+    "hosts": ["yamaha-motor.com.mx", "yamaha-motor.com"],
+    "site_url": "https://www.yamaha-motor.com.mx/",
+    # El handler de imágenes recibe content.images en lugar del Document completo
+    "images_input": "images",
+    # handle_yamaha(url, handle_type, content): necesita la URL para armar el patrón
+    "handler_takes_url": True,
+    "scrape": {
+        "images": {"formats": ["images"], "ready": [{"images_stable": 3}]},
+        "technical_specs": {
+            "formats": ["html"],
+            "ready": ['a[href*="/sheet/"]'],
+            # El handler solo busca el link a la ficha (/sheet/): no hace falta el resto del html
+            "include_tags": ['a[href*="/sheet/"]'],
+            "only_main_content": False,
+        },
+    },
+}
@@ -1,4 +1,12 @@
-from bs4 import BeautifulSoup
+import logging
+
+from src.core.scraper.parsing import parse_subtree
+
+logger = logging.getLogger(__name__)
+
+# Solo se parsean los links a fichas técnicas, no la página completa
+SPECS_SELECTOR = 'a[href*="/sheet/"]'
+
 def detect_url_pattern(url: str):
     """
     Detecta el patrón de las imágenes de la marca y devuelve la URL base.
@@ -9,9 +17,9 @@ def handle_technical_specs(url: str, content: list[str]) -> list:
     url_base = detect_url_pattern(url)
     html = content.html
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = parse_subtree(html, SPECS_SELECTOR)
     ficha = soup.select_one(f'a[href*="/sheet/{url_base}"]')
     content = ficha["href"] if ficha else None
 
-    print(f"La ficha técnica encontrada: {content}")
-    return content
\ No newline at end of file
+    logger.debug("La ficha técnica encontrada: %s", content)
+    return content
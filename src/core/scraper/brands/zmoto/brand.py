@@ -0,0 +1,25 @@
+BRAND = {
+    "name": "zmoto",
+    "hosts": ["zmoto.com.mx"],
+    "site_url": "https://www.zmoto.com.mx/",
+    "product_url": r"/shop/(?!category/|cart)[\w-]+-\d+$",
+    # Tienda Odoo: variantes e imágenes salen del HTML estático y de get_combination_info, sin render
+    "backend": "odoo",
+    # Reglas DOM para ModelData cuando la página no trae JSON-LD / microdata completos
+    "model_data": {
+        "base_price": "span.oe_default_price",
+        "net_price": "span.oe_currency_value",
+        "model": 'h1[itemprop="name"]',
+        "colors": {"selector": "input.js_variant_change", "attr": "title"},
+    },
+    "scrape": {
+        "images": {
+            "formats": ["html"],
+            "ready": ["input.js_variant_change"],
+            # El handler y complete_images solo leen los inputs de variantes y sus labels (VARIANTS_SELECTOR de Odoo)
+            "include_tags": ["input.js_variant_change", "input.js_product_change", "input.product_id", "input.product_template_id", "label"],
+            "only_main_content": False,
+        },
+        "technical_specs": {"formats": ["html"]},
+    },
+}
@@ -0,0 +1,247 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from src.config.settings import CACHE_DIR
+
+# TTL por defecto (segundos) y por marca. Los precios cambian más seguido que las fichas.
+DEFAULT_TTL = 6 * 60 * 60
+BRAND_TTLS = {
+    "italika": 6 * 60 * 60,
+    "auteco_tvs": 6 * 60 * 60,
+    "honda": 24 * 60 * 60,
+    "yamaha": 24 * 60 * 60,
+    "vento": 24 * 60 * 60,
+    "ryder": 12 * 60 * 60,
+    "zmoto": 12 * 60 * 60,
+    "tvs": 24 * 60 * 60,
+}
+# Al pasarse de max_disk_bytes se desaloja hasta esta fracción, para no recorrer el disco en cada set
+EVICT_TO = 0.9
+
+
+def make_cache_key(url: str, formats: list | None = None, **scrape_kwargs) -> str:
+    """ Arma una llave canónica (sha256) a partir de la petición de scrape """
+    # El orden de los formatos no cambia el resultado, el de las acciones sí
+    canonical_formats = sorted(
+        (formats or []),
+        key=lambda f: json.dumps(f, sort_keys=True, default=str),
+    )
+    payload = {
+        "url": url.strip(),
+        "formats": canonical_formats,
+        "kwargs": {key: value for key, value in scrape_kwargs.items() if value is not None},
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def serialize_document(doc: Any) -> dict:
+    """ Convierte un Document de Firecrawl en un dict serializable a JSON """
+    if hasattr(doc, "model_dump"):
+        return doc.model_dump(mode="json")
+    if hasattr(doc, "dict"):
+        # Compatibilidad con Pydantic v1
+        return json.loads(doc.json())
+    return dict(doc)
+
+
+def deserialize_document(data: dict) -> Any:
+    """ Reconstruye el Document de Firecrawl para que los handle_* lo usen sin cambios """
+    from firecrawl.v2.types import Document
+
+    try:
+        return Document.model_validate(data)
+    except AttributeError:
+        # Compatibilidad con Pydantic v1
+        return Document.parse_obj(data)
+
+
+class ScrapeCache:
+    """
+    Cache de respuestas de Firecrawl: LRU en memoria delante de archivos .json.gz en disco.
+    El tamaño en disco se lleva como contador; el recorrido inicial del directorio corre en un hilo
+    aparte para que el primer set no espere. Mientras corre un recorrido (solo uno a la vez), los
+    archivos que escriben o borran set y get se anotan y corrigen el total al terminar.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str | None = None,
+        max_memory_entries: int = 128,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        default_ttl: int = DEFAULT_TTL,
+        brand_ttls: dict | None = None,
+    ):
+        self.cache_dir = Path(cache_dir or CACHE_DIR / "firecrawl")
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.default_ttl = default_ttl
+        self.brand_ttls = {**BRAND_TTLS, **(brand_ttls or {})}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._disk_bytes: int | None = None
+        # Tamaño final de los archivos tocados durante el recorrido del directorio (None si no hay uno)
+        self._touched: dict[Path, int] | None = None
+        self._lock = threading.Lock()
+
+    def ttl_for(self, brand: str | None) -> int:
+        return self.brand_ttls.get(brand, self.default_ttl)
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _record_size(self, path: Path, old_size: int, new_size: int) -> None:
+        """ Llamar con el lock tomado """
+        if self._disk_bytes is not None:
+            self._disk_bytes += new_size - old_size
+        if self._touched is not None:
+            self._touched[path] = new_size
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def get(self, key: str) -> Any | None:
+        """ Devuelve el Document cacheado o None si no existe o expiró """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, doc = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return doc
+                del self._memory[key]
+
+        path = self._path_for(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            self._miss()
+            return None
+
+        if record.get("expires_at", 0) <= now:
+            with self._lock:
+                size = self._file_size(path)
+                path.unlink(missing_ok=True)
+                self._record_size(path, size, 0)
+            self._miss()
+            return None
+
+        doc = deserialize_document(record["document"])
+        try:
+            # Se toca el archivo para que la eviction en disco sea LRU
+            os.utime(path, None)
+        except FileNotFoundError:
+            # Otro hilo o proceso lo desalojó mientras se leía
+            self._miss()
+            return None
+        with self._lock:
+            self._remember(key, record["expires_at"], doc)
+            self.stats["disk_hits"] += 1
+        return doc
+
+    def set(self, key: str, doc: Any, url: str | None = None, brand: str | None = None) -> None:
+        """ Guarda el Document en memoria y en disco con el TTL de la marca """
+        if doc is None:
+            return
+        expires_at = time.time() + self.ttl_for(brand)
+        record = {
+            "key": key,
+            "url": url,
+            "brand": brand,
+            "stored_at": time.time(),
+            "expires_at": expires_at,
+            "document": serialize_document(doc),
+        }
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        with self._lock:
+            # Bajo el lock: dos set de la misma llave no pueden ver el mismo archivo viejo
+            old_size = self._file_size(path)
+            os.replace(tmp_path, path)
+            new_size = self._file_size(path)
+            self._remember(key, expires_at, doc)
+            self.stats["stores"] += 1
+            self._record_size(path, old_size, new_size)
+            # Un solo recorrido a la vez: el primero mide el directorio, los siguientes desalojan
+            walk = self._touched is None and (self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes)
+            if walk:
+                self._touched = {}
+            measure = walk and self._disk_bytes is None
+        if measure:
+            threading.Thread(target=self._evict_disk, name="scrape-cache-evict", daemon=True).start()
+        elif walk:
+            self._evict_disk()
+
+    def _remember(self, key: str, expires_at: float, doc: Any) -> None:
+        self._memory[key] = (expires_at, doc)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """
+        Si se pasa de max_disk_bytes, elimina los archivos menos usados hasta quedar en EVICT_TO de ese límite.
+        Quien lo llama ya marcó el recorrido (self._touched = {}).
+        """
+        sizes = {}
+        files = []
+        complete = False
+        try:
+            for path in self.cache_dir.glob("*/*.json.gz"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                sizes[path] = stat.st_size
+            total = sum(sizes.values())
+            if total > self.max_disk_bytes:
+                for _, size, path in sorted(files):
+                    with self._lock:
+                        # Los cambios de archivos van bajo el lock para que _touched quede en el orden real
+                        path.unlink(missing_ok=True)
+                        self._record_size(path, size, 0)
+                        self.stats["evictions"] += 1
+                    sizes[path] = 0
+                    total -= size
+                    if total <= self.max_disk_bytes * EVICT_TO:
+                        break
+            complete = True
+        finally:
+            with self._lock:
+                # Lo que set y get escribieron o borraron durante el recorrido manda sobre lo que vio el glob
+                sizes.update(self._touched or {})
+                # Un recorrido cortado no sirve como total: el próximo set vuelve a medir
+                self._disk_bytes = sum(sizes.values()) if complete else None
+                self._touched = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            with self._lock:
+                path.unlink(missing_ok=True)
+                self._record_size(path, 0, 0)
+        with self._lock:
+            self._disk_bytes = 0
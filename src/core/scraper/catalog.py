@@ -0,0 +1,342 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+
+from src.config.settings import DATA_DIR
+from src.core.scraper.downloader import flatten_image_urls
+from src.core.scraper.specs import SpecRecord, as_spec_records
+
+CATALOG_PATH = DATA_DIR / "catalog.sqlite3"
+# Máximo de parámetros por consulta IN (...) que aceptan todas las versiones de SQLite
+_SQL_VARIABLES = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    brand TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    model TEXT,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_models_brand_model ON models (brand, model);
+
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models (id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    UNIQUE (model_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_images_url ON images (url);
+
+CREATE TABLE IF NOT EXISTS spec_artifacts (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL UNIQUE REFERENCES models (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    content TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS spec_records (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models (id) ON DELETE CASCADE,
+    section TEXT,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    unit TEXT,
+    field TEXT,
+    number REAL
+);
+CREATE INDEX IF NOT EXISTS idx_spec_records_model ON spec_records (model_id);
+CREATE INDEX IF NOT EXISTS idx_spec_records_field ON spec_records (field, number);
+
+CREATE TABLE IF NOT EXISTS model_snapshots (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models (id) ON DELETE CASCADE,
+    base_price REAL,
+    net_price REAL,
+    discount_amount REAL,
+    model TEXT,
+    colors TEXT,
+    sha256 TEXT NOT NULL,
+    captured_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_model_snapshots_model ON model_snapshots (model_id, captured_at);
+"""
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _model_data_dict(model_data) -> dict | None:
+    """ Acepta el ModelData de pydantic (v1 o v2) o un dict ya serializado """
+    if model_data is None or isinstance(model_data, dict):
+        return model_data
+    if hasattr(model_data, "model_dump"):
+        return model_data.model_dump()
+    return model_data.dict()
+
+
+def _is_spec_records(specs) -> bool:
+    return isinstance(specs, list) and bool(specs) and all(
+        isinstance(row, SpecRecord) or (isinstance(row, list) and len(row) == len(SpecRecord._fields))
+        for row in specs
+    )
+
+
+def serialize_spec_artifact(specs) -> tuple[str, str] | None:
+    """
+    Convierte lo que devuelve el handler de ficha técnica a (kind, content):
+    - records: lista de SpecRecord (honda, italika, tvs); además se guardan fila por fila en spec_records
+    - link: URL de un PDF o página de la ficha (vento, yamaha)
+    - html: Tag o lista de Tags de bs4
+    - json: cualquier otra estructura
+    """
+    if specs is None or specs == []:
+        return None
+    if _is_spec_records(specs):
+        return "records", json.dumps([list(row) for row in specs], ensure_ascii=False)
+    if isinstance(specs, str):
+        return ("link" if specs.startswith(("http://", "https://")) else "html"), specs
+    if isinstance(specs, (list, tuple)) and all(hasattr(item, "name") and hasattr(item, "attrs") for item in specs):
+        return "html", "\n".join(str(item) for item in specs)
+    if hasattr(specs, "name") and hasattr(specs, "attrs"):
+        return "html", str(specs)
+    return "json", json.dumps(specs, ensure_ascii=False, default=str)
+
+
+class CatalogStore:
+    """
+    Catálogo local en SQLite de modelos, imágenes, fichas técnicas y snapshots de ModelData.
+    Usa WAL para que las lecturas no bloqueen al proceso que escribe, y escribe los
+    resultados en lotes: una transacción por lote en lugar de un commit por archivo.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path or CATALOG_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # Con WAL, NORMAL solo sincroniza en los checkpoints: sigue siendo seguro ante caídas del proceso
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _model_ids(self, urls: list[str]) -> dict[str, int]:
+        ids = {}
+        for chunk in _chunks(urls, _SQL_VARIABLES):
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.connection.execute(f"SELECT id, url FROM models WHERE url IN ({placeholders})", chunk):
+                ids[row["url"]] = row["id"]
+        return ids
+
+    def _latest_snapshot_hashes(self, model_ids: list[int]) -> dict[int, str]:
+        hashes = {}
+        for chunk in _chunks(model_ids, _SQL_VARIABLES):
+            placeholders = ",".join("?" * len(chunk))
+            query = f"""
+                SELECT model_id, sha256 FROM model_snapshots AS s
+                WHERE model_id IN ({placeholders})
+                  AND captured_at = (SELECT MAX(captured_at) FROM model_snapshots WHERE model_id = s.model_id)
+            """
+            for row in self.connection.execute(query, chunk):
+                hashes[row["model_id"]] = row["sha256"]
+        return hashes
+
+    def _write_batch(self, results: list[dict]) -> int:
+        now = time.time()
+        results = [result for result in results if result.get("website") and result.get("url")]
+        if not results:
+            return 0
+
+        model_rows = []
+        for result in results:
+            model_data = _model_data_dict(result.get("model")) or {}
+            model_rows.append((result["website"], result["url"], model_data.get("model"), now, now))
+
+        with self._lock, self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO models (brand, url, model, first_seen, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    brand = excluded.brand,
+                    model = COALESCE(excluded.model, models.model),
+                    updated_at = excluded.updated_at
+                """,
+                model_rows,
+            )
+            model_ids = self._model_ids([result["url"] for result in results])
+
+            # Solo se reemplazan los tipos de contenido que vinieron en el resultado (sin error)
+            image_results = [
+                (model_ids[result["url"]], flatten_image_urls(result["images"]))
+                for result in results
+                if "images" in result and "images" not in result.get("errors", {})
+            ]
+            self.connection.executemany("DELETE FROM images WHERE model_id = ?", [(model_id,) for model_id, _ in image_results])
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO images (model_id, url, position) VALUES (?, ?, ?)",
+                [(model_id, url, position) for model_id, urls in image_results for position, url in enumerate(urls)],
+            )
+
+            spec_rows = []
+            record_rows = {}
+            for result in results:
+                if "specs" not in result or "specs" in result.get("errors", {}):
+                    continue
+                artifact = serialize_spec_artifact(result["specs"])
+                if artifact is None:
+                    continue
+                kind, content = artifact
+                sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
+                spec_rows.append((model_ids[result["url"]], kind, content, sha256, now))
+                if kind == "records":
+                    record_rows[model_ids[result["url"]]] = as_spec_records(result["specs"])
+            self.connection.executemany(
+                """
+                INSERT INTO spec_artifacts (model_id, kind, content, sha256, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (model_id) DO UPDATE SET
+                    kind = excluded.kind,
+                    content = excluded.content,
+                    sha256 = excluded.sha256,
+                    updated_at = excluded.updated_at
+                WHERE spec_artifacts.sha256 != excluded.sha256
+                """,
+                spec_rows,
+            )
+            self.connection.executemany("DELETE FROM spec_records WHERE model_id = ?", [(model_id,) for model_id in record_rows])
+            self.connection.executemany(
+                "INSERT INTO spec_records (model_id, section, key, value, unit, field, number) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (model_id, *record, record.number())
+                    for model_id, records in record_rows.items()
+                    for record in records
+                ],
+            )
+
+            # Un snapshot nuevo solo si el ModelData cambió respecto al último guardado
+            snapshots = {}
+            for result in results:
+                model_data = _model_data_dict(result.get("model"))
+                if model_data is not None:
+                    snapshots[model_ids[result["url"]]] = model_data
+            latest = self._latest_snapshot_hashes(list(snapshots))
+            snapshot_rows = []
+            for model_id, model_data in snapshots.items():
+                # El origen de los campos (field_sources) no cuenta como cambio del modelo
+                tracked = {field: value for field, value in model_data.items() if field != "field_sources"}
+                sha256 = hashlib.sha256(json.dumps(tracked, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+                if latest.get(model_id) == sha256:
+                    continue
+                snapshot_rows.append((
+                    model_id,
+                    model_data.get("base_price"),
+                    model_data.get("net_price"),
+                    model_data.get("discount_amount"),
+                    model_data.get("model"),
+                    json.dumps(model_data.get("colors"), ensure_ascii=False),
+                    sha256,
+                    now,
+                ))
+            self.connection.executemany(
+                """
+                INSERT INTO model_snapshots
+                    (model_id, base_price, net_price, discount_amount, model, colors, sha256, captured_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                snapshot_rows,
+            )
+        return len(results)
+
+    def upsert_results(self, results, batch_size: int = 500) -> int:
+        """
+        Guarda resultados de ImagesProcessor.process / process_batch (acepta un iterador,
+        p. ej. directamente process_batch) en transacciones de batch_size resultados.
+        Returns:
+            count: cantidad de resultados guardados
+        """
+        return sum(self._write_batch(chunk) for chunk in _chunks(results, batch_size))
+
+    def models(self, brand: str) -> list[dict]:
+        rows = self.connection.execute("SELECT * FROM models WHERE brand = ? ORDER BY model", (brand,))
+        return [dict(row) for row in rows]
+
+    def models_missing_specs(self, brand: str) -> list[dict]:
+        """ Modelos de la marca que todavía no tienen ficha técnica guardada """
+        rows = self.connection.execute(
+            """
+            SELECT m.* FROM models AS m
+            LEFT JOIN spec_artifacts AS s ON s.model_id = m.id
+            WHERE m.brand = ? AND s.id IS NULL
+            ORDER BY m.model
+            """,
+            (brand,),
+        )
+        return [dict(row) for row in rows]
+
+    def images_for(self, url: str) -> list[str]:
+        rows = self.connection.execute(
+            "SELECT i.url FROM images AS i JOIN models AS m ON m.id = i.model_id WHERE m.url = ? ORDER BY i.position",
+            (url,),
+        )
+        return [row["url"] for row in rows]
+
+    def spec_artifact(self, url: str) -> dict | None:
+        row = self.connection.execute(
+            "SELECT s.* FROM spec_artifacts AS s JOIN models AS m ON m.id = s.model_id WHERE m.url = ?",
+            (url,),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def spec_records(self, url: str) -> list[SpecRecord]:
+        rows = self.connection.execute(
+            """
+            SELECT r.section, r.key, r.value, r.unit, r.field FROM spec_records AS r
+            JOIN models AS m ON m.id = r.model_id WHERE m.url = ? ORDER BY r.id
+            """,
+            (url,),
+        )
+        return [SpecRecord(*row) for row in rows]
+
+    def compare_field(self, field: str, brands: list[str] | None = None) -> list[dict]:
+        """ Valor numérico de un campo canónico (p. ej. displacement) para todos los modelos, entre marcas """
+        query = """
+            SELECT m.brand, m.model, m.url, r.number, r.unit FROM spec_records AS r
+            JOIN models AS m ON m.id = r.model_id
+            WHERE r.field = ? AND r.number IS NOT NULL
+        """
+        params = [field]
+        if brands:
+            query += f" AND m.brand IN ({','.join('?' * len(brands))})"
+            params.extend(brands)
+        return [dict(row) for row in self.connection.execute(query + " ORDER BY r.number", params)]
+
+    def price_history(self, url: str) -> list[dict]:
+        rows = self.connection.execute(
+            """
+            SELECT s.* FROM model_snapshots AS s JOIN models AS m ON m.id = s.model_id
+            WHERE m.url = ? ORDER BY s.captured_at
+            """,
+            (url,),
+        )
+        return [{**dict(row), "colors": json.loads(row["colors"]) if row["colors"] else None} for row in rows]
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from src.core.scraper.transport import DEFAULT_TIMEOUT, get_session
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif"}
+MANIFEST_NAME = ".downloads.json"
+HASH_INDEX_NAME = ".hashes.json"
+CHUNK_SIZE = 64 * 1024
+
+
+def flatten_image_urls(urls) -> list[str]:
+    """ Acepta lo que devuelve get_images_from_website (lista, lista de listas o None) y quita repetidos """
+    flat = []
+    seen = set()
+
+    def add(item):
+        if isinstance(item, (list, tuple, set)):
+            for sub_item in item:
+                add(sub_item)
+        elif isinstance(item, str) and item and item not in seen:
+            seen.add(item)
+            flat.append(item)
+
+    add(urls or [])
+    return flat
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _guess_extension(url: str, content_type: str | None) -> str:
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return ext
+    if content_type:
+        guessed = mimetypes.guess_extension(content_type.split(";")[0].strip())
+        if guessed in IMAGE_EXTENSIONS:
+            return guessed
+    # Si no hay extensión o viene rara, usar .jpg por defecto
+    return ".jpg"
+
+
+def _resume_validator(headers) -> str | None:
+    """ Validador para If-Range: un ETag fuerte o Last-Modified (los ETag débiles no sirven para Range) """
+    etag = headers.get("ETag") or headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified") or headers.get("last_modified")
+
+
+class HashIndex:
+    """
+    Índice sha256 -> archivo de todo el árbol de salida. Los hashes se guardan junto con
+    tamaño y mtime para no volver a leer los archivos que no cambiaron.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / HASH_INDEX_NAME
+        self._lock = threading.Lock()
+        self._files = _read_json(self.path)
+        self._by_hash = {}
+        self._refresh()
+
+    def _refresh(self) -> None:
+        files = {}
+        for file_path in self.root.rglob("*"):
+            if not file_path.is_file() or file_path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            relative = file_path.relative_to(self.root).as_posix()
+            stat = file_path.stat()
+            known = self._files.get(relative)
+            if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+                files[relative] = known
+            else:
+                files[relative] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": _file_sha256(file_path)}
+        self._files = files
+        self._by_hash = {info["sha256"]: relative for relative, info in files.items()}
+
+    def find(self, sha256: str) -> Path | None:
+        with self._lock:
+            relative = self._by_hash.get(sha256)
+        if relative and (self.root / relative).exists():
+            return self.root / relative
+        return None
+
+    def claim(self, sha256: str, file_path: Path) -> Path | None:
+        """ Registra el archivo; si otro archivo con el mismo contenido ya existe lo devuelve """
+        with self._lock:
+            relative = self._by_hash.get(sha256)
+            if relative and (self.root / relative).exists() and self.root / relative != file_path:
+                return self.root / relative
+            relative = file_path.relative_to(self.root).as_posix()
+            # El archivo puede estar reemplazando otro contenido en la misma ruta
+            previous = self._files.get(relative)
+            if previous and self._by_hash.get(previous["sha256"]) == relative:
+                del self._by_hash[previous["sha256"]]
+            stat = file_path.stat()
+            self._files[relative] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
+            self._by_hash[sha256] = relative
+            return None
+
+    def save(self) -> None:
+        with self._lock:
+            _write_json(self.path, self._files)
+
+
+class ImageDownloader:
+    """
+    Descarga imágenes en paralelo sobre la sesión compartida, escribiendo por chunks a disco.
+    - Usa ETag / Last-Modified guardados en el manifiesto para no volver a bajar lo que no cambió.
+    - No guarda dos veces el mismo contenido (sha256) dentro del árbol de salida.
+    - Retoma archivos .part con una petición Range, solo si puede mandar If-Range con el validador
+      (ETag o Last-Modified) de la respuesta que los empezó; si no, vuelve a bajar desde cero.
+    - El manifiesto se guarda a medida que terminan las descargas.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str = "downloads",
+        dedupe_root: Path | str | None = None,
+        session: requests.Session | None = None,
+        max_workers: int = 8,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.dedupe_root = Path(dedupe_root) if dedupe_root else self.output_dir
+        if not self.output_dir.resolve().is_relative_to(self.dedupe_root.resolve()):
+            raise ValueError("dedupe_root debe contener a output_dir")
+        self.session = session or get_session()
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest = _read_json(self.manifest_path)
+        self.hash_index = HashIndex(self.dedupe_root)
+        self._lock = threading.Lock()
+
+    def _conditional_headers(self, url: str) -> dict:
+        entry = self.manifest.get(url)
+        if not entry or not Path(entry["file"]).exists():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _partial_paths(self, url: str) -> tuple[Path, Path]:
+        """ .part y su validador, por hash de la URL: un parcial nunca se retoma con bytes de otra imagen """
+        url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+        return self.output_dir / f"{url_hash}.part", self.output_dir / f"{url_hash}.part.json"
+
+    def download(self, url: str, file_stem: str) -> dict:
+        """ Descarga una URL a output_dir/<file_stem><ext> """
+        part_path, validator_path = self._partial_paths(url)
+        headers = self._conditional_headers(url)
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        previous = self.manifest.get(url, {})
+        validator = _read_json(validator_path).get("validator") if resume_from else None
+        if resume_from and not headers and validator:
+            # Si el recurso cambió, If-Range hace que el servidor mande el archivo entero (200)
+            headers.update({"Range": f"bytes={resume_from}-", "If-Range": validator})
+        else:
+            resume_from = 0
+
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    return {"url": url, "file": previous["file"], "ok": True, "status": "not_modified", "sha256": previous.get("sha256")}
+                if response.status_code == 416 and resume_from:
+                    # El .part no calza con el recurso actual (p. ej. ya estaba completo): empezar de nuevo
+                    response.close()
+                    part_path.unlink(missing_ok=True)
+                    validator_path.unlink(missing_ok=True)
+                    return self.download(url, file_stem)
+                response.raise_for_status()
+
+                digest = hashlib.sha256()
+                mode = "wb"
+                if response.status_code == 206 and resume_from:
+                    mode = "ab"
+                    with open(part_path, "rb") as f:
+                        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                            digest.update(chunk)
+                else:
+                    new_validator = _resume_validator(response.headers)
+                    if new_validator:
+                        _write_json(validator_path, {"url": url, "validator": new_validator})
+                    else:
+                        validator_path.unlink(missing_ok=True)
+
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            digest.update(chunk)
+
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                extension = _guess_extension(url, response.headers.get("Content-Type"))
+        except requests.RequestException as exc:
+            # Registrar error sin detener todo el proceso; el .part queda para retomar
+            return {"url": url, "error": str(exc), "ok": False}
+
+        validator_path.unlink(missing_ok=True)
+        sha256 = digest.hexdigest()
+        file_path = self.output_dir / f"{file_stem}{extension}"
+        status = "resumed" if mode == "ab" else "downloaded"
+        existing = self.hash_index.find(sha256)
+        if existing is not None and existing != file_path:
+            part_path.unlink(missing_ok=True)
+            file_path, status = existing, "duplicate"
+        else:
+            os.replace(part_path, file_path)
+            duplicate = self.hash_index.claim(sha256, file_path)
+            if duplicate is not None:
+                file_path.unlink(missing_ok=True)
+                file_path, status = duplicate, "duplicate"
+
+        with self._lock:
+            self.manifest[url] = {
+                "file": str(file_path),
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": sha256,
+            }
+            # Una corrida cortada no vuelve a bajar lo que ya terminó
+            _write_json(self.manifest_path, self.manifest)
+        return {"url": url, "file": str(file_path), "ok": True, "status": status, "sha256": sha256}
+
+    def download_all(self, urls, base_name: str) -> list[dict]:
+        """ Descarga todas las URLs en paralelo; los archivos quedan numerados como <base_name>_<n> """
+        flat_urls = flatten_image_urls(urls)
+        jobs = [(url, f"{base_name}_{idx}") for idx, url in enumerate(flat_urls, start=1)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda job: self.download(*job), jobs))
+        self.hash_index.save()
+        return results
+
+
+def download_images(urls, base_name: str, output_dir: Path | str = "downloads", **kwargs) -> list[dict]:
+    """
+    Descarga imágenes desde una lista de URLs (p. ej. el resultado de get_images_from_website)
+    y las guarda numeradas.
+    Returns:
+        results: list[dict] con url, file, ok, status (downloaded, resumed, not_modified, duplicate) y sha256
+    """
+    return ImageDownloader(output_dir, **kwargs).download_all(urls, base_name)
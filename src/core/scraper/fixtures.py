@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+from src.config.settings import DATA_DIR
+from src.core.scraper.app import ScrapingUtils
+from src.core.scraper.cache import deserialize_document, serialize_document
+from src.core.scraper.registry import get_brands, resolve_brand
+
+FIXTURES_DIR = DATA_DIR / "fixtures"
+
+logger = logging.getLogger(__name__)
+
+
+def _format_names(formats: list | None) -> list[str]:
+    """ ["html", {"type": "json", ...}] -> ["html", "json"] """
+    return sorted({fmt.get("type") if isinstance(fmt, dict) else fmt for fmt in formats or []})
+
+
+def fixture_path(root: Path, brand: str | None, url: str, formats: list | None) -> Path:
+    """ <root>/<marca>/<slug de la url>-<hash de url y formatos>.json.gz """
+    slug = re.sub(r"[^\w-]+", "-", url.split("://", 1)[-1]).strip("-")[:80]
+    digest = hashlib.sha256(json.dumps([url, _format_names(formats)]).encode("utf-8")).hexdigest()[:10]
+    return root / (brand or "unknown") / f"{slug}-{digest}.json.gz"
+
+
+def save_fixture(root: Path | str, url: str, doc: Any, formats: list | None = None, brand: str | None = None,
+                 options: dict | None = None) -> Path:
+    """ Guarda el Document de Firecrawl (html, images, links, json, metadata) comprimido """
+    path = fixture_path(Path(root), brand, url, formats)
+    record = {
+        "url": url,
+        "brand": brand,
+        "formats": formats,
+        "options": options or {},
+        "recorded_at": time.time(),
+        "document": serialize_document(doc),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_fixture(path: Path | str) -> dict:
+    """ Lee una fixture; record["document"] queda como Document de Firecrawl """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        record = json.load(f)
+    record["document"] = deserialize_document(record["document"])
+    record["path"] = str(path)
+    return record
+
+
+def iter_fixtures(root: Path | str | None = None, brand: str | None = None) -> Iterator[dict]:
+    root = Path(root or FIXTURES_DIR)
+    pattern = f"{brand}/*.json.gz" if brand else "*/*.json.gz"
+    for path in sorted(root.glob(pattern)):
+        try:
+            yield load_fixture(path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Fixture ilegible %s: %s", path, exc)
+
+
+class RecordingScrapingUtils(ScrapingUtils):
+    """ ScrapingUtils real que además guarda cada respuesta de Firecrawl como fixture """
+
+    def __init__(self, fixtures_dir: Path | str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures_dir = Path(fixtures_dir or FIXTURES_DIR)
+
+    def _scrape(self, url: str, formats: list | None, brand: str | None, call_kwargs: dict):
+        doc = super()._scrape(url, formats, brand, call_kwargs)
+        if doc is not None:
+            options = {key: value for key, value in call_kwargs.items() if key != "timeout"}
+            path = save_fixture(self.fixtures_dir, url, doc, formats=formats, brand=brand, options=options)
+            logger.info("Fixture guardada: %s", path, extra={"brand": brand, "url": url})
+        return doc
+
+
+class ReplayScrapingUtils(ScrapingUtils):
+    """
+    Sirve las fixtures grabadas en lugar de llamar a Firecrawl (sin API key ni red).
+    Para cada URL se elige la fixture cuyos formatos cubren los pedidos; si ninguna los cubre,
+    la que más formatos comparte. Una URL sin fixture devuelve None, como un scrape vacío.
+    """
+
+    def __init__(self, fixtures_dir: Path | str | None = None, metrics=None):
+        from src.core.scraper.instrumentation import get_metrics
+        from src.core.scraper.waits import get_wait_tuner
+
+        self.fixtures_dir = Path(fixtures_dir or FIXTURES_DIR)
+        self.cache = None
+        self.wait_tuner = get_wait_tuner()
+        self.metrics = metrics or get_metrics()
+        self.fixtures: dict[str, list[dict]] = {}
+        for record in iter_fixtures(self.fixtures_dir):
+            self.fixtures.setdefault(record["url"], []).append(record)
+        self._jobs: dict[str, list[tuple]] = {}
+
+    def _scrape(self, url: str, formats: list | None, brand: str | None, call_kwargs: dict):
+        records = self.fixtures.get(url)
+        if not records:
+            logger.warning("Sin fixture para %s", url, extra={"brand": brand, "url": url})
+            return None
+        wanted = set(_format_names(formats))
+        best = max(records, key=lambda record: (wanted <= set(_format_names(record["formats"])),
+                                                len(wanted & set(_format_names(record["formats"])))))
+        return best["document"]
+
+    def get_all_urls_from_website(self, url: str):
+        """ URLs grabadas del mismo sitio (no hay map offline) """
+        brand = resolve_brand(url)
+        return [fixture_url for fixture_url in self.fixtures if resolve_brand(fixture_url) == brand]
+
+    def start_batch_scrape(self, urls: list[str], formats: list | None = None, brand: str | None = None, **scrape_kwargs) -> str:
+        job_id = f"replay-{len(self._jobs)}"
+        self._jobs[job_id] = [(url, self._scrape(url, formats, brand, {})) for url in urls]
+        return job_id
+
+    def get_batch_scrape_status(self, job_id: str, skip: int = 0):
+        data = []
+        for url, doc in self._jobs.get(job_id, []):
+            if doc is None:
+                continue
+            # FirecrawlBatchJob empareja los Documents con la URL por metadata.source_url
+            if getattr(doc.metadata, "source_url", None) is None:
+                doc = doc.model_copy(update={"metadata": doc.metadata.model_copy(update={"source_url": url})})
+            data.append(doc)
+        return SimpleNamespace(status="completed", data=data[skip:], next=None)
+
+
+def record_urls(urls: list[str], fixtures_dir: Path | str | None = None, sitio: str | None = None) -> list[Path]:
+    """
+    Graba una fixture por URL con la unión de los formatos que usan los handlers de su marca
+    (y el html para ModelData), sin pasar por los backends de API ni por el LLM.
+    """
+    from src.core.scraper.processor import MODEL_HTML_OPTIONS, merge_scrape_options
+
+    scraper = RecordingScrapingUtils(fixtures_dir, use_cache=False)
+    paths = []
+    for url in urls:
+        brand = resolve_brand(url, sitio=sitio)
+        if brand is None:
+            logger.warning("No se encontró marca para %s, se omite", url)
+            continue
+        options = merge_scrape_options(list(get_brands()[brand].get("scrape", {}).values()) + [MODEL_HTML_OPTIONS])
+        try:
+            doc = scraper.get_content_from_website(url, brand=brand, **options)
+        except Exception as exc:
+            logger.error("No se pudo grabar %s: %s", url, exc, extra={"brand": brand, "url": url})
+            continue
+        if doc is not None:
+            paths.append(fixture_path(scraper.fixtures_dir, brand, url, options["formats"]))
+    return paths
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlparse, urlunparse
+
+import requests
+
+from src.config.settings import CACHE_DIR
+from src.core.scraper.downloader import flatten_image_urls
+from src.core.scraper.transport import DEFAULT_TIMEOUT, get_session
+
+logger = logging.getLogger(__name__)
+
+IMAGE_INFO_PATH = CACHE_DIR / "image_info.json"
+IMAGE_INFO_TTL = 30 * 24 * 60 * 60
+# Bytes que se piden del inicio de la imagen; un JPEG con EXIF grande puede necesitar el segundo intento
+HEAD_BYTES = 16 * 1024
+MAX_HEAD_BYTES = 256 * 1024
+
+# Parámetros que solo invalidan caches (Odoo ?unique=, Shopify ?v=, timestamps): no cambian la imagen
+CACHE_BUSTER_PARAMS = frozenset({"unique", "v", "ver", "version", "t", "ts", "timestamp", "_", "cb", "cache", "rev", "hash"})
+# Parámetros de redimensionado de CDNs (Italika ?width=, imgix, Cloudinary, Next.js)
+SIZE_PARAMS = frozenset({"width", "height", "w", "h", "size", "resize", "fit", "crop", "quality", "q", "dpr", "auto",
+                         "format", "fm", "imwidth", "imheight", "scale"})
+# Carpetas de miniaturas o tamaños (Honda /thumbs/)
+SIZE_SEGMENTS = frozenset({"thumbs", "thumb", "thumbnail", "thumbnails", "small", "medium", "large", "resized"})
+IMAGE_SUFFIX = re.compile(r"\.(jpe?g|png|webp|gif|avif)$", re.IGNORECASE)
+# Sufijos de tamaño en el nombre: WordPress -300x200, Shopify _600x / _x600 / _grande
+SIZE_SUFFIX = re.compile(r"(-\d+x\d+|_\d*x\d+|_\d+x\d*|_(?:pico|icon|thumb|small|compact|medium|large|grande|master))$", re.IGNORECASE)
+# Odoo /web/image/.../image_1024/ y VTEX /ids/123-500-500/
+ODOO_SIZE = re.compile(r"/image_\d+(?=/|$)")
+VTEX_SIZE = re.compile(r"/ids/(\d+)-\d+-\d+(?=/)")
+# Tamaño que se puede leer de la propia URL cuando la imagen no se pudo verificar
+URL_SIZE_HINTS = (
+    re.compile(r"[-_](\d+)x(\d+)(?:\.\w+)?$"),
+    re.compile(r"/ids/\d+-(\d+)-(\d+)/"),
+    re.compile(r"/image_(\d+)(?=/|$)"),
+)
+
+
+def canonical_url(url: str) -> str:
+    """ Esquema y host en minúsculas, sin fragmento, sin parámetros de cache y con la query ordenada """
+    parsed = urlparse(url.strip())
+    query = sorted((key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                   if key.lower() not in CACHE_BUSTER_PARAMS)
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path, "", urlencode(query), ""))
+
+
+def variant_key(url: str) -> str:
+    """
+    Llave que comparten los tamaños y formatos de una misma foto: sin parámetros ni carpetas de
+    tamaño, sin sufijos -300x200 / _600x, sin extensión. Las URLs de /_next/image se agrupan con su origen.
+    """
+    parsed = urlparse(canonical_url(url))
+    params = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    if parsed.path.endswith("/_next/image") and params.get("url"):
+        return variant_key(urljoin(url, unquote(params["url"])))
+
+    path = unquote(parsed.path)
+    path = ODOO_SIZE.sub("/image", path)
+    path = VTEX_SIZE.sub(r"/ids/\1", path)
+    path = "/".join(segment for segment in path.split("/") if segment.lower() not in SIZE_SEGMENTS)
+    path = SIZE_SUFFIX.sub("", IMAGE_SUFFIX.sub("", path))
+    query = urlencode(sorted((key, value) for key, value in params.items() if key.lower() not in SIZE_PARAMS))
+    return urlunparse(("", parsed.netloc, path.lower(), "", query, ""))
+
+
+def url_size_hint(url: str) -> int:
+    """ Área (o ancho) que declara la URL (?width=, -800x600, /image_1024/); 0 si no declara nada """
+    params = {key.lower(): value for key, value in parse_qsl(urlparse(url).query)}
+    width = next((params[key] for key in ("width", "w", "imwidth") if params.get(key, "").isdigit()), None)
+    height = next((params[key] for key in ("height", "h", "imheight") if params.get(key, "").isdigit()), None)
+    if width or height:
+        return int(width or height) * int(height or width)
+    path = urlparse(url).path
+    for pattern in URL_SIZE_HINTS:
+        match = pattern.search(path)
+        if match:
+            sizes = [int(group) for group in match.groups()]
+            return sizes[0] * sizes[-1]
+    return 0
+
+
+def _jpeg_size(data: bytes) -> tuple[int, int] | None:
+    # Se recorren los segmentos hasta el primer SOF (baseline, progresivo, etc.)
+    offset = 2
+    while offset + 9 < len(data):
+        if data[offset] != 0xFF:
+            offset += 1
+            continue
+        marker = data[offset + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            offset += 1 if marker == 0xFF else 2
+            continue
+        length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    return None
+
+
+def _webp_size(data: bytes) -> tuple[int, int] | None:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def image_size(data: bytes) -> tuple[str, int, int] | None:
+    """
+    Formato y dimensiones a partir de los primeros bytes de la imagen (PNG, JPEG, GIF, WEBP, AVIF).
+    Returns:
+        (formato, ancho, alto) o None si no alcanza con esos bytes o el formato no se reconoce
+    """
+    size = None
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        fmt, size = "png", struct.unpack(">II", data[16:24])
+    elif data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        fmt, size = "gif", struct.unpack("<HH", data[6:10])
+    elif data.startswith(b"\xff\xd8"):
+        fmt, size = "jpeg", _jpeg_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        fmt, size = "webp", _webp_size(data)
+    elif data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+        # La caja ispe (image spatial extents) trae ancho y alto después de versión y flags
+        index = data.find(b"ispe")
+        fmt = "avif"
+        if index != -1 and len(data) >= index + 16:
+            size = struct.unpack(">II", data[index + 8:index + 16])
+    else:
+        return None
+    if not size:
+        return None
+    return fmt, size[0], size[1]
+
+
+class ImageDeduper:
+    """
+    Colapsa las variantes de una misma imagen (tamaños, miniaturas, formatos, cache-busters) a la de
+    mayor resolución, sin descargarlas: de cada variante se piden solo los primeros KB (GET con Range)
+    para leer formato y dimensiones. Las URLs sin variantes no generan peticiones.
+    Las dimensiones quedan en disco por URL para no volver a pedirlas.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        max_workers: int = 16,
+        timeout=DEFAULT_TIMEOUT,
+        cache_path: Path | str | None = IMAGE_INFO_PATH,
+        ttl: int = IMAGE_INFO_TTL,
+    ):
+        self.session = session or get_session()
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.ttl = ttl
+        self._info: dict[str, dict] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict]:
+        if self._info is None:
+            info = {}
+            if self.cache_path is not None:
+                try:
+                    info = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    info = {}
+            now = time.time()
+            self._info = {url: entry for url, entry in info.items() if now - entry.get("checked_at", 0) < self.ttl}
+        return self._info
+
+    def save(self) -> None:
+        """ Persiste las dimensiones si hubo cambios """
+        if self.cache_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._load())
+            self._dirty = False
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self.cache_path)
+
+    def _read_head(self, url: str, limit: int) -> tuple[int, bytes]:
+        # stream: si el servidor ignora el Range y responde 200 con la imagen completa, se corta en `limit`
+        with self.session.get(url, headers={"Range": f"bytes=0-{limit - 1}"}, stream=True,
+                              allow_redirects=True, timeout=self.timeout) as response:
+            if response.status_code not in (200, 206):
+                return response.status_code, b""
+            data = b""
+            for chunk in response.iter_content(chunk_size=min(limit, 16 * 1024)):
+                data += chunk
+                if len(data) >= limit:
+                    break
+            return response.status_code, data[:limit]
+
+    def probe(self, url: str) -> dict:
+        """ {"ok", "format", "width", "height"}; ok es False si la imagen no existe o no se pudo leer """
+        with self._lock:
+            cached = self._load().get(url)
+        if cached is not None:
+            return cached
+        info = {"ok": False, "format": None, "width": None, "height": None}
+        limit = HEAD_BYTES
+        try:
+            while True:
+                status, data = self._read_head(url, limit)
+                size = image_size(data)
+                if size is not None or len(data) < limit or limit >= MAX_HEAD_BYTES:
+                    break
+                limit *= 4
+        except requests.RequestException as exc:
+            # Un error de red no se guarda: la próxima corrida lo vuelve a intentar
+            logger.warning("No se pudo leer el encabezado de %s: %s", url, exc)
+            return info
+        info["ok"] = status in (200, 206)
+        if size is not None:
+            info["format"], info["width"], info["height"] = size
+        info["checked_at"] = time.time()
+        with self._lock:
+            self._load()[url] = info
+            self._dirty = True
+        return info
+
+    def _best(self, group: list[tuple[int, str]], infos: dict[str, dict]) -> str:
+        def score(item):
+            position, url = item
+            info = infos.get(url, {})
+            hint = url_size_hint(url)
+            area = (info.get("width") or 0) * (info.get("height") or 0)
+            # Primero las que existen y luego la resolución (leída o, si no se pudo leer, la que declara la URL).
+            # A igual resolución gana la URL sin transformaciones de tamaño y luego el orden del handler
+            return (info.get("ok", True), area or hint, hint == 0, -position)
+
+        return max(group, key=score)[1]
+
+    def dedupe(self, urls) -> list[str]:
+        """
+        Devuelve una URL canónica por imagen, en el orden en que aparece la primera de sus variantes.
+        Acepta lo mismo que download_images (lista, lista de listas o None).
+        """
+        groups: dict[str, list[tuple[int, str]]] = {}
+        for position, url in enumerate(flatten_image_urls(urls)):
+            groups.setdefault(variant_key(url), []).append((position, canonical_url(url)))
+
+        to_probe = sorted({url for group in groups.values() if len({u for _, u in group}) > 1 for _, url in group})
+        infos = {}
+        if to_probe:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                infos = dict(zip(to_probe, executor.map(self.probe, to_probe)))
+            self.save()
+
+        kept = [self._best(group, infos) for group in groups.values()]
+        return list(dict.fromkeys(kept))
+
+
+_deduper: ImageDeduper | None = None
+_deduper_lock = threading.Lock()
+
+
+def get_image_deduper() -> ImageDeduper:
+    """ Deduper compartido para reutilizar conexiones y las dimensiones ya leídas """
+    global _deduper
+    if _deduper is None:
+        with _deduper_lock:
+            if _deduper is None:
+                _deduper = ImageDeduper()
+    return _deduper
+
+
+def dedupe_images(urls) -> list[str]:
+    """ Colapsa las variantes de cada imagen a la de mayor resolución (ver ImageDeduper) """
+    return get_image_deduper().dedupe(urls)
@@ -0,0 +1,320 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config.settings import DATA_DIR
+
+METRICS_DIR = DATA_DIR / "metrics"
+# Si está definida, cada evento se agrega como una línea JSON a ese archivo mientras corre el proceso
+METRICS_EVENTS_ENV = "SCRAPER_METRICS_EVENTS"
+# Formatos de un Document de Firecrawl que se miden en bytes
+PAYLOAD_FORMATS = ("markdown", "html", "raw_html", "links", "images", "json", "screenshot", "summary")
+# Etapas cuyos bytes se reciben de Firecrawl (el cache no transfiere nada)
+TRANSFER_STAGES = ("scrape", "llm", "batch")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Atributos propios de un LogRecord; el resto viene de extra={...} y se emite como campo
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+logger = logging.getLogger(__name__)
+
+
+class StructuredFormatter(logging.Formatter):
+    """ Una línea JSON por mensaje, con los campos pasados en extra (brand, stage, url...) """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: int | str = logging.INFO, structured: bool = False) -> None:
+    """
+    Configura el logger raíz del scraper (src.*). structured=True emite JSON lines, útil para
+    corridas nocturnas cuyos logs se procesan después.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter() if structured else logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger("src")
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
+
+
+def _field(obj, name: str):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def payload_bytes(doc) -> dict[str, int]:
+    """ Bytes de cada formato presente en un Document (o en su forma dict del cache) """
+    if doc is None:
+        return {}
+    sizes = {}
+    for name in PAYLOAD_FORMATS:
+        size = _size(_field(doc, name))
+        if size:
+            sizes[name] = size
+    return sizes
+
+
+def credits_used(doc) -> float | None:
+    """ Créditos de Firecrawl que informa el Document en metadata.credits_used """
+    metadata = _field(doc, "metadata") if doc is not None else None
+    if metadata is None:
+        return None
+    credits = _field(metadata, "credits_used")
+    if credits is None and isinstance(metadata, dict):
+        credits = metadata.get("creditsUsed")
+    return credits
+
+
+def count_items(value) -> int:
+    """ Cantidad de imágenes / registros de especificaciones que devolvió un handler """
+    if value is None:
+        return 0
+    if isinstance(value, (list, tuple, set)):
+        return len(value)
+    return 1
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+
+
+class Metrics:
+    """
+    Acumula por (marca, etapa): llamadas, errores, tiempo, bytes por formato, créditos de
+    Firecrawl e items producidos. Etapas usadas en el scraper:
+    - scrape / llm: petición a Firecrawl (llm si incluye el formato json)
+    - cache: respuesta servida desde el cache local
+    - batch: Documents recibidos de un batch scrape
+    - backend: API directa de la marca (VTEX, Odoo)
+    - images / technical_specs / model_data: parseo en los handlers y extractores
+    - image_dedupe / renditions: posproceso de las imágenes
+    """
+
+    def __init__(self, events_path: Path | str | None = None):
+        self.events_path = Path(events_path) if events_path else None
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], dict] = {}
+
+    def _stat(self, brand: str, stage: str) -> dict:
+        key = (brand, stage)
+        if key not in self._stats:
+            self._stats[key] = {
+                "calls": 0,
+                "errors": 0,
+                "seconds": 0.0,
+                "max_seconds": 0.0,
+                "credits": 0.0,
+                "items": 0,
+                "bytes": {},
+            }
+        return self._stats[key]
+
+    def record(
+        self,
+        stage: str,
+        brand: str | None = None,
+        seconds: float | None = None,
+        payload: dict[str, int] | None = None,
+        credits: float | None = None,
+        items: int | None = None,
+        error: str | None = None,
+        **labels,
+    ) -> None:
+        brand = brand or "unknown"
+        with self._lock:
+            stat = self._stat(brand, stage)
+            stat["calls"] += 1
+            if error is not None:
+                stat["errors"] += 1
+            if seconds is not None:
+                stat["seconds"] += seconds
+                stat["max_seconds"] = max(stat["max_seconds"], seconds)
+            if credits:
+                stat["credits"] += credits
+            if items:
+                stat["items"] += items
+            for fmt, size in (payload or {}).items():
+                stat["bytes"][fmt] = stat["bytes"].get(fmt, 0) + size
+            if self.events_path is not None:
+                event = {
+                    "ts": round(time.time(), 3),
+                    "brand": brand,
+                    "stage": stage,
+                    "seconds": round(seconds, 4) if seconds is not None else None,
+                    "bytes": payload or None,
+                    "credits": credits,
+                    "items": items,
+                    "error": error,
+                    **labels,
+                }
+                event = {key: value for key, value in event.items() if value is not None}
+                self.events_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.events_path.open("a", encoding="utf-8") as file:
+                    file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def timer(self, stage: str, brand: str | None = None, **labels):
+        """
+        Mide una etapa. El bloque puede completar el dict entregado con payload, credits o items;
+        si el bloque lanza una excepción se registra como error y se relanza.
+        Ejemplo:
+            with metrics.timer("images", "honda", url=url) as event:
+                event["items"] = len(images)
+        """
+        event = {}
+        start = time.perf_counter()
+        try:
+            yield event
+        except Exception as exc:
+            self.record(stage, brand, seconds=time.perf_counter() - start, error=f"{type(exc).__name__}: {exc}", **{**labels, **event})
+            raise
+        self.record(stage, brand, seconds=time.perf_counter() - start, **{**labels, **event})
+
+    def summary(self) -> list[dict]:
+        """ Una fila por (marca, etapa), ordenadas de la que más tiempo consumió a la que menos """
+        with self._lock:
+            rows = [
+                {"brand": brand, "stage": stage, **{**stat, "bytes": dict(stat["bytes"])}}
+                for (brand, stage), stat in self._stats.items()
+            ]
+        for row in rows:
+            row["seconds"] = round(row["seconds"], 4)
+            row["max_seconds"] = round(row["max_seconds"], 4)
+            row["total_bytes"] = sum(row["bytes"].values())
+        return sorted(rows, key=lambda row: (-row["seconds"], row["brand"], row["stage"]))
+
+    def payload_by_brand(self) -> list[dict]:
+        """
+        Bytes recibidos de Firecrawl por marca (etapas scrape, llm y batch), en total, por formato y por
+        petición: permite comparar el tamaño de las respuestas antes y después de ajustar un perfil de scrape.
+        """
+        brands = {}
+        for row in self.summary():
+            if row["stage"] not in TRANSFER_STAGES:
+                continue
+            entry = brands.setdefault(row["brand"], {"brand": row["brand"], "requests": 0, "bytes": {}, "total_bytes": 0})
+            entry["requests"] += row["calls"] - row["errors"]
+            entry["total_bytes"] += row["total_bytes"]
+            for fmt, size in row["bytes"].items():
+                entry["bytes"][fmt] = entry["bytes"].get(fmt, 0) + size
+        for entry in brands.values():
+            entry["bytes_per_request"] = entry["total_bytes"] // entry["requests"] if entry["requests"] else 0
+        return sorted(brands.values(), key=lambda entry: (-entry["total_bytes"], entry["brand"]))
+
+    def log_payload_by_brand(self) -> None:
+        for entry in self.payload_by_brand():
+            logger.info("%s: %d peticiones, %.1f KB (%.1f KB por petición) %s", entry["brand"], entry["requests"],
+                        entry["total_bytes"] / 1024, entry["bytes_per_request"] / 1024,
+                        ", ".join(f"{fmt} {size / 1024:.1f} KB" for fmt, size in sorted(entry["bytes"].items())),
+                        extra={"brand": entry["brand"], "payload_bytes": entry["total_bytes"]})
+
+    def export_jsonl(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as file:
+            for row in self.summary():
+                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return path
+
+    def prometheus_text(self) -> str:
+        """ Formato de exposición de texto de Prometheus (para el textfile collector de node_exporter) """
+        metrics = {
+            "scraper_stage_calls_total": ("counter", "Llamadas por marca y etapa", []),
+            "scraper_stage_errors_total": ("counter", "Errores por marca y etapa", []),
+            "scraper_stage_seconds_total": ("counter", "Tiempo acumulado (s) por marca y etapa", []),
+            "scraper_stage_max_seconds": ("gauge", "Llamada más lenta (s) por marca y etapa", []),
+            "scraper_credits_total": ("counter", "Créditos de Firecrawl consumidos", []),
+            "scraper_items_total": ("counter", "Imágenes / especificaciones producidas", []),
+            "scraper_payload_bytes_total": ("counter", "Bytes recibidos por formato", []),
+            "scraper_brand_bytes_per_request": ("gauge", "Bytes promedio por petición a Firecrawl por marca", []),
+        }
+        for row in self.summary():
+            labels = {"brand": row["brand"], "stage": row["stage"]}
+            metrics["scraper_stage_calls_total"][2].append((labels, row["calls"]))
+            metrics["scraper_stage_errors_total"][2].append((labels, row["errors"]))
+            metrics["scraper_stage_seconds_total"][2].append((labels, row["seconds"]))
+            metrics["scraper_stage_max_seconds"][2].append((labels, row["max_seconds"]))
+            if row["credits"]:
+                metrics["scraper_credits_total"][2].append((labels, row["credits"]))
+            if row["items"]:
+                metrics["scraper_items_total"][2].append((labels, row["items"]))
+            for fmt, size in sorted(row["bytes"].items()):
+                metrics["scraper_payload_bytes_total"][2].append(({**labels, "format": fmt}, size))
+        for entry in self.payload_by_brand():
+            metrics["scraper_brand_bytes_per_request"][2].append(({"brand": entry["brand"]}, entry["bytes_per_request"]))
+
+        lines = []
+        for name, (metric_type, help_text, samples) in metrics.items():
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{{{_labels(**labels)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # node_exporter puede leer el archivo en cualquier momento: se escribe completo y se reemplaza
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
+
+    def export(self, directory: Path | str | None = None, name: str = "scraper") -> tuple[Path, Path]:
+        """ Escribe <name>.jsonl y <name>.prom en directory (por defecto src/data/metrics) """
+        directory = Path(directory or METRICS_DIR)
+        jsonl_path = self.export_jsonl(directory / f"{name}.jsonl")
+        prom_path = self.export_prometheus(directory / f"{name}.prom")
+        logger.info("Métricas exportadas en %s y %s", jsonl_path, prom_path)
+        return jsonl_path, prom_path
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """ Colector compartido por todo el proceso """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics(os.getenv(METRICS_EVENTS_ENV))
+    return _metrics
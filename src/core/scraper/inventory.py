@@ -0,0 +1,214 @@
+import gzip
+import json
+import logging
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+import requests
+
+from src.config.settings import DATA_DIR
+from src.core.scraper.registry import get_brand
+from src.core.scraper.transport import DEFAULT_TIMEOUT, get_session
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_DIR = DATA_DIR / "inventory"
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "_ga", "srsltid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """ Normaliza una URL para comparar: esquema/host en minúscula, sin fragmento, sin tracking y query ordenada """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower() or "https"
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunparse((scheme, host, path, "", urlencode(query), ""))
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(url: str, session: requests.Session | None = None, timeout=DEFAULT_TIMEOUT):
+    """
+    Lee un sitemap en streaming (sin cargar el XML completo) y entrega (tipo, loc, lastmod),
+    donde tipo es "sitemap" para entradas de un sitemap index y "url" para páginas.
+    """
+    session = session or get_session()
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        source = response.raw
+        is_gzip_file = url.endswith(".gz") or response.headers.get("Content-Type", "").startswith("application/x-gzip")
+        # Si el servidor ya lo manda con Content-Encoding: gzip, urllib3 lo descomprime solo
+        if is_gzip_file and "gzip" not in response.headers.get("Content-Encoding", ""):
+            source = gzip.GzipFile(fileobj=response.raw)
+        loc = lastmod = None
+        for _, element in ET.iterparse(source, events=("end",)):
+            name = _local_name(element.tag)
+            if name == "loc":
+                loc = (element.text or "").strip()
+            elif name == "lastmod":
+                lastmod = (element.text or "").strip()
+            elif name in ("url", "sitemap"):
+                if loc:
+                    yield ("url" if name == "url" else "sitemap"), loc, lastmod
+                loc = lastmod = None
+                # Se libera cada entrada ya procesada para mantener la memoria plana
+                element.clear()
+
+
+def find_sitemaps(site_url: str, session: requests.Session | None = None, timeout=DEFAULT_TIMEOUT) -> list[str]:
+    """ Busca los sitemaps declarados en robots.txt; si no hay, prueba /sitemap.xml """
+    session = session or get_session()
+    parsed = urlparse(site_url)
+    origin = f"{parsed.scheme or 'https'}://{parsed.netloc}"
+    sitemaps = []
+    try:
+        response = session.get(urljoin(origin, "/robots.txt"), timeout=timeout)
+        if response.ok:
+            for line in response.text.splitlines():
+                if line.lower().startswith("sitemap:"):
+                    sitemaps.append(line.split(":", 1)[1].strip())
+    except requests.RequestException as exc:
+        logger.warning("No se pudo leer robots.txt de %s: %s", origin, exc)
+    return sitemaps or [urljoin(origin, "/sitemap.xml")]
+
+
+class UrlInventory:
+    """
+    Inventario persistido de URLs de una marca. Cada corrida lee el sitemap (omitiendo los
+    sitemaps hijos cuyo lastmod no cambió) o, si el sitio no tiene, usa firecrawl.map;
+    luego compara contra la corrida anterior y devuelve las URLs de producto nuevas y quitadas.
+    """
+
+    def __init__(self, brand: str, root: Path | str | None = None, session: requests.Session | None = None):
+        self.brand = brand
+        self.path = Path(root or INVENTORY_DIR) / f"{brand}.json"
+        self.session = session or get_session()
+        declaration = get_brand(brand) or {}
+        self.site_url = declaration.get("site_url")
+        product_url = declaration.get("product_url")
+        self.product_pattern = re.compile(product_url) if product_url else None
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"urls": {}, "sitemaps": {}, "updated_at": None}
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.state, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def is_product_url(self, url: str) -> bool:
+        return self.product_pattern is None or bool(self.product_pattern.search(url))
+
+    def _read_sitemaps(self, site_url: str) -> dict[str, dict] | None:
+        """ Devuelve {url_canónica: {lastmod, sitemap}} o None si el sitio no tiene sitemap usable """
+        known_sitemaps = self.state["sitemaps"]
+        previous_urls = self.state["urls"]
+        found = {}
+        pending = find_sitemaps(site_url, self.session)
+        # lastmod de los sitemaps hijos por descargar: se guarda recién cuando el hijo se leyó completo
+        child_lastmods = {}
+        visited = set()
+        any_sitemap = False
+        while pending:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            try:
+                for kind, loc, lastmod in iter_sitemap(sitemap_url, self.session):
+                    any_sitemap = True
+                    if kind == "sitemap":
+                        kept = {}
+                        if lastmod and known_sitemaps.get(loc) == lastmod:
+                            kept = {url: info for url, info in previous_urls.items() if info.get("sitemap") == loc}
+                        if kept:
+                            # Sitemap hijo sin cambios: se conservan sus URLs sin volver a descargarlo
+                            found.update(kept)
+                            visited.add(loc)
+                        else:
+                            pending.append(loc)
+                            child_lastmods[loc] = lastmod
+                    else:
+                        found[canonicalize_url(loc)] = {"lastmod": lastmod, "sitemap": sitemap_url}
+            except (requests.RequestException, ET.ParseError) as exc:
+                # Un sitemap que no se pudo leer no da de baja sus URLs: se conservan las de la corrida
+                # anterior y su lastmod no se actualiza, así la próxima corrida lo vuelve a pedir
+                logger.warning("No se pudo leer el sitemap %s: %s", sitemap_url, exc)
+                for url, info in previous_urls.items():
+                    if info.get("sitemap") == sitemap_url:
+                        found.setdefault(url, info)
+                continue
+            if sitemap_url in child_lastmods:
+                known_sitemaps[sitemap_url] = child_lastmods[sitemap_url]
+        return found if any_sitemap else None
+
+    def _read_map(self, site_url: str, scraper) -> dict[str, dict]:
+        if scraper is None:
+            from src.core.scraper.app import ScrapingUtils
+            scraper = ScrapingUtils()
+        return {canonicalize_url(url): {"lastmod": None, "sitemap": None} for url in scraper.get_all_urls_from_website(site_url)}
+
+    def refresh(self, site_url: str | None = None, scraper=None) -> dict:
+        """
+        Actualiza el inventario y devuelve el diff de URLs de producto.
+        Returns:
+            diff: dict con source, added, removed y updated (lastmod distinto al guardado)
+        """
+        site_url = site_url or self.site_url
+        if not site_url:
+            raise ValueError(f"La marca {self.brand} no declara site_url; pásalo como argumento")
+
+        source = "sitemap"
+        current = self._read_sitemaps(site_url)
+        if not current:
+            source = "map"
+            current = self._read_map(site_url, scraper)
+        current = {url: info for url, info in current.items() if self.is_product_url(url)}
+
+        previous = self.state["urls"]
+        now = time.time()
+        added = sorted(url for url in current if url not in previous)
+        removed = sorted(url for url in previous if url not in current)
+        updated = sorted(
+            url for url, info in current.items()
+            if url in previous and info.get("lastmod") and info["lastmod"] != previous[url].get("lastmod")
+        )
+
+        self.state["urls"] = {
+            url: {
+                **info,
+                "first_seen": previous.get(url, {}).get("first_seen", now),
+                "last_seen": now,
+            }
+            for url, info in current.items()
+        }
+        self.state["updated_at"] = now
+        self._save()
+        return {"brand": self.brand, "source": source, "added": added, "removed": removed, "updated": updated}
+
+
+def discover_new_models(brand: str, site_url: str | None = None, scraper=None) -> dict:
+    """ Atajo: actualiza el inventario de la marca y devuelve las URLs de producto nuevas y quitadas """
+    return UrlInventory(brand).refresh(site_url, scraper=scraper)
@@ -0,0 +1,116 @@
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Orden de preferencia cuando no se indica backend. html.parser siempre está disponible.
+BACKENDS = ("selectolax", "lxml", "html.parser")
+BACKEND_ENV = "SCRAPER_HTML_BACKEND"
+
+_SIMPLE_SELECTOR = re.compile(r"^(?P<tag>[a-zA-Z][a-zA-Z0-9]*)?(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$")
+_SELECTOR_PART = re.compile(r"#([\w-]+)|\.([\w-]+)|\[\s*([\w-]+)\s*(?:([*^$]?=)\s*['\"]?([^'\"\]]*)['\"]?)?\s*\]")
+
+
+def _is_installed(backend: str) -> bool:
+    if backend == "html.parser":
+        return True
+    try:
+        if backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif backend == "lxml":
+            import lxml  # noqa: F401
+        else:
+            return False
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> list[str]:
+    return [backend for backend in BACKENDS if _is_installed(backend)]
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """ Usa el backend pedido (o el de SCRAPER_HTML_BACKEND) si está instalado; si no, el más rápido disponible """
+    backend = backend or os.getenv(BACKEND_ENV)
+    if backend:
+        if not _is_installed(backend):
+            raise ValueError(f"Backend HTML no disponible: {backend}. Disponibles: {available_backends()}")
+        return backend
+    return available_backends()[0]
+
+
+def _attr_matcher(operator: str | None, value: str):
+    if operator is None:
+        return True
+    if operator == "=":
+        return value
+    if operator == "*=":
+        return re.compile(re.escape(value))
+    if operator == "^=":
+        return re.compile("^" + re.escape(value))
+    return re.compile(re.escape(value) + "$")
+
+
+def _strainer_args(selector: str) -> tuple[str | None, dict]:
+    """ Traduce un selector simple (tag#id.clase[attr*=valor]) a los argumentos de SoupStrainer """
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if match is None:
+        raise ValueError(f"Selector no soportado para parseo parcial: {selector}")
+    attrs = {}
+    for id_value, class_value, attr, operator, value in _SELECTOR_PART.findall(match.group("rest")):
+        if id_value:
+            attrs["id"] = id_value
+        elif class_value:
+            attrs["class"] = class_value
+        else:
+            attrs[attr] = _attr_matcher(operator or None, value)
+    return match.group("tag"), attrs
+
+
+def build_strainer(css: str) -> SoupStrainer:
+    """
+    Arma un SoupStrainer a partir de un selector CSS simple o una lista separada por comas.
+    Con varios selectores con atributos distintos se filtra solo por tag (superconjunto):
+    el handler después hace su propio find sobre el árbol reducido.
+    """
+    parts = [_strainer_args(selector) for selector in css.split(",")]
+    if len(parts) == 1:
+        name, attrs = parts[0]
+        return SoupStrainer(name, attrs=attrs)
+    names = [name for name, _ in parts]
+    if None in names:
+        raise ValueError(f"Cada selector de la lista debe indicar el tag: {css}")
+    return SoupStrainer(names)
+
+
+def parse_subtree(html: str, css: str, backend: str | None = None) -> BeautifulSoup:
+    """
+    Parsea solo los nodos que coinciden con el selector (y sus hijos) y devuelve un
+    BeautifulSoup pequeño, para que los handlers sigan usando find / find_all.
+    - lxml / html.parser: SoupStrainer, no se construye el resto del árbol.
+    - selectolax: se selecciona con su parser en C y solo el HTML encontrado pasa a BeautifulSoup.
+    """
+    backend = resolve_backend(backend)
+    if not html:
+        return BeautifulSoup("", "html.parser")
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+
+        nodes = LexborHTMLParser(html).css(css)
+        selected = {node.mem_id for node in nodes}
+        fragments = []
+        emitted = set()
+        for node in nodes:
+            # Con una lista de selectores, un nodo que cumple varios aparece una vez por selector
+            if node.mem_id in emitted:
+                continue
+            emitted.add(node.mem_id)
+            # Un nodo dentro de otro ya seleccionado viene incluido en el HTML del padre
+            parent = node.parent
+            while parent is not None and parent.mem_id not in selected:
+                parent = parent.parent
+            if parent is None:
+                fragments.append(node.html)
+        return BeautifulSoup("".join(fragments), "html.parser")
+    return BeautifulSoup(html, backend, parse_only=build_strainer(css))
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
+
+from src.core.scraper.batch import AsyncScrapingUtils
+from src.core.scraper.instrumentation import count_items, get_metrics
+from src.core.scraper.processor import WANT_TO_ARTIFACT, ImagesProcessor
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin de cola entre etapas
+_DONE = None
+
+
+def parse_document(website: str, url: str, names: list[str], content) -> dict:
+    """
+    Corre en el pool de procesos: los handle_<marca> y los extractores locales de ModelData
+    sobre un Document ya descargado. Acá no hay red: el LLM, el complete_images de la marca o del
+    backend (HEAD de vento y auteco_tvs, variantes de Odoo) y el dedupe de imágenes quedan para el
+    proceso principal. Las métricas tampoco se registran acá: las registra _apply_parsed con timings.
+    Returns:
+        {"values": {nombre: resultado}, "errors": {nombre: error}, "timings": {nombre: segundos}}
+    """
+    from src.core.scraper.registry import run_handler
+    from src.core.scraper.structured_data import extract_model_fields
+
+    parsed = {"values": {}, "errors": {}, "timings": {}}
+    html = getattr(content, "html", None)
+    for name in names:
+        artifact = WANT_TO_ARTIFACT[name]
+        start = time.perf_counter()
+        try:
+            if artifact == "model_data":
+                parsed["values"][name] = extract_model_fields(html, website) if html else None
+            else:
+                parsed["values"][name] = run_handler(website, artifact, url, content, record_metrics=False)
+        except Exception as exc:
+            parsed["errors"][name] = f"{type(exc).__name__}: {exc}"
+        parsed["timings"][name] = time.perf_counter() - start
+    return parsed
+
+
+class ScrapePipeline:
+    """
+    Pipeline por etapas para corridas grandes:
+    1. fetchers async (pool de hilos, límite global y por dominio) que hacen el scrape o llaman al backend
+    2. parsers: el parseo de los handlers corre en un pool de procesos (usa todos los núcleos, sin GIL)
+    3. writer: una sola tarea que entrega cada resultado al sink, en el orden en que terminan
+    Las colas entre etapas son acotadas: si el parseo o la escritura se atrasan, los fetchers esperan
+    y la cantidad de Documents en memoria queda fija (fetchers + queue_size + parsers).
+    Si una etapa falla (p. ej. el sink no puede escribir) se cancelan las demás y run relanza el error.
+    """
+
+    def __init__(
+        self,
+        processor: ImagesProcessor | None = None,
+        fetchers: int = 16,
+        per_domain: int = 4,
+        parsers: int | None = None,
+        queue_size: int | None = None,
+    ):
+        self.processor = processor or ImagesProcessor()
+        self.fetchers = fetchers
+        self.per_domain = per_domain
+        self.parsers = parsers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * self.parsers
+        self.counts = {"results": 0, "parsed": 0, "direct": 0}
+
+    def _fetch(self, url: str, want, sitio: str | None):
+        try:
+            return self.processor._fetch(url, want, sitio)
+        except Exception as exc:
+            logger.error("Error en la URL: %s (%s)", url, exc, extra={"url": url})
+            return {"url": url, "website": None, "errors": {"process": str(exc)}}, {}, None
+
+    def _apply_parsed(self, result: dict, parsed: dict) -> dict:
+        """ Copia al resultado lo que devolvió el proceso de parseo y registra sus métricas """
+        website = result["website"]
+        for name, seconds in parsed["timings"].items():
+            stage = WANT_TO_ARTIFACT[name]
+            error = parsed["errors"].get(name)
+            value = parsed["values"].get(name)
+            items = len(value[1]) if stage == "model_data" and value else count_items(value)
+            get_metrics().record(stage, website, seconds=seconds, items=items, error=error, url=result["url"])
+            if error is not None:
+                logger.error("Error procesando %s de %s: %s", name, result["url"], error,
+                             extra={"brand": website, "stage": stage, "url": result["url"]})
+                result[name] = None
+                result["errors"][name] = error
+            elif stage != "model_data":
+                result[name] = value
+        return result
+
+    async def run(
+        self,
+        urls: Iterable[str],
+        want: set | list | None = None,
+        sink: Callable[[dict], None] | None = None,
+        sitio: str | None = None,
+    ) -> dict:
+        """
+        Procesa las URLs y entrega cada resultado (mismo formato que ImagesProcessor.process) a sink.
+        Returns:
+            counts: resultados totales, parseados en el pool y resueltos sin parseo (backend, errores)
+        """
+        loop = asyncio.get_running_loop()
+        engine = AsyncScrapingUtils(self.processor, concurrency=self.fetchers, per_domain=self.per_domain)
+        # spawn: los hijos no heredan los hilos ni los locks del proceso principal
+        pool = ProcessPoolExecutor(max_workers=self.parsers, mp_context=multiprocessing.get_context("spawn"))
+        url_queue: asyncio.Queue = asyncio.Queue()
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for url in urls:
+            url_queue.put_nowait(url)
+
+        async def fetcher():
+            while not url_queue.empty():
+                url = url_queue.get_nowait()
+                result, options_by_want, content = await engine._run_limited(url, self._fetch, url, want, sitio)
+                if content is None:
+                    self.counts["direct"] += 1
+                    await write_queue.put(result)
+                else:
+                    await parse_queue.put((result, list(options_by_want), content))
+
+        async def parser():
+            while (item := await parse_queue.get()) is not _DONE:
+                result, names, content = item
+                try:
+                    parsed = await loop.run_in_executor(pool, parse_document, result["website"], result["url"], names, content)
+                except Exception as exc:
+                    # Proceso caído o Document que no se pudo enviar: falla la URL, no la corrida
+                    parsed = {"values": {}, "errors": {name: f"{type(exc).__name__}: {exc}" for name in names},
+                              "timings": dict.fromkeys(names, 0.0)}
+                self._apply_parsed(result, parsed)
+                if "images" in names:
+                    # complete_images de la marca o del backend y el dedupe de imágenes usan HTTP: en un hilo, como el LLM
+                    await loop.run_in_executor(engine._executor, self.processor._finalize_images, result, content)
+                model_fields = parsed["values"].get("model")
+                if model_fields is not None:
+                    # Solo si faltan campos se llama al LLM (red): en un hilo, no en el pool de procesos
+                    try:
+                        result["model"] = await loop.run_in_executor(
+                            engine._executor, self.processor._complete_model_data,
+                            result["url"], result["website"], content.html, *model_fields,
+                        )
+                    except Exception as exc:
+                        result["model"] = None
+                        result["errors"]["model"] = str(exc)
+                elif "model" in names and "model" not in result["errors"]:
+                    result["model"] = None
+                if "_snapshot" in result:
+                    # El snapshot se guarda con lo parseado en el pool (escribe a disco: en un hilo)
+                    await loop.run_in_executor(engine._executor, self.processor._save_snapshot, result, names)
+                self.counts["parsed"] += 1
+                await write_queue.put(result)
+
+        async def writer():
+            while (result := await write_queue.get()) is not _DONE:
+                if sink is not None:
+                    await loop.run_in_executor(None, sink, result)
+                self.counts["results"] += 1
+
+        async def close_stages():
+            # Cierra cada etapa cuando termina la anterior
+            await asyncio.gather(*fetcher_tasks)
+            for _ in parser_tasks:
+                await parse_queue.put(_DONE)
+            await asyncio.gather(*parser_tasks)
+            await write_queue.put(_DONE)
+            await writer_task
+
+        writer_task = asyncio.create_task(writer())
+        parser_tasks = [asyncio.create_task(parser()) for _ in range(self.parsers)]
+        fetcher_tasks = [asyncio.create_task(fetcher()) for _ in range(max(1, min(self.fetchers, url_queue.qsize())))]
+        tasks = [*fetcher_tasks, *parser_tasks, writer_task, asyncio.create_task(close_stages())]
+        try:
+            # Sin supervisión, una etapa caída deja las colas llenas y el resto esperando para siempre
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in tasks:
+                if task in done and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            pool.shutdown(wait=False, cancel_futures=True)
+            engine.close()
+        return dict(self.counts)
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from src.config.settings import CACHE_DIR
+from src.core.scraper.transport import DEFAULT_TIMEOUT, get_session
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_CACHE_PATH = CACHE_DIR / "missing_urls.json"
+NEGATIVE_TTL = 7 * 24 * 60 * 60
+MISSING_STATUS = {404, 410}
+# Servidores que no aceptan HEAD: se reintenta con un GET de un solo byte
+HEAD_NOT_SUPPORTED_STATUS = {400, 403, 405, 501}
+
+
+class ImageProber:
+    """
+    Verifica en paralelo si existen URLs de imágenes armadas por patrón.
+    Usa HEAD (o un GET con Range de 1 byte si el servidor no acepta HEAD) sobre una
+    sesión compartida, y recuerda en disco las URLs que dieron 404 para no volver a pedirlas.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        max_workers: int = 16,
+        timeout=DEFAULT_TIMEOUT,
+        negative_cache_path: Path | str | None = NEGATIVE_CACHE_PATH,
+        negative_ttl: int = NEGATIVE_TTL,
+    ):
+        self.session = session or get_session()
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.negative_cache_path = Path(negative_cache_path) if negative_cache_path else None
+        self.negative_ttl = negative_ttl
+        self._missing: dict[str, float] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load_missing(self) -> dict[str, float]:
+        if self._missing is None:
+            missing = {}
+            if self.negative_cache_path is not None:
+                try:
+                    missing = json.loads(self.negative_cache_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    missing = {}
+            now = time.time()
+            self._missing = {url: ts for url, ts in missing.items() if now - ts < self.negative_ttl}
+        return self._missing
+
+    def is_known_missing(self, url: str) -> bool:
+        with self._lock:
+            return url in self._load_missing()
+
+    def _mark_missing(self, url: str) -> None:
+        with self._lock:
+            self._load_missing()[url] = time.time()
+            self._dirty = True
+
+    def save(self) -> None:
+        """ Persiste el cache negativo si hubo cambios """
+        if self.negative_cache_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._load_missing())
+            self._dirty = False
+        self.negative_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.negative_cache_path.with_suffix(".tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self.negative_cache_path)
+
+    def _request_status(self, url: str) -> int | None:
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+            if response.status_code in HEAD_NOT_SUPPORTED_STATUS:
+                response = self.session.get(
+                    url,
+                    headers={"Range": "bytes=0-0"},
+                    stream=True,
+                    allow_redirects=True,
+                    timeout=self.timeout,
+                )
+                response.close()
+            return response.status_code
+        except requests.RequestException as exc:
+            logger.warning("No se pudo verificar %s: %s", url, exc)
+            return None
+
+    def exists(self, url: str) -> bool:
+        """ True si la URL responde 200/206. Los errores de red no se guardan como 404 """
+        if self.is_known_missing(url):
+            return False
+        status = self._request_status(url)
+        if status in MISSING_STATUS:
+            self._mark_missing(url)
+        return status in (200, 206)
+
+    def _first_existing(self, base: str, extensions: tuple[str, ...]) -> str | None:
+        for extension in extensions:
+            url = f"{base}.{extension}"
+            if self.exists(url):
+                return url
+        return None
+
+    def filter_existing(self, urls: list[str]) -> list[str]:
+        """ Devuelve, en el mismo orden, solo las URLs que existen """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            checks = list(executor.map(self.exists, urls))
+        self.save()
+        return [url for url, ok in zip(urls, checks) if ok]
+
+    def resolve_extensions(self, bases: list[str], extensions: tuple[str, ...] = ("webp", "png")) -> list[str]:
+        """
+        Para cada URL sin extensión prueba las extensiones en orden y se queda con la primera que exista.
+        Las URLs base se verifican en paralelo; las extensiones de una misma base, en secuencia.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            found = list(executor.map(lambda base: self._first_existing(base, extensions), bases))
+        self.save()
+        return [url for url in found if url]
+
+
+_prober: ImageProber | None = None
+_prober_lock = threading.Lock()
+
+
+def get_image_prober() -> ImageProber:
+    """ Prober compartido para que el cache negativo y las conexiones se reutilicen entre marcas """
+    global _prober
+    if _prober is None:
+        with _prober_lock:
+            if _prober is None:
+                _prober = ImageProber()
+    return _prober
@@ -1,60 +1,153 @@
 import json
-import re
-from typing import Optional, List, Any
+import logging
+from typing import Optional, List, Dict, Any
 
 from pydantic import BaseModel, Field
 
 from src.core.scraper.app import ScrapingUtils
-from src.core.scraper.brands.vento.handle import handle_vento
-from src.core.scraper.brands.italika.handle import handle_italika
-from src.core.scraper.brands.honda.handle import handle_honda
-from src.core.scraper.brands.yamaha.handle import handle_yamaha
-from src.core.scraper.brands.ryder.handle import handle_ryder
-from src.core.scraper.brands.zmoto.handle import handle_zmoto
-from src.core.scraper.brands.tvs.handle import handle_tvs
-from src.core.scraper.brands.auteco_tvs.handle import handle_auteco_tvs
+from src.core.scraper.instrumentation import count_items, credits_used, get_metrics, payload_bytes
+from src.core.scraper.registry import get_backend, get_brand, get_handler_hook, get_scrape_options, resolve_brand, run_handler
+from src.core.scraper.snapshots import SnapshotStore, content_fingerprint, request_profile
+from src.core.scraper.specs import restore_spec_artifact
+from src.core.scraper.structured_data import ModelDataCache, derive_prices, extract_model_fields, missing_fields, parse_price
+from src.core.scraper.transport import call_with_retries
+
+logger = logging.getLogger(__name__)
 
 def check_website(url, **kwargs):
-    print("url", url)
-    if "vento.com" in url:
-        print("website: vento")
-        return "vento"
-    if "italika.mx" in url:
-        print("website: italika")
-        return "italika"
-    if "honda.mx" in url:
-        print("website: honda")
-        return "honda"
-    if "yamaha-motor" in url:
-        print("website: yamaha")
-        return "yamaha"
-    if "rydermx.com" in url :
-        print("website: ryder")
-        return "ryder"
-    if "zmoto.com.mx" in url:
-        print("website: zmoto")
-        return "zmoto"
-    if "tvsmotor.com" in url:
-        print("website: tvsmotor")
-        return "tvs"
-    if "auteco.com.co" in url:
-        sitio = kwargs.get("sitio")
-        if sitio == "victory":
-            print("website: auteco victory")
-            return "auteco_victory"
-        if sitio == "tvs":
-            print("website: auteco tvs")
-            return "auteco_tvs"
-        if sitio == "ceronte":
-            print("website: auteco ceronte")
-            return "auteco_ceronte"
-    else:
-        print("website: none")
-        return None
+    """ Devuelve el nombre de la marca registrada para la URL (None si no hay ninguna) """
+    return resolve_brand(url, sitio=kwargs.get("sitio"))
+
+MODEL_DATA_PROMPT = """
+Extract product pricing information and available colors from this page.
+Return ONLY a valid JSON object with this exact structure:
+{
+  "base_price": number or null,
+  "net_price": number or null,
+  "discount_amount": number or null,
+  "model": string or null,
+  "colors": array of strings or null
+}
+
+Rules:
+- If a value is not found, return null for that field.
+- net_price is base_price - discount_amount. If not discount_amount, net_price is base_price
+- Prices must be numbers without currency symbols, commas, or dots as thousand separators.
+- Colors must be an array of color names (e.g., ["Rojo", "Negro"]).
+- Do not include any text outside the JSON object.
+        """
+
+MODEL_DATA_OPTIONS = {
+    "formats": [{"type": "json", "prompt": MODEL_DATA_PROMPT}],
+    "actions": [
+        {"type": "scroll", "direction": "down"},  # Scroll inicial
+    ],
+    # En lugar de esperar 2 segundos fijos tras el scroll, se espera a que el HTML deje de crecer
+    "ready": [{"dom_stable": True}],
+}
+
+# ModelData se extrae primero del html (JSON-LD, microdata, reglas DOM); el LLM solo completa lo que falte.
+# Con el mismo scroll y la misma espera que la petición del LLM: los precios que se pintan en el cliente
+# tienen que estar en el html, si no casi siempre haría falta la segunda petición.
+MODEL_HTML_OPTIONS = {
+    "formats": ["html"],
+    "actions": MODEL_DATA_OPTIONS["actions"],
+    "ready": MODEL_DATA_OPTIONS["ready"],
+}
+
+
+def model_data_llm_options(fields: list[str]) -> dict:
+    """ MODEL_DATA_OPTIONS con el prompt acotado a los campos que no se encontraron en el html """
+    prompt = MODEL_DATA_PROMPT + f"\nOnly these fields are needed, return null for the rest: {', '.join(fields)}\n"
+    return {**MODEL_DATA_OPTIONS, "formats": [{"type": "json", "prompt": prompt}]}
+
+# Nombres cortos aceptados en ImagesProcessor.process -> tipo de contenido
+WANT_TO_ARTIFACT = {
+    "images": "images",
+    "specs": "technical_specs",
+    "model": "model_data",
+}
+
+
+def merge_scrape_options(options_list: list[dict]) -> dict:
+    """
+    Une las opciones de varios tipos de contenido en una sola petición:
+    unión de formatos, acciones y condiciones de listo (sin repetir) y el wait_for más alto.
+    Los filtros del perfil solo se mantienen si no le quitan contenido a ningún tipo pedido:
+    include_tags se une si todos los perfiles lo declaran (si uno necesita la página completa, no
+    se filtra) y exclude_tags se queda con los tags que todos excluyen. only_main_content se envía
+    si todos los perfiles declaran el mismo valor, o False si se mantiene include_tags y algún perfil
+    lo pide así; en otro caso queda el default de Firecrawl.
+    """
+    formats = []
+    actions = []
+    ready = []
+    seen_formats = set()
+    seen_actions = set()
+    seen_ready = set()
+    wait_for = None
+    include_tags = []
+    exclude_tags = None
+    for options in options_list:
+        for fmt in options.get("formats", []):
+            fmt_key = json.dumps(fmt, sort_keys=True)
+            if fmt_key not in seen_formats:
+                seen_formats.add(fmt_key)
+                formats.append(fmt)
+        for action in options.get("actions", []):
+            action_key = json.dumps(action, sort_keys=True)
+            if action_key not in seen_actions:
+                seen_actions.add(action_key)
+                actions.append(action)
+        for condition in options.get("ready", []):
+            condition_key = json.dumps(condition, sort_keys=True)
+            if condition_key not in seen_ready:
+                seen_ready.add(condition_key)
+                ready.append(condition)
+        if options.get("wait_for") is not None:
+            wait_for = max(wait_for or 0, options["wait_for"])
+        if not options.get("include_tags"):
+            include_tags = None
+        elif include_tags is not None:
+            include_tags += [tag for tag in options["include_tags"] if tag not in include_tags]
+        excluded = options.get("exclude_tags") or []
+        exclude_tags = [tag for tag in (excluded if exclude_tags is None else exclude_tags) if tag in excluded]
+    main_content = [options.get("only_main_content") for options in options_list]
+
+    merged = {"formats": formats}
+    if actions:
+        merged["actions"] = actions
+    if ready:
+        merged["ready"] = ready
+    if wait_for is not None:
+        merged["wait_for"] = wait_for
+    if include_tags:
+        merged["include_tags"] = include_tags
+    if exclude_tags:
+        merged["exclude_tags"] = exclude_tags
+    if include_tags and False in main_content:
+        merged["only_main_content"] = False
+    elif main_content and main_content[0] is not None and len(set(main_content)) == 1:
+        merged["only_main_content"] = main_content[0]
+    return merged
+
 
 class ImagesProcessor:
-    def __init__(self):
-        self.scraper = ScrapingUtils()
+    def __init__(
+        self,
+        snapshots: SnapshotStore | None = None,
+        model_data_cache: ModelDataCache | None = None,
+        scraper: ScrapingUtils | None = None,
+        dedupe_images: bool = True,
+    ):
+        # scraper permite inyectar otra fuente de Documents (p. ej. ReplayScrapingUtils con fixtures)
+        self.scraper = scraper or ScrapingUtils()
+        # Con snapshots, las páginas cuya huella no cambió reutilizan el resultado anterior (sin handlers ni LLM)
+        self.snapshots = snapshots
+        # Respuestas del LLM por huella del contenido: la misma página no vuelve a pagar la extracción
+        self.model_data_cache = model_data_cache or ModelDataCache()
+        # Las variantes de una misma imagen (tamaños, miniaturas, ?unique=) se reducen a la de mayor resolución
+        self.dedupe_images = dedupe_images
 
     def test_extract(self, url: str, formats: list) -> list:
         content = self.scraper.get_content_from_website(url, formats=formats, wait_for=5000)
@@ -66,6 +159,8 @@ class ImagesProcessor:
         discount_amount: Optional[float] = Field(default=None)
         model: Optional[str] = Field(default=None)
         colors: Optional[List[str]] = Field(default=None)
+        # Origen de cada campo: json_ld, microdata, opengraph, dom, derived, llm o llm_cache
+        field_sources: Optional[Dict[str, str]] = Field(default=None)
 
     def _coerce_model_payload(self, payload: dict) -> dict:
         # Normaliza números y colors para que el schema sea más robusto
@@ -73,8 +168,8 @@ class ImagesProcessor:
         for field in ["base_price", "net_price", "discount_amount"]:
             value = normalized.get(field)
             if isinstance(value, str):
-                value = re.sub(r"[^\d]", "", value)
-                normalized[field] = int(value) if value else None
+                # "$25,999.00" -> 25999, con la misma regla de separadores que los extractores locales
+                normalized[field] = parse_price(value)
         if isinstance(normalized.get("colors"), str):
             normalized["colors"] = [c.strip() for c in normalized["colors"].split(",") if c.strip()]
         return normalized
@@ -90,49 +185,154 @@ class ImagesProcessor:
             # Compatibilidad con Pydantic v1
             return self.ModelData.parse_obj(payload)
 
-    def get_model_data(self, url: str) -> "ImagesProcessor.ModelData | None":
-        default_prompt = """
-Extract product pricing information and available colors from this page.
-Return ONLY a valid JSON object with this exact structure:
-{
-  "base_price": number or null,
-  "net_price": number or null,
-  "discount_amount": number or null,
-  "model": string or null,
-  "colors": array of strings or null
-}
-
-Rules:
-- If a value is not found, return null for that field.
-- net_price is base_price - discount_amount. If not discount_amount, net_price is base_price
-- Prices must be numbers without currency symbols, commas, or dots as thousand separators.
-- Colors must be an array of color names (e.g., ["Rojo", "Negro"]).
-- Do not include any text outside the JSON object.
+    def _model_data_from_html(self, url: str, website: str | None, html: str | None) -> "ImagesProcessor.ModelData | None":
         """
-        actions = [
-            {"type": "scroll", "direction": "down"},  # Scroll inicial
-            {"type": "wait", "milliseconds": 2000},  # Esperar 2 segundos después del scroll
-        ]
-
-        content = self.scraper.get_content_from_website(
-            url,
-            formats=[{
-                "type": "json",
-                "prompt": default_prompt
-            }],
-            actions=actions,
-            wait_for=1200,
-        )
-        # TODO: Acá se debe llamar al LLM con default_prompt y luego parsear el JSON
+        Extrae ModelData del html ya scrapeado con los extractores locales y solo pide al LLM
+        los campos que falten. La respuesta del LLM queda cacheada por huella del contenido.
+        """
+        if not html:
+            return None
+        with get_metrics().timer("model_data", website, url=url) as event:
+            fields, sources = extract_model_fields(html, website)
+            event["items"] = len(sources)
+        return self._complete_model_data(url, website, html, fields, sources)
 
+    def _complete_model_data(self, url: str, website: str | None, html: str, fields: dict, sources: dict) -> "ImagesProcessor.ModelData":
+        """ Completa con el LLM (o su cache) los campos que los extractores locales no encontraron """
+        missing = missing_fields(fields)
+        if missing:
+            fingerprint = content_fingerprint(html)
+            llm_fields = self.model_data_cache.get(fingerprint)
+            source = "llm_cache"
+            if llm_fields is None or any(field not in llm_fields for field in missing):
+                content = self.scraper.get_content_from_website(url, brand=website, **model_data_llm_options(missing))
+                raw_payload = getattr(content, "json", None) if content is not None else None
+                if isinstance(raw_payload, str):
+                    raw_payload = json.loads(raw_payload)
+                llm_payload = self._coerce_model_payload(raw_payload or {})
+                llm_fields = {**(llm_fields or {}), **{field: llm_payload.get(field) for field in missing}}
+                self.model_data_cache.set(fingerprint, llm_fields)
+                source = "llm"
+            for field in missing:
+                if llm_fields.get(field) is not None:
+                    fields[field] = llm_fields[field]
+                    sources[field] = source
+            if fields.get("discount_amount") is None and llm_fields.get("discount_amount") is not None:
+                fields["discount_amount"] = llm_fields["discount_amount"]
+                sources["discount_amount"] = source
+            # Con lo que trajo el LLM se pueden derivar los precios que aún falten
+            derive_prices(fields, sources)
+        return self._parse_model_payload({**fields, "field_sources": sources})
 
-        # return content
-        if content is None:
+    def _dump_model_data(self, model_data: "ImagesProcessor.ModelData | None") -> dict | None:
+        if model_data is None:
             return None
-        raw_payload = getattr(content, "json", None)
-        if raw_payload is None:
+        try:
+            return model_data.model_dump()
+        except AttributeError:
+            # Compatibilidad con Pydantic v1
+            return model_data.dict()
+
+    def _from_backend(self, url: str, website: str | None) -> dict | None:
+        """
+        Artefactos desde la API directa de la marca (VTEX, Odoo), sin render de Firecrawl.
+        Devuelve None si la marca no tiene backend o si falla, para seguir con el scrape normal.
+        """
+        backend = get_backend(website) if website else None
+        if backend is None:
             return None
-        return self._parse_model_payload(raw_payload)
+        try:
+            with get_metrics().timer("backend", website, url=url) as event:
+                # Circuito propio del backend: si la API de la marca está caída se va directo a Firecrawl
+                # (la sesión compartida ya reintenta los errores transitorios)
+                artifacts = call_with_retries(backend.fetch_artifacts, url, brand=website, breaker=f"{website}:backend", retries=0)
+                if artifacts is not None:
+                    event["items"] = count_items(artifacts.get("images")) + count_items(artifacts.get("technical_specs"))
+            return artifacts
+        except Exception as exc:
+            logger.warning("Backend de %s falló para %s, se usa Firecrawl: %s", website, url, exc,
+                           extra={"brand": website, "stage": "backend", "url": url})
+            return None
+
+    def _dedupe_image_urls(self, urls: list | None, website: str | None, url: str) -> list | None:
+        """ Etapa posterior a los handlers de imágenes: URLs canónicas, una por imagen """
+        if not self.dedupe_images or not urls:
+            return urls
+        from src.core.scraper.image_dedupe import dedupe_images
+
+        with get_metrics().timer("image_dedupe", website, url=url) as event:
+            deduped = dedupe_images(urls)
+            event["items"] = len(deduped)
+        if len(deduped) < count_items(urls):
+            logger.debug("%d variantes de imagen descartadas en %s", count_items(urls) - len(deduped), url,
+                         extra={"brand": website, "url": url})
+        return deduped
+
+    def _complete_images(self, result: dict, content) -> None:
+        """
+        Los handlers corren sin red (pool de procesos); lo que falta lo completa la marca
+        (complete_images en handle.py, p. ej. los HEAD de vento y auteco_tvs) y luego su backend
+        """
+        website = result["website"]
+        hook = get_handler_hook(website, "complete_images")
+        if hook is not None and result["images"]:
+            try:
+                with get_metrics().timer("probe_images", website, url=result["url"]) as event:
+                    result["images"] = hook(result["images"], content)
+                    event["items"] = count_items(result["images"])
+            except Exception as exc:
+                # Sin verificar no se puede saber qué URLs armadas existen: el tipo de contenido falla
+                logger.error("Error verificando las imágenes de %s: %s", result["url"], exc,
+                             extra={"brand": website, "stage": "probe_images", "url": result["url"]})
+                result["images"] = None
+                result["errors"]["images"] = str(exc)
+                return
+        backend = get_backend(website)
+        html = getattr(content, "html", None)
+        if backend is None or not hasattr(backend, "complete_images") or not html:
+            return
+        try:
+            with get_metrics().timer("backend_images", website, url=result["url"]) as event:
+                result["images"] = backend.complete_images(result["url"], html, result["images"])
+                event["items"] = count_items(result["images"])
+        except Exception as exc:
+            # Quedan las imágenes que el handler leyó del HTML
+            logger.warning("No se pudieron completar las imágenes de %s: %s", result["url"], exc,
+                           extra={"brand": website, "stage": "backend_images", "url": result["url"]})
+
+    def _finalize_images(self, result: dict, content=None) -> dict:
+        if content is not None and "images" in result and "images" not in result["errors"]:
+            self._complete_images(result, content)
+        if result.get("images") and "images" not in result["errors"]:
+            try:
+                result["images"] = self._dedupe_image_urls(result["images"], result["website"], result["url"])
+            except Exception as exc:
+                # Sin dedupe se entregan las URLs del handler tal cual
+                logger.warning("No se pudieron deduplicar las imágenes de %s: %s", result["url"], exc,
+                               extra={"brand": result["website"], "stage": "image_dedupe", "url": result["url"]})
+        return result
+
+    def get_model_data(self, url: str, **kwargs) -> "ImagesProcessor.ModelData | None":
+        website = check_website(url, sitio=kwargs.get("sitio"))
+        artifacts = self._from_backend(url, website)
+        if artifacts is not None and artifacts.get("model_data") is not None:
+            return self._parse_model_payload(artifacts["model_data"])
+
+        # Primero un scrape sin LLM: el html alcanza para la cadena de extractores locales
+        page = self.scraper.get_content_from_website(url, brand=website, **MODEL_HTML_OPTIONS)
+        html = getattr(page, "html", None)
+        if self.snapshots is None:
+            return self._model_data_from_html(url, website, html)
+
+        fingerprint = content_fingerprint(html)
+        profile = request_profile(MODEL_HTML_OPTIONS)
+        stored = SnapshotStore.stored_model_data(self.snapshots.get(url), profile, fingerprint)
+        if stored is not None:
+            return self._parse_model_payload(stored)
+
+        model_data = self._model_data_from_html(url, website, html)
+        self.snapshots.update(url, fingerprint, profile, model_data=self._dump_model_data(model_data))
+        return model_data
 
     # TODO: Identificar qué característica está disponible para cada marca, es decir, extraer imágenes, ficha técnica o modeldata, o todos.
     def get_images_from_website(self, url: str, **kwargs) -> list:
@@ -146,38 +346,21 @@ Rules:
         """
         website = check_website(url, sitio=kwargs.get("sitio"))
 
-        if website == "vento":
-            content = self.scraper.get_content_from_website(url, formats=["images"])
-            return handle_vento("images", content.images)
-        if website == "italika":
-            content = self.scraper.get_content_from_website(url, formats=["images"])
-            return handle_italika("images", content.images)
-        if website == "honda":
-            content = self.scraper.get_content_from_website(url, formats=["images"])
-            return handle_honda("images", content.images)
-        if website == "yamaha":
-            content = self.scraper.get_content_from_website(url, formats=["images"])
-            return handle_yamaha(url, "images", content.images)
-        if website == "ryder":
-            content = self.scraper.get_content_from_website(url, formats=["html", "images"])
-            return handle_ryder("images", content)
-        if website == "zmoto":
-            content = self.scraper.get_content_from_website(url, formats=["html"])
-            return handle_zmoto("images", content)
-            # return content
-        if website == "tvsmotor":
-            content = self.scraper.get_content_from_website(url, formats=["html"])
-            return handle_tvs("images", content)
-
-        if website == "auteco_tvs":
-            content = self.scraper.get_content_from_website(url,
-                formats=["images"],
-                wait_for=5000)
-            return handle_auteco_tvs("images", content)
         if website == None:
-            print("No se encontró sitio, se cancela")
+            logger.warning("No se encontró sitio para %s, se cancela", url, extra={"url": url})
             return None
-        return content
+        options = get_scrape_options(website, "images")
+        if options is None:
+            return None
+        artifacts = self._from_backend(url, website)
+        if artifacts is not None:
+            return self._dedupe_image_urls(artifacts["images"], website, url)
+        content = self.scraper.get_content_from_website(url, brand=website, **options)
+        result = {"url": url, "website": website, "errors": {}, "images": run_handler(website, "images", url, content)}
+        self._finalize_images(result, content)
+        if "images" in result["errors"]:
+            raise ValueError(result["errors"]["images"])
+        return result["images"]
 
     def get_technical_specs(self, url: str) -> list:
         """
@@ -188,42 +371,253 @@ Rules:
             technical_specs: list[str]
         """
         website = check_website(url)
-        if website == "honda":
-            actions = [
-                {"type": "click", "selector": "a.btn-specs"},  # click para desplegar la ficha
-                {"type": "wait", "milliseconds": 1200},        # espera a que cargue el contenido
-            ]
+        options = get_scrape_options(website, "technical_specs")
+        if options is None:
+            return None
+        artifacts = self._from_backend(url, website)
+        if artifacts is not None:
+            return artifacts["technical_specs"]
+        content = self.scraper.get_content_from_website(url, brand=website, **options)
+        return run_handler(website, "technical_specs", url, content)
+
+    def _plan(self, url: str, want: set | list | None, sitio: str | None = None):
+        """
+        Resuelve la marca y las opciones de scrape de cada tipo de contenido pedido.
+        Returns:
+            result: dict base del resultado
+            options_by_want: dict nombre -> opciones de scrape (vacío si no hay nada que pedir)
+        """
+        want = set(want or WANT_TO_ARTIFACT)
+        unknown = want - set(WANT_TO_ARTIFACT)
+        if unknown:
+            raise ValueError(f"Tipos de contenido no soportados: {sorted(unknown)}")
+
+        website = check_website(url, sitio=sitio)
+        result = {"url": url, "website": website, "errors": {}}
+        if website is None:
+            logger.warning("No se encontró sitio para %s, se cancela", url, extra={"url": url})
+            return result, {}
+
+        # Solo se piden los tipos de contenido que la marca soporta
+        options_by_want = {}
+        for name in WANT_TO_ARTIFACT:
+            if name not in want:
+                continue
+            artifact = WANT_TO_ARTIFACT[name]
+            if artifact == "model_data":
+                options_by_want[name] = MODEL_HTML_OPTIONS
+            elif get_scrape_options(website, artifact) is not None:
+                options_by_want[name] = get_scrape_options(website, artifact)
+            else:
+                result[name] = None
+        return result, options_by_want
+
+    def _apply_backend(self, result: dict, options_by_want: dict, artifacts: dict) -> dict:
+        """ Llena el resultado con lo que devolvió el backend de API, con el mismo formato que _fan_out """
+        for name in options_by_want:
+            value = artifacts.get(WANT_TO_ARTIFACT[name])
+            result[name] = self._parse_model_payload(value) if name == "model" and value is not None else value
+        result["backend"] = get_brand(result["website"])["backend"]
+        return self._finalize_images(result)
+
+    def _fan_out(self, result: dict, options_by_want: dict, content) -> dict:
+        """ Reparte un mismo Document a los handlers de cada tipo de contenido pedido """
+        url = result["url"]
+        website = result["website"]
+        for name in options_by_want:
+            artifact = WANT_TO_ARTIFACT[name]
+            try:
+                if artifact == "model_data":
+                    result[name] = self._model_data_from_html(url, website, getattr(content, "html", None))
+                else:
+                    result[name] = run_handler(website, artifact, url, content)
+            except Exception as exc:
+                # Un handler que falla no debe perder el resto del contenido ya scrapeado
+                logger.error("Error procesando %s de %s: %s", name, url, exc,
+                             extra={"brand": website, "stage": artifact, "url": url})
+                result[name] = None
+                result["errors"][name] = str(exc)
+        if "images" in options_by_want:
+            self._finalize_images(result, content)
+        return result
+
+    def process(self, url: str, want: set | list | None = None, **kwargs) -> dict:
+        """
+        Hace un solo scrape por URL y reparte el Document a los handlers de la marca.
+        Args:
+            url: str
+            want: conjunto con "images", "specs" y/o "model" (por defecto los tres)
+            sitio: str, requerido para auteco (tvs, victory, ceronte)
+        Returns:
+            result: dict con url, website, images, specs, model y errors
+        """
+        result, options_by_want, content = self._fetch(url, want, kwargs.get("sitio"))
+        if content is None:
+            return result
+        self._fan_out(result, options_by_want, content)
+        if "_snapshot" in result:
+            self._save_snapshot(result, options_by_want)
+        return result
+
+    def _fetch(self, url: str, want: set | list | None = None, sitio: str | None = None):
+        """
+        Parte de red de process: plan, backend de API o un solo scrape con las opciones unidas.
+        Returns:
+            (result, options_by_want, content); content es None si result ya está completo
+            (sin marca, backend o scrape fallido). Con snapshots options_by_want trae solo lo que
+            falta parsear y, después de parsearlo, hay que llamar a _save_snapshot
+        """
+        result, options_by_want = self._plan(url, want, sitio)
+        if not options_by_want:
+            return result, options_by_want, None
+        artifacts = self._from_backend(url, result["website"])
+        if artifacts is not None:
+            return self._apply_backend(result, options_by_want, artifacts), options_by_want, None
+        if self.snapshots is not None:
+            return self._fetch_incremental(result, options_by_want)
+
+        # options_by_want sigue el orden de WANT_TO_ARTIFACT: la llave de cache no depende del set
+        try:
             content = self.scraper.get_content_from_website(
                 url,
-                formats=["html"],
-                actions=actions,
-                wait_for=1200,
+                brand=result["website"],
+                **merge_scrape_options(list(options_by_want.values())),
             )
-            return handle_honda("technical_specs", content)
-
-        if website == "vento":
-            content = self.scraper.get_content_from_website(url, formats=["links"])
-            return handle_vento("technical_specs", content)
-
-        if website == "italika":
-            content = self.scraper.get_content_from_website(url, formats=["html"])
-            return handle_italika("technical_specs", content)
-
-        if website == "yamaha":
-            content = self.scraper.get_content_from_website(url, formats=["html"])
-            return handle_yamaha(url, "technical_specs", content)
-
-        if website == "ryder":
-            content = self.scraper.get_content_from_website(url, formats=["html"])
-            return handle_ryder("technical_specs", content)
-
-        if website == "zmoto":
-            content = self.scraper.get_content_from_website(url, formats=["html"])
-            return handle_zmoto("technical_specs", content)
-
-        if website == "tvs":
-            content = self.scraper.get_content_from_website(url,
-            formats=["html"],
-            wait_for=5000)
-            return handle_tvs("technical_specs", content)
-        return content
\ No newline at end of file
+        except Exception as exc:
+            return self._scrape_failed(result, options_by_want, exc), options_by_want, None
+        if content is None:
+            return self._scrape_failed(result, options_by_want, ValueError("Firecrawl no devolvió el documento")), options_by_want, None
+        return result, options_by_want, content
+
+    def _scrape_failed(self, result: dict, options_by_want: dict, exc: Exception) -> dict:
+        """ Un scrape que falla (después de los reintentos) queda en errors y no corta el recorrido de URLs """
+        logger.error("Error en el scrape de %s: %s", result["url"], exc,
+                     extra={"brand": result["website"], "stage": "scrape", "url": result["url"]})
+        for name in options_by_want:
+            result[name] = None
+        result["errors"]["scrape"] = str(exc)
+        return result
+
+    def _fetch_incremental(self, result: dict, options_by_want: dict):
+        """
+        Parte de red del modo con snapshots: se scrapea la página sin el formato json (LLM) y se
+        compara su huella con la guardada para el mismo perfil de petición. Lo que no cambió se copia
+        del snapshot al resultado; ModelData solo se vuelve a extraer cuando la página cambió o no
+        hay uno previo. Después de parsear lo que falta hay que llamar a _save_snapshot.
+        Returns:
+            (result, to_run, content); to_run son los tipos de contenido que quedan por parsear y
+            content es None si no queda ninguno (el snapshot ya quedó guardado) o si falló el scrape
+        """
+        url = result["url"]
+        website = result["website"]
+        page_options = [options for name, options in options_by_want.items() if name != "model"]
+        html_options = MODEL_HTML_OPTIONS if "model" in options_by_want else {"formats": ["html"]}
+        request_options = merge_scrape_options(page_options + [html_options])
+        profile = request_profile(request_options)
+        try:
+            content = self.scraper.get_content_from_website(url, brand=website, **request_options)
+        except Exception as exc:
+            return self._scrape_failed(result, options_by_want, exc), options_by_want, None
+        fingerprint = content_fingerprint(getattr(content, "html", None))
+        snapshot = self.snapshots.get(url)
+        result["unchanged"] = self.snapshots.is_unchanged(url, fingerprint, profile)
+
+        stored = SnapshotStore.stored_results(snapshot, profile, fingerprint)
+        stored_model = SnapshotStore.stored_model_data(snapshot, profile, fingerprint) if "model" in options_by_want else None
+        to_run = {}
+        for name, options in options_by_want.items():
+            if name == "model" and stored_model is not None:
+                result["model"] = self._parse_model_payload(stored_model)
+            elif name != "model" and name in stored:
+                # El snapshot es JSON: los SpecRecord vuelven como listas
+                result[name] = restore_spec_artifact(stored[name]) if name == "specs" else stored[name]
+            else:
+                to_run[name] = options
+        # Se quita en _save_snapshot: no llega al resultado final
+        result["_snapshot"] = {"fingerprint": fingerprint, "profile": profile}
+        if not to_run:
+            return self._save_snapshot(result, to_run), to_run, None
+        return result, to_run, content
+
+    def _save_snapshot(self, result: dict, parsed_names) -> dict:
+        """ Guarda en el snapshot lo que se parseó sin errores y deja en changes los cambios de ModelData """
+        state = result.pop("_snapshot")
+        new_results = {name: result[name] for name in parsed_names if name != "model" and name not in result["errors"]}
+        model_data = None
+        if "model" in parsed_names and "model" not in result["errors"]:
+            model_data = self._dump_model_data(result.get("model"))
+        result["changes"] = self.snapshots.update(
+            result["url"], state["fingerprint"], state["profile"], results=new_results, model_data=model_data,
+        )
+        return result
+
+    async def process_many(
+        self,
+        urls: list[str],
+        want: set | list | None = None,
+        concurrency: int = 16,
+        per_domain: int = 4,
+        **kwargs,
+    ):
+        """
+        Corre process sobre muchas URLs en paralelo y entrega los resultados a medida que terminan.
+        Args:
+            urls: list[str]
+            want: igual que en process
+            concurrency: máximo de URLs en vuelo
+            per_domain: máximo de URLs en vuelo por dominio
+        Returns:
+            async iterator de dicts con el mismo formato que process
+        """
+        from src.core.scraper.batch import AsyncScrapingUtils
+
+        engine = AsyncScrapingUtils(self, concurrency=concurrency, per_domain=per_domain)
+        try:
+            async for result in engine.process_many(urls, want, **kwargs):
+                yield result
+        finally:
+            engine.close()
+
+    def process_batch(self, urls: list[str], want: set | list | None = None, job_name: str = "batch", **kwargs):
+        """
+        Procesa muchas URLs con jobs de batch scrape de Firecrawl (uno por marca).
+        Entrega cada resultado apenas Firecrawl completa su Document. El id del job queda
+        guardado en disco: si la corrida se interrumpe, repetir la llamada con el mismo
+        job_name retoma el job sin volver a procesar lo ya entregado.
+        Args:
+            urls: list[str]
+            want: igual que en process
+            job_name: nombre con el que se persiste el estado del job
+        Returns:
+            iterator de dicts con el mismo formato que process
+        """
+        from src.core.scraper.batch_job import FirecrawlBatchJob
+
+        groups = {}
+        for url in urls:
+            result, options_by_want = self._plan(url, want, kwargs.get("sitio"))
+            if not options_by_want:
+                yield result
+                continue
+            website = result["website"]
+            # Las marcas con backend de API no necesitan job de Firecrawl
+            artifacts = self._from_backend(url, website)
+            if artifacts is not None:
+                yield self._apply_backend(result, options_by_want, artifacts)
+                continue
+            if website not in groups:
+                groups[website] = (merge_scrape_options(list(options_by_want.values())), {})
+            groups[website][1][url] = (result, options_by_want)
+
+        for website, (options, planned) in groups.items():
+            job = FirecrawlBatchJob(self.scraper, f"{job_name}-{website}")
+            for url, content in job.run(list(planned), **options):
+                get_metrics().record("batch", website, payload=payload_bytes(content), credits=credits_used(content), url=url)
+                # Queda en cache para que un process() posterior no vuelva a scrapear
+                self.scraper.remember_content(url, content, brand=website, **options)
+                result, options_by_want = planned[url]
+                yield self._fan_out(result, options_by_want, content)
+            for url in job.missing:
+                result, _ = planned[url]
+                result["errors"]["scrape"] = "Firecrawl no devolvió el documento"
+                yield result
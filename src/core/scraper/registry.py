@@ -0,0 +1,176 @@
+import importlib
+import re
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from src.core.scraper.instrumentation import count_items, get_metrics
+
+BRANDS_DIR = Path(__file__).resolve().parent / "brands"
+BRANDS_PACKAGE = "src.core.scraper.brands"
+BACKENDS_PACKAGE = "src.core.scraper.backends"
+
+_brands: dict[str, dict] | None = None
+_hosts: dict[str, list[str]] = {}
+_handlers: dict[str, object] = {}
+_backends: dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def _load_brands() -> dict[str, dict]:
+    """
+    Lee la declaración BRAND de cada brands/<marca>/brand.py. Solo se importan estas
+    declaraciones (dicts); los handlers y sus dependencias se importan recién al usarse.
+    """
+    global _brands
+    if _brands is not None:
+        return _brands
+    with _lock:
+        if _brands is not None:
+            return _brands
+        brands = {}
+        hosts = {}
+        for declaration in sorted(BRANDS_DIR.glob("*/brand.py")):
+            module = importlib.import_module(f"{BRANDS_PACKAGE}.{declaration.parent.name}.brand")
+            brand = module.BRAND
+            brands[brand["name"]] = brand
+            for host in brand.get("hosts", []):
+                hosts.setdefault(host.lower(), []).append(brand["name"])
+        _hosts.clear()
+        _hosts.update(hosts)
+        _brands = brands
+    return _brands
+
+
+def get_brands() -> dict[str, dict]:
+    return _load_brands()
+
+
+def get_brand(name: str) -> dict | None:
+    return _load_brands().get(name)
+
+
+def _hostname(url: str) -> str:
+    if "://" not in url:
+        url = f"https://{url}"
+    return (urlparse(url).hostname or "").lower()
+
+
+def resolve_brand(url: str, sitio: str | None = None) -> str | None:
+    """
+    Devuelve el nombre de la marca para una URL. Busca el host y luego sus dominios padre
+    (mexico.tvsmotor.com -> tvsmotor.com), cada paso es una búsqueda en un dict.
+    Si varias marcas comparten host (auteco.com.co) se elige por el parámetro sitio; sin él se
+    infiere de la URL (ver infer_sitio). Una marca sin sitio en un host compartido no gana por
+    defecto: solo se elige si su regex product_url coincide con la URL.
+    """
+    _load_brands()
+    labels = _hostname(url).split(".")
+    for idx in range(len(labels) - 1):
+        candidates = _hosts.get(".".join(labels[idx:]))
+        if not candidates:
+            continue
+        if len(candidates) == 1 and get_brand(candidates[0]).get("sitio") is None:
+            return candidates[0]
+        for name in candidates:
+            brand_sitio = get_brand(name).get("sitio")
+            if brand_sitio is not None and brand_sitio == sitio:
+                return name
+        if sitio is None:
+            return _brand_from_path(url, candidates)
+        return None
+    return None
+
+
+def _brand_from_path(url: str, candidates: list[str]) -> str | None:
+    """
+    Entre marcas que comparten host, la única cuya regex product_url coincide con la URL o,
+    si ninguna declara regex, la única cuyo sitio aparece como palabra del path
+    (/moto-tvs-ntorq-125/p -> tvs).
+    """
+    path = urlparse(url if "://" in url else f"https://{url}").path
+    matches = [name for name in candidates if get_brand(name).get("product_url") and re.search(get_brand(name)["product_url"], path)]
+    if not matches:
+        words = set(re.split(r"[/\-_.]+", path.lower()))
+        matches = [name for name in candidates if get_brand(name).get("sitio") and get_brand(name)["sitio"].lower() in words]
+    return matches[0] if len(matches) == 1 else None
+
+
+def infer_sitio(url: str) -> str | None:
+    """ El sitio de la marca que corresponde a la URL (None si el host no necesita sitio) """
+    brand = get_brand(resolve_brand(url) or "")
+    return brand.get("sitio") if brand else None
+
+
+def get_handler(name: str):
+    """ Importa brands/<marca>/handle.py la primera vez que se usa y devuelve handle_<marca> """
+    handler = _handlers.get(name)
+    if handler is None:
+        module = importlib.import_module(f"{BRANDS_PACKAGE}.{name}.handle")
+        handler = getattr(module, f"handle_{name}")
+        _handlers[name] = handler
+    return handler
+
+
+def get_handler_hook(name: str, hook: str):
+    """
+    Función opcional que brands/<marca>/handle.py expone junto a handle_<marca>, o None.
+    complete_images(images, content) -> list verifica por HTTP lo que el handler armó sin red.
+    """
+    get_handler(name)
+    return getattr(importlib.import_module(f"{BRANDS_PACKAGE}.{name}.handle"), hook, None)
+
+
+def get_backend(name: str):
+    """
+    Backend de API directa que declara la marca ("backend" en brand.py), importado al primer uso.
+    Cada backend expone fetch_artifacts(url, brand, session) -> dict | None con las llaves
+    images, technical_specs y model_data, en las mismas formas que devuelven los handlers.
+    Opcionalmente expone complete_images(url, html, images, session) -> list: lo que el handler no
+    puede resolver sin red (p. ej. las variantes de Odoo por color), aplicado después del handler.
+    """
+    brand = get_brand(name)
+    backend_name = brand.get("backend") if brand else None
+    if backend_name is None:
+        return None
+    backend = _backends.get(backend_name)
+    if backend is None:
+        backend = importlib.import_module(f"{BACKENDS_PACKAGE}.{backend_name}")
+        _backends[backend_name] = backend
+    return backend
+
+
+def get_scrape_options(name: str, handle_type: str) -> dict | None:
+    """
+    Perfil de scrape que la marca declara para un tipo de contenido: formats, actions, ready/wait_for
+    y los filtros de Firecrawl (include_tags, exclude_tags, only_main_content) que achican la respuesta
+    """
+    brand = get_brand(name)
+    if brand is None:
+        return None
+    return brand.get("scrape", {}).get(handle_type)
+
+
+def run_handler(name: str, handle_type: str, url: str, content, record_metrics: bool = True):
+    """
+    Llama al handle_<marca> con el formato de entrada que declara la marca.
+    El tiempo de parseo y la cantidad de items quedan en las métricas (etapa = tipo de contenido),
+    salvo con record_metrics=False: el pool de procesos devuelve sus tiempos y los registra el proceso principal.
+    """
+    brand = get_brand(name)
+    handler = get_handler(name)
+    handler_input = content
+    if handle_type == "images" and brand.get("images_input") == "images":
+        handler_input = content.images
+    if not record_metrics:
+        return _call_handler(brand, handler, handle_type, url, handler_input)
+    with get_metrics().timer(handle_type, name, url=url) as event:
+        result = _call_handler(brand, handler, handle_type, url, handler_input)
+        event["items"] = count_items(result)
+    return result
+
+
+def _call_handler(brand: dict, handler, handle_type: str, url: str, handler_input):
+    if brand.get("handler_takes_url"):
+        return handler(url, handle_type, handler_input)
+    return handler(handle_type, handler_input)
@@ -0,0 +1,251 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from src.core.scraper.downloader import IMAGE_EXTENSIONS, _file_sha256, _read_json, _write_json
+from src.core.scraper.instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".renditions.json"
+# Tamaños que publica el marketplace: lado mayor en px, sin agrandar imágenes más chicas
+DEFAULT_RENDITIONS = (
+    {"name": "large", "max_size": 1600, "format": "webp", "quality": 82},
+    {"name": "medium", "max_size": 800, "format": "webp", "quality": 80},
+    {"name": "thumb", "max_size": 320, "format": "webp", "quality": 75},
+)
+FORMAT_EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg", "png": ".png", "avif": ".avif"}
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parse_renditions(value: str) -> list[dict]:
+    """ "large:1600:webp:82,thumb:320:jpeg" -> lista de renditions (formato y calidad opcionales) """
+    renditions = []
+    for item in value.split(","):
+        parts = item.strip().split(":")
+        if len(parts) < 2:
+            raise ValueError(f"Rendition inválida: {item!r} (se espera nombre:lado[:formato[:calidad]])")
+        rendition = {"name": parts[0], "max_size": int(parts[1]), "format": parts[2] if len(parts) > 2 else "webp"}
+        if len(parts) > 3:
+            rendition["quality"] = int(parts[3])
+        renditions.append(rendition)
+    return renditions
+
+
+def rendition_path(output_dir: Path, sha256: str, rendition: dict) -> Path:
+    """
+    <output_dir>/<ab>/<sha256>/<nombre>-<lado>[-q<calidad>].<ext>: la ruta depende del contenido de
+    la imagen fuente y de la configuración, así que si existe no hace falta volver a codificarla.
+    """
+    quality = f"-q{rendition['quality']}" if rendition.get("quality") else ""
+    file_name = f"{rendition['name']}-{rendition['max_size']}{quality}{FORMAT_EXTENSIONS[rendition['format']]}"
+    return output_dir / sha256[:2] / sha256 / file_name
+
+
+def _save_image(image, path: Path, rendition: dict) -> int:
+    from PIL import Image
+
+    fmt = rendition["format"]
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        # JPEG no tiene transparencia: se compone sobre blanco
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+        image = background
+    options = {"quality": rendition.get("quality", 85)}
+    if fmt == "jpeg":
+        options.update(optimize=True, progressive=True)
+    elif fmt == "webp":
+        options["method"] = 4
+    elif fmt == "png":
+        options = {"optimize": True}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    image.save(tmp_path, format=fmt.upper(), **options)
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+def render_image(source: str, sha256: str, renditions: list[dict], output_dir: str) -> dict:
+    """
+    Corre en el pool de procesos: decodifica la imagen una sola vez y genera las renditions que
+    faltan, de la más grande a la más chica (cada una se reduce desde la anterior).
+    Returns:
+        {"renditions": {nombre: {file, bytes, width, height}}, "width", "height"}
+    """
+    from PIL import Image, ImageOps
+
+    output_dir = Path(output_dir)
+    rendered = {}
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        width, height = image.size
+        current = image
+        for rendition in sorted(renditions, key=lambda item: item["max_size"], reverse=True):
+            if max(current.size) > rendition["max_size"]:
+                current = current.copy()
+                current.thumbnail((rendition["max_size"], rendition["max_size"]), Image.Resampling.LANCZOS)
+            path = rendition_path(output_dir, sha256, rendition)
+            size = _save_image(current, path, rendition)
+            rendered[rendition["name"]] = {"file": str(path), "bytes": size, "width": current.width, "height": current.height}
+    return {"renditions": rendered, "width": width, "height": height}
+
+
+class ImageRenditions:
+    """
+    Genera las renditions (tamaños y formatos) de las imágenes descargadas en un pool de procesos.
+    - Las salidas van por sha256 del archivo fuente: una imagen que no cambió no se vuelve a codificar,
+      aunque se haya descargado a otra ruta o con otro nombre.
+    - El manifiesto guarda, por ruta fuente, tamaño, mtime y sha256 para no volver a leer los archivos
+      que no cambiaron, y por sha256 las renditions generadas con sus bytes.
+    Requiere Pillow (opcional para el resto del scraper).
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str = "renditions",
+        renditions: list[dict] | tuple = DEFAULT_RENDITIONS,
+        workers: int | None = None,
+    ):
+        if not pillow_available():
+            raise RuntimeError("Las renditions requieren Pillow: pip install Pillow")
+        unknown = {rendition["format"] for rendition in renditions} - set(FORMAT_EXTENSIONS)
+        if unknown:
+            raise ValueError(f"Formatos no soportados: {sorted(unknown)} (opciones: {', '.join(FORMAT_EXTENSIONS)})")
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.renditions = [dict(rendition) for rendition in renditions]
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest = _read_json(self.manifest_path)
+        self.manifest.setdefault("sources", {})
+        self.manifest.setdefault("images", {})
+        self._lock = threading.Lock()
+
+    def _source_sha256(self, path: Path) -> str:
+        """ sha256 del archivo fuente, sin releerlo si tamaño y mtime no cambiaron """
+        stat = path.stat()
+        key = str(path.resolve())
+        known = self.manifest["sources"].get(key)
+        if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+            return known["sha256"]
+        sha256 = _file_sha256(path)
+        self.manifest["sources"][key] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
+        return sha256
+
+    def _missing(self, sha256: str) -> list[dict]:
+        return [rendition for rendition in self.renditions if not rendition_path(self.output_dir, sha256, rendition).exists()]
+
+    def _collect(self, sources) -> dict[str, tuple[Path, int]]:
+        """ sha256 -> (archivo fuente, bytes); acepta rutas, carpetas o el resultado de download_images """
+        by_hash = {}
+        for source in sources:
+            sha256 = None
+            if isinstance(source, dict):
+                if not source.get("ok") or not source.get("file"):
+                    continue
+                sha256 = source.get("sha256")
+                source = source["file"]
+            path = Path(source)
+            paths = sorted(p for p in path.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS) if path.is_dir() else [path]
+            for file_path in paths:
+                if self.output_dir.resolve() in file_path.resolve().parents:
+                    continue
+                try:
+                    file_hash = sha256 if sha256 and len(paths) == 1 else self._source_sha256(file_path)
+                    by_hash.setdefault(file_hash, (file_path, file_path.stat().st_size))
+                except OSError as exc:
+                    logger.warning("No se pudo leer %s: %s", file_path, exc)
+        return by_hash
+
+    def render_all(self, sources, brand: str | None = None) -> dict:
+        """
+        Genera las renditions que falten para todas las imágenes fuente.
+        Args:
+            sources: rutas de archivos o carpetas, o el resultado de download_images
+            brand: marca para las métricas
+        Returns:
+            report: imágenes (rendered, cached, failed), bytes de las fuentes y de cada rendition,
+            bytes_saved (fuentes contra la rendition más grande) y results por imagen
+        """
+        by_hash = self._collect(sources)
+        report = {"images": len(by_hash), "rendered": 0, "cached": 0, "failed": 0,
+                  "source_bytes": 0, "rendition_bytes": {}, "bytes_saved": 0, "results": []}
+        pending = {}
+        for sha256, (path, size) in by_hash.items():
+            missing = self._missing(sha256)
+            if missing:
+                pending[sha256] = (path, missing)
+            else:
+                report["cached"] += 1
+                report["results"].append({"source": str(path), "sha256": sha256, "status": "cached"})
+
+        if pending:
+            # spawn: los hijos no heredan los hilos ni los locks del proceso principal
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending)), mp_context=context) as pool:
+                futures = {
+                    pool.submit(render_image, str(path), sha256, missing, str(self.output_dir)): (sha256, path, time.perf_counter())
+                    for sha256, (path, missing) in pending.items()
+                }
+                for future in as_completed(futures):
+                    sha256, path, started = futures[future]
+                    try:
+                        rendered = future.result()
+                    except Exception as exc:
+                        # Imagen corrupta o formato que Pillow no lee: falla esa imagen, no la corrida
+                        logger.warning("No se pudieron generar las renditions de %s: %s", path, exc, extra={"brand": brand})
+                        get_metrics().record("renditions", brand, seconds=time.perf_counter() - started, error=str(exc), file=str(path))
+                        report["failed"] += 1
+                        report["results"].append({"source": str(path), "sha256": sha256, "status": "failed", "error": str(exc)})
+                        continue
+                    get_metrics().record("renditions", brand, seconds=time.perf_counter() - started,
+                                         items=len(rendered["renditions"]), file=str(path))
+                    with self._lock:
+                        entry = self.manifest["images"].setdefault(sha256, {"renditions": {}})
+                        entry.update(width=rendered["width"], height=rendered["height"])
+                        entry["renditions"].update(rendered["renditions"])
+                    report["rendered"] += 1
+                    report["results"].append({"source": str(path), "sha256": sha256, "status": "rendered"})
+
+        self._add_bytes(report, by_hash)
+        with self._lock:
+            _write_json(self.manifest_path, self.manifest)
+        logger.info("Renditions: %d generadas, %d sin cambios, %d con error; %d bytes ahorrados",
+                    report["rendered"], report["cached"], report["failed"], report["bytes_saved"], extra={"brand": brand})
+        return report
+
+    def _add_bytes(self, report: dict, by_hash: dict) -> None:
+        largest = max(self.renditions, key=lambda rendition: rendition["max_size"])
+        for sha256, (_, source_bytes) in by_hash.items():
+            sizes = {}
+            for rendition in self.renditions:
+                path = rendition_path(self.output_dir, sha256, rendition)
+                if path.exists():
+                    sizes[rendition["name"]] = path.stat().st_size
+            if largest["name"] not in sizes:
+                continue
+            report["source_bytes"] += source_bytes
+            for name, size in sizes.items():
+                report["rendition_bytes"][name] = report["rendition_bytes"].get(name, 0) + size
+            report["bytes_saved"] += source_bytes - sizes[largest["name"]]
+
+
+def render_images(sources, output_dir: Path | str = "renditions", brand: str | None = None, **kwargs) -> dict:
+    """
+    Genera las renditions de imágenes ya descargadas (p. ej. el resultado de download_images).
+    Returns:
+        report: ver ImageRenditions.render_all
+    """
+    return ImageRenditions(output_dir, **kwargs).render_all(sources, brand=brand)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from src.config.settings import DATA_DIR
+
+SNAPSHOTS_DIR = DATA_DIR / "snapshots"
+PRICE_FIELDS = ("base_price", "net_price", "discount_amount")
+TRACKED_FIELDS = PRICE_FIELDS + ("model", "colors")
+
+_NOISE_PATTERN = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+_TAG_PATTERN = re.compile(r"<(/?[a-zA-Z][\w-]*)([^>]*)>")
+_KEPT_ATTR_PATTERN = re.compile(r"\b(src|href|content|value)\s*=\s*(['\"])(.*?)\2", re.IGNORECASE | re.DOTALL)
+_SPACES_PATTERN = re.compile(r"\s+")
+
+
+def _normalize_tag(match: re.Match) -> str:
+    # Se conservan solo los atributos con contenido (imágenes, links, precios en meta/inputs);
+    # ids, clases y tokens de sesión cambian en cada render y no indican un cambio real
+    kept = " ".join(f"{name.lower()}={value}" for name, _, value in _KEPT_ATTR_PATTERN.findall(match.group(2)))
+    return f"<{match.group(1).lower()} {kept}>" if kept else f"<{match.group(1).lower()}>"
+
+
+def content_fingerprint(html: str | None) -> str | None:
+    """ Huella sha256 del contenido visible de la página (sin scripts, estilos ni atributos volátiles) """
+    if not html:
+        return None
+    normalized = _NOISE_PATTERN.sub("", html)
+    normalized = _TAG_PATTERN.sub(_normalize_tag, normalized)
+    normalized = _SPACES_PATTERN.sub(" ", normalized).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def request_profile(options: dict) -> str:
+    """
+    Identifica la petición de la que sale el html (acciones, esperas, include_tags...): el mismo
+    sitio pedido con otro perfil da otra huella aunque la página no haya cambiado.
+    Los formatos no cuentan, no cambian el html.
+    """
+    relevant = {key: value for key, value in options.items() if key != "formats" and value is not None}
+    raw = json.dumps(relevant, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def diff_model_data(previous: dict | None, current: dict | None) -> list[dict]:
+    """ Compara dos ModelData (como dict) y devuelve un evento por campo que cambió """
+    previous = previous or {}
+    current = current or {}
+    changes = []
+    for field in TRACKED_FIELDS:
+        old, new = previous.get(field), current.get(field)
+        if field == "colors":
+            old_set, new_set = set(old or []), set(new or [])
+            if old_set != new_set:
+                changes.append({
+                    "field": field,
+                    "added": sorted(new_set - old_set),
+                    "removed": sorted(old_set - new_set),
+                })
+        elif old != new:
+            changes.append({"field": field, "old": old, "new": new})
+    return changes
+
+
+class SnapshotStore:
+    """
+    Guarda por URL de modelo la huella del contenido scrapeado, el último ModelData y los
+    resultados de los handlers. Si la huella no cambió, el resultado guardado se reutiliza.
+    Las huellas y los resultados van por perfil de petición (request_profile): process con
+    distintos want y get_model_data piden el html de formas distintas y no se pisan entre sí.
+    Los cambios reales (precio, descuento, colores) se agregan a events.jsonl.
+    """
+
+    def __init__(self, root: Path | str | None = None):
+        self.root = Path(root or SNAPSHOTS_DIR)
+        self.events_path = self.root / "events.jsonl"
+        self._lock = threading.Lock()
+
+    def _path_for(self, url: str) -> Path:
+        key = hashlib.sha1(url.strip().encode("utf-8")).hexdigest()
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, url: str) -> dict | None:
+        try:
+            return json.loads(self._path_for(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def stored_results(snapshot: dict | None, profile: str, fingerprint: str | None) -> dict:
+        """ Resultados guardados para ese perfil si su huella no cambió ({} si cambió o no hay) """
+        entry = (snapshot or {}).get("profiles", {}).get(profile)
+        if fingerprint is None or entry is None or entry.get("fingerprint") != fingerprint:
+            return {}
+        return entry.get("results", {})
+
+    @staticmethod
+    def stored_model_data(snapshot: dict | None, profile: str, fingerprint: str | None) -> dict | None:
+        """ ModelData guardado si se extrajo de esta misma huella con este perfil """
+        snapshot = snapshot or {}
+        if fingerprint is None or snapshot.get("model_fingerprints", {}).get(profile) != fingerprint:
+            return None
+        return snapshot.get("model_data")
+
+    def is_unchanged(self, url: str, fingerprint: str | None, profile: str) -> bool:
+        entry = (self.get(url) or {}).get("profiles", {}).get(profile)
+        return fingerprint is not None and entry is not None and entry.get("fingerprint") == fingerprint
+
+    def update(
+        self,
+        url: str,
+        fingerprint: str | None,
+        profile: str,
+        results: dict | None = None,
+        model_data: dict | None = None,
+    ) -> list[dict]:
+        """
+        Guarda el nuevo estado de la URL para el perfil de petición y devuelve los eventos de cambio
+        del ModelData. results se combina con lo ya guardado del perfil, para no perder tipos de
+        contenido no pedidos esta vez.
+        """
+        now = time.time()
+        with self._lock:
+            snapshot = self.get(url) or {"url": url, "model_data": None, "price_history": []}
+            profiles = snapshot.setdefault("profiles", {})
+            entry = profiles.get(profile)
+            if entry is None or entry.get("fingerprint") != fingerprint:
+                # La página cambió: los resultados guardados con este perfil ya no valen
+                entry = {"fingerprint": fingerprint, "results": {}}
+            entry["updated_at"] = now
+            entry["results"].update(results or {})
+            profiles[profile] = entry
+            events = []
+            if model_data is not None:
+                previous = snapshot.get("model_data")
+                changes = diff_model_data(previous, model_data) if previous is not None else []
+                events = [{"url": url, "at": now, **change} for change in changes]
+                if previous is None or any(change["field"] in PRICE_FIELDS for change in changes):
+                    snapshot["price_history"].append({"at": now, **{field: model_data.get(field) for field in PRICE_FIELDS}})
+                snapshot["model_data"] = model_data
+                # Solo vale para la huella de la que salió: las de otros perfiles pueden ser de antes
+                snapshot["model_fingerprints"] = {profile: fingerprint}
+
+            snapshot["updated_at"] = now
+
+            path = self._path_for(url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            # default=str: resultados como Tags de bs4 se guardan como su HTML
+            tmp_path.write_text(json.dumps(snapshot, ensure_ascii=False, default=str), encoding="utf-8")
+            os.replace(tmp_path, path)
+
+            if events:
+                with open(self.events_path, "a", encoding="utf-8") as f:
+                    for event in events:
+                        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        return events
@@ -0,0 +1,227 @@
+import re
+import unicodedata
+from typing import NamedTuple
+
+from src.core.scraper.parsing import parse_subtree
+
+# Sinónimos comunes (ya normalizados: minúsculas, sin acentos) -> campo canónico
+CANONICAL_FIELDS = {
+    "displacement": ("cilindrada", "desplazamiento", "displacement", "cilindrada (cc)"),
+    "power": ("potencia", "potencia maxima", "max power", "maximum power", "potencia max"),
+    "torque": ("torque", "torque maximo", "par maximo", "max torque", "maximum torque"),
+    "weight": ("peso", "peso seco", "peso en seco", "peso neto", "kerb weight", "peso en orden de marcha"),
+    "fuel_capacity": ("capacidad de tanque", "capacidad del tanque", "tanque de combustible", "fuel tank capacity"),
+    "top_speed": ("velocidad maxima", "top speed", "max speed"),
+    "engine": ("motor", "tipo de motor", "engine", "engine type"),
+    "transmission": ("transmision", "caja de cambios", "transmission", "gear box"),
+    "starter": ("arranque", "sistema de arranque", "starting system"),
+    "seat_height": ("altura del asiento", "altura de asiento", "seat height"),
+    "front_brake": ("freno delantero", "front brake"),
+    "rear_brake": ("freno trasero", "rear brake"),
+    "front_tire": ("llanta delantera", "neumatico delantero", "front tyre"),
+    "rear_tire": ("llanta trasera", "neumatico trasero", "rear tyre"),
+}
+
+# Sinónimos propios de cada marca, además de los comunes
+BRAND_SYNONYMS = {
+    "honda": {
+        "displacement": ("desplazamiento (cm3)",),
+        "fuel_capacity": ("capacidad de combustible",),
+    },
+    "italika": {
+        "fuel_capacity": ("capacidad tanque", "capacidad de gasolina"),
+        "power": ("potencia neta",),
+    },
+    "tvs": {
+        "displacement": ("bore x stroke / displacement",),
+        "fuel_capacity": ("fuel tank", "tanque"),
+        "weight": ("peso bruto",),
+    },
+}
+
+# Unidades reconocidas (normalizadas) tras el número; la primera forma es la canónica
+UNITS = {
+    "cc": ("cc", "cm3", "cm³", "c.c."),
+    "hp": ("hp",),
+    "ps": ("ps", "cv"),
+    "kw": ("kw",),
+    "nm": ("nm", "n.m", "n-m", "n·m"),
+    "kgfm": ("kgf.m", "kgf-m", "kgfm"),
+    "kg": ("kg", "kgs"),
+    "l": ("l", "lts", "litros", "lt"),
+    "km/h": ("km/h", "kph"),
+    "mm": ("mm",),
+    "rpm": ("rpm",),
+}
+_UNIT_ALIASES = {alias: unit for unit, aliases in UNITS.items() for alias in aliases}
+_VALUE_UNIT_PATTERN = re.compile(
+    r"^\s*(?P<number>\d+(?:[.,]\d+)*)\s*(?P<unit>"
+    + "|".join(re.escape(alias) for alias in sorted(_UNIT_ALIASES, key=len, reverse=True))
+    + r")(?![a-z])",
+    re.IGNORECASE,
+)
+_KEY_VALUE_TEXT = re.compile(r"^\s*([^:]{2,60}?)\s*:\s*(.+)$", re.DOTALL)
+_SECTION_CLASS = re.compile(r"title|header|heading|accordion-button|tab", re.IGNORECASE)
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6", "caption", "summary", "legend"}
+_INLINE = {"span", "b", "strong", "em", "i", "small", "sup", "sub", "br", "p", "label", "img"}
+_SPACES = re.compile(r"\s+")
+
+
+class SpecRecord(NamedTuple):
+    section: str | None
+    key: str
+    value: str
+    unit: str | None
+    field: str | None
+
+    def number(self) -> float | None:
+        """
+        Valor numérico del registro cuando trae unidad (p. ej. "149.4 cc" -> 149.4).
+        Igual que parse_price, un separador seguido de exactamente tres dígitos es de miles:
+        "9.000 rpm" -> 9000, "1.250.000" -> 1250000, "12,5 l" -> 12.5.
+        """
+        if self.unit is None:
+            return None
+        match = re.match(r"\d+(?:[.,]\d+)*", self.value)
+        if match is None:
+            return None
+        raw = match.group(0)
+        last_separator = max(raw.rfind("."), raw.rfind(","))
+        if last_separator != -1 and len(raw) - last_separator - 1 != 3:
+            raw = re.sub(r"[.,]", "", raw[:last_separator]) + "." + raw[last_separator + 1:]
+        else:
+            raw = re.sub(r"[.,]", "", raw)
+        try:
+            return float(raw)
+        except ValueError:
+            return None
+
+
+def normalize_key(key: str) -> str:
+    key = unicodedata.normalize("NFKD", key).encode("ascii", "ignore").decode("ascii")
+    return _SPACES.sub(" ", key).strip().strip(":").strip().lower()
+
+
+def _synonyms_for(brand: str | None) -> dict[str, str]:
+    synonyms = {alias: field for field, aliases in CANONICAL_FIELDS.items() for alias in aliases}
+    for field, aliases in BRAND_SYNONYMS.get(brand, {}).items():
+        synonyms.update({alias: field for alias in aliases})
+    return synonyms
+
+
+def split_value_unit(value: str) -> tuple[str, str | None]:
+    """ "150 cc" -> ("150", "cc"); los valores sin unidad conocida quedan igual """
+    match = _VALUE_UNIT_PATTERN.match(value)
+    if match is None:
+        return value, None
+    unit = _UNIT_ALIASES[match.group("unit").lower()]
+    rest = value[match.end():].strip()
+    return (f"{match.group('number')} {rest}".strip() if rest else match.group("number")), unit
+
+
+def _text(node) -> str:
+    return _SPACES.sub(" ", node.get_text(" ", strip=True)).strip()
+
+
+def _is_inline(node) -> bool:
+    """ Elemento que solo contiene texto o etiquetas de formato (una celda de etiqueta o valor) """
+    return node.name in _INLINE | {"div", "dt", "dd", "td", "th"} and all(child.name in _INLINE for child in node.find_all(True))
+
+
+def _is_section(node) -> bool:
+    if node.name in _HEADINGS:
+        return True
+    classes = " ".join(node.get("class", []))
+    return bool(classes) and bool(_SECTION_CLASS.search(classes)) and not node.find(["tr", "dt", "li"])
+
+
+def _pairs(container):
+    """
+    Recorre el contenedor en orden y entrega (sección, clave, valor). Soporta las formas que
+    usan los sitios: tablas (th/td), listas de definición (dt/dd), textos "Clave: valor" y
+    filas de dos elementos hoja (etiqueta / valor).
+    """
+    section = None
+    consumed = set()
+    for node in container.find_all(True):
+        if id(node) in consumed:
+            continue
+        if _is_section(node):
+            section = _text(node) or section
+            continue
+        if node.name == "tr":
+            cells = [_text(cell) for cell in node.find_all(["th", "td"])]
+            cells = [cell for cell in cells if cell]
+            if len(cells) >= 2:
+                yield section, cells[0], " ".join(cells[1:])
+            consumed.update(id(child) for child in node.find_all(True))
+        elif node.name == "dt":
+            value = node.find_next_sibling("dd")
+            if value is not None:
+                yield section, _text(node), _text(value)
+                consumed.add(id(value))
+                consumed.update(id(child) for child in value.find_all(True))
+        else:
+            children = [child for child in node.find_all(True, recursive=False) if _text(child)]
+            if len(children) == 2 and node.name not in ("table", "tbody", "thead", "dl") and all(map(_is_inline, children)):
+                key, value = _text(children[0]), _text(children[1])
+                if key and value and len(key) <= 60:
+                    yield section, key, value
+                    consumed.update(id(child) for child in node.find_all(True))
+                    continue
+            if not node.find(True):
+                match = _KEY_VALUE_TEXT.match(_text(node))
+                if match:
+                    yield section, match.group(1), match.group(2)
+
+
+def build_spec_records(pairs, brand: str | None = None) -> list[SpecRecord]:
+    """ Normaliza pares (sección, clave, valor) de cualquier origen (HTML o API) a SpecRecord """
+    synonyms = _synonyms_for(brand)
+    records = []
+    seen = set()
+    for section, key, value in pairs:
+        key = key.strip().rstrip(":").strip()
+        value = _SPACES.sub(" ", value).strip()
+        if not key or not value or (section, key) in seen:
+            continue
+        seen.add((section, key))
+        value, unit = split_value_unit(value)
+        records.append(SpecRecord(section, key, value, unit, synonyms.get(normalize_key(key))))
+    return records
+
+
+def extract_spec_records(container, brand: str | None = None) -> list[SpecRecord]:
+    """ Convierte un contenedor de ficha técnica (Tag de bs4) en registros (sección, clave, valor, unidad, campo) """
+    return build_spec_records(_pairs(container), brand)
+
+
+def extract_specs(html: str | None, css: str, brand: str | None = None) -> list[SpecRecord]:
+    """
+    Parsea solo los contenedores del selector, extrae los registros y libera el árbol
+    de inmediato: al handler (y al batch) solo le quedan tuplas pequeñas, no Tags.
+    """
+    if not html:
+        return []
+    soup = parse_subtree(html, css)
+    try:
+        records = []
+        for container in soup.select(css):
+            records.extend(extract_spec_records(container, brand))
+        return records
+    finally:
+        soup.decompose()
+
+
+def as_spec_records(rows) -> list[SpecRecord]:
+    """ Reconstruye los SpecRecord guardados como listas (JSON de snapshots) """
+    return [row if isinstance(row, SpecRecord) else SpecRecord(*row) for row in rows or []]
+
+
+def restore_spec_artifact(specs):
+    """ Specs leídos de un snapshot: las filas de SpecRecord vuelven a ser SpecRecord, lo demás queda igual """
+    if isinstance(specs, list) and specs and all(
+        isinstance(row, (list, SpecRecord)) and len(row) == len(SpecRecord._fields) for row in specs
+    ):
+        return as_spec_records(specs)
+    return specs
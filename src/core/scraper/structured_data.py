@@ -0,0 +1,278 @@
+import json
+import os
+import re
+from pathlib import Path
+
+from src.config.settings import CACHE_DIR
+from src.core.scraper.registry import get_brand
+
+MODEL_FIELDS = ("base_price", "net_price", "discount_amount", "model", "colors")
+# Campos que, si faltan después de los extractores locales, justifican llamar al LLM.
+# discount_amount no está: sin descuento en la página es normal que quede vacío.
+REQUIRED_FIELDS = ("base_price", "net_price", "model", "colors")
+MODEL_DATA_CACHE_DIR = CACHE_DIR / "model_data"
+
+_JSON_LD_PATTERN = re.compile(
+    r"<script[^>]+type\s*=\s*['\"]application/ld\+json['\"][^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+# Etiquetas con property (OpenGraph); name= no, que también lo llevan <meta name> e <input name>
+_META_TAG_PATTERN = re.compile(
+    r"<(?P<tag>[a-zA-Z][\w-]*)(?P<attrs>[^>]*\bproperty\s*=[^>]*)>",
+    re.IGNORECASE,
+)
+_PRODUCT_ITEMTYPE = re.compile(r"schema\.org/Product(?:Group|Model)?/?$", re.IGNORECASE)
+_ATTR_PATTERN = re.compile(r"([\w:-]+)\s*=\s*(['\"])(.*?)\2", re.DOTALL)
+_LIST_PRICE_TYPES = ("listprice", "strikethroughprice", "msrp")
+
+
+def parse_price(value) -> float | int | None:
+    """
+    Convierte "$ 25,999.00", "8.999.900" o 25999 en número.
+    Un separador seguido de exactamente tres dígitos se toma como separador de miles.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    cleaned = re.sub(r"[^\d.,]", "", str(value))
+    if not cleaned or not re.search(r"\d", cleaned):
+        return None
+    last_separator = max(cleaned.rfind("."), cleaned.rfind(","))
+    if last_separator != -1 and len(cleaned) - last_separator - 1 != 3:
+        integer, decimals = cleaned[:last_separator], cleaned[last_separator + 1:]
+        number = float(re.sub(r"[.,]", "", integer or "0") + "." + decimals)
+    else:
+        number = float(re.sub(r"[.,]", "", cleaned))
+    return int(number) if number.is_integer() else number
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _has_type(node: dict, *types: str) -> bool:
+    return any(str(node_type).split("/")[-1] in types for node_type in _as_list(node.get("@type")))
+
+
+def _iter_json_ld_nodes(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        for key in ("@graph", "mainEntity", "itemListElement"):
+            if key in data:
+                yield from _iter_json_ld_nodes(data[key])
+
+
+def _set(fields: dict, sources: dict, field: str, value, source: str) -> None:
+    """ Solo llena campos vacíos: el primer extractor que encuentra un valor gana """
+    if value in (None, "", []) or fields.get(field) not in (None, []):
+        return
+    fields[field] = value
+    sources[field] = source
+
+
+def _colors_from(values) -> list[str]:
+    colors = []
+    for value in values:
+        for color in _as_list(value):
+            for part in str(color).split(","):
+                part = part.strip()
+                if part and part not in colors:
+                    colors.append(part)
+    return colors
+
+
+def _offer_prices(offers) -> tuple:
+    """ Devuelve (precio de lista, precio de venta) de un Offer / AggregateOffer de schema.org """
+    base_price = net_price = None
+    for offer in _as_list(offers):
+        if not isinstance(offer, dict):
+            continue
+        for spec in _as_list(offer.get("priceSpecification")):
+            if not isinstance(spec, dict):
+                continue
+            price_type = str(spec.get("priceType", "")).split("/")[-1].lower()
+            if price_type in _LIST_PRICE_TYPES:
+                base_price = base_price or parse_price(spec.get("price"))
+            else:
+                net_price = net_price or parse_price(spec.get("price"))
+        net_price = net_price or parse_price(offer.get("price") or offer.get("lowPrice"))
+        if "offers" in offer:
+            nested_base, nested_net = _offer_prices(offer["offers"])
+            base_price, net_price = base_price or nested_base, net_price or nested_net
+    return base_price, net_price
+
+
+def extract_json_ld(html: str, fields: dict, sources: dict) -> None:
+    """ schema.org Product / ProductGroup embebido como JSON-LD (VTEX, Odoo, Shopify...) """
+    for raw in _JSON_LD_PATTERN.findall(html):
+        try:
+            data = json.loads(raw.strip())
+        except ValueError:
+            continue
+        for node in _iter_json_ld_nodes(data):
+            if not _has_type(node, "Product", "ProductGroup"):
+                continue
+            variants = [variant for variant in _as_list(node.get("hasVariant")) if isinstance(variant, dict)]
+            _set(fields, sources, "model", node.get("name"), "json_ld")
+            _set(fields, sources, "colors", _colors_from([node.get("color")] + [v.get("color") for v in variants]), "json_ld")
+            base_price, net_price = _offer_prices(node.get("offers") or [v.get("offers") for v in variants])
+            _set(fields, sources, "base_price", base_price, "json_ld")
+            _set(fields, sources, "net_price", net_price, "json_ld")
+
+
+def _itemprop_value(node) -> str | None:
+    if node.name in ("meta", "link"):
+        value = node.get("content") or node.get("href")
+    else:
+        value = node.get("content") or node.get_text(" ", strip=True)
+    return value.strip() or None if value else None
+
+
+def _product_props(product, prop: str, own: bool = False) -> list[str]:
+    """
+    Valores de itemprop dentro del item Product. own=True solo toma las propiedades del propio
+    Product (no las de un item anidado: el name de un Offer, una marca o un producto relacionado).
+    """
+    values = []
+    for node in product.find_all(attrs={"itemprop": re.compile(rf"(^|\s){prop}(\s|$)", re.IGNORECASE)}):
+        if own and node.find_parent(attrs={"itemscope": True}) is not product:
+            continue
+        value = _itemprop_value(node)
+        if value:
+            values.append(value)
+    return values
+
+
+def extract_microdata(html: str, fields: dict, sources: dict) -> None:
+    """
+    Microdata del item schema.org/Product (itemscope / itemtype) y OpenGraph de producto
+    (product:price:amount, og:title). Las propiedades de otros items (BreadcrumbList,
+    Organization) no cuentan.
+    """
+    from src.core.scraper.parsing import parse_subtree
+
+    soup = parse_subtree(html, "[itemscope]")
+    try:
+        product = soup.find(attrs={"itemscope": True, "itemtype": _PRODUCT_ITEMTYPE})
+        if product is not None:
+            _set(fields, sources, "model", next(iter(_product_props(product, "name", own=True)), None), "microdata")
+            _set(fields, sources, "net_price", parse_price(next(iter(_product_props(product, "price")), None)), "microdata")
+            _set(fields, sources, "colors", _colors_from(_product_props(product, "color")), "microdata")
+    finally:
+        soup.decompose()
+
+    found = {}
+    for match in _META_TAG_PATTERN.finditer(html):
+        attrs = {name.lower(): value for name, _, value in _ATTR_PATTERN.findall(match.group("attrs"))}
+        key, value = attrs.get("property"), attrs.get("content")
+        if key and value:
+            found.setdefault(key.lower(), []).append(value)
+
+    for key in ("product:price:amount", "og:price:amount"):
+        _set(fields, sources, "net_price", parse_price(next(iter(found.get(key, [])), None)), "opengraph")
+    _set(fields, sources, "colors", _colors_from(found.get("product:color", [])), "opengraph")
+    title = next(iter(found.get("og:title", [])), None)
+    if title:
+        # "Moto FT150 | Italika" -> "Moto FT150"
+        _set(fields, sources, "model", re.split(r"\s+[|–-]\s+", title)[0].strip(), "opengraph")
+
+
+def extract_dom_rules(html: str, brand: str | None, fields: dict, sources: dict) -> None:
+    """
+    Reglas por marca declaradas en brand.py ("model_data": campo -> selector, o
+    {"selector": ..., "attr": ...}). Solo se parsean los nodos de esos selectores.
+    """
+    rules = (get_brand(brand) or {}).get("model_data") if brand else None
+    if not rules:
+        return
+    from src.core.scraper.parsing import parse_subtree
+
+    rules = {field: rule if isinstance(rule, dict) else {"selector": rule} for field, rule in rules.items()}
+    soup = parse_subtree(html, ", ".join(rule["selector"] for rule in rules.values()))
+    try:
+        for field, rule in rules.items():
+            nodes = soup.select(rule["selector"])
+            values = [
+                (node.get(rule["attr"]) if rule.get("attr") else node.get_text(" ", strip=True)) for node in nodes
+            ]
+            values = [value for value in values if value]
+            if not values:
+                continue
+            if field == "colors":
+                _set(fields, sources, field, _colors_from(values), "dom")
+            elif field in ("base_price", "net_price", "discount_amount"):
+                _set(fields, sources, field, parse_price(values[0]), "dom")
+            else:
+                _set(fields, sources, field, values[0], "dom")
+    finally:
+        soup.decompose()
+
+
+def derive_prices(fields: dict, sources: dict) -> None:
+    """
+    Completa precios con las reglas del prompt: net = base - descuento; sin descuento, net = base.
+    base solo se deriva de net si el descuento se conoce: un net sin base puede ser un precio rebajado
+    cuyo precio de lista no se encontró, y ese campo debe quedar faltante para que lo busque el LLM.
+    """
+    base_price, net_price, discount = fields.get("base_price"), fields.get("net_price"), fields.get("discount_amount")
+    if base_price is not None and net_price is None:
+        _set(fields, sources, "net_price", base_price - (discount or 0), "derived")
+    elif net_price is not None and base_price is None and discount is not None:
+        _set(fields, sources, "base_price", net_price + discount, "derived")
+    elif base_price is not None and net_price is not None and discount is None and base_price > net_price:
+        _set(fields, sources, "discount_amount", base_price - net_price, "derived")
+
+
+def extract_model_fields(html: str | None, brand: str | None = None) -> tuple[dict, dict]:
+    """
+    Cadena de extractores locales sobre el html ya scrapeado: JSON-LD -> microdata / OpenGraph
+    -> reglas DOM de la marca. Cada campo queda con el nombre del extractor que lo llenó.
+    Returns:
+        fields: dict con los campos de ModelData (None los que no se encontraron)
+        sources: dict campo -> origen (json_ld, microdata, opengraph, dom, derived)
+    """
+    fields = dict.fromkeys(MODEL_FIELDS)
+    sources = {}
+    if html:
+        extract_json_ld(html, fields, sources)
+        extract_microdata(html, fields, sources)
+        extract_dom_rules(html, brand, fields, sources)
+        derive_prices(fields, sources)
+    return fields, sources
+
+
+def missing_fields(fields: dict) -> list[str]:
+    return [field for field in REQUIRED_FIELDS if fields.get(field) in (None, [])]
+
+
+class ModelDataCache:
+    """ Respuestas del LLM por huella del contenido de la página: misma página, misma respuesta """
+
+    def __init__(self, root: Path | str | None = None):
+        self.root = Path(root or MODEL_DATA_CACHE_DIR)
+
+    def _path_for(self, fingerprint: str) -> Path:
+        return self.root / fingerprint[:2] / f"{fingerprint}.json"
+
+    def get(self, fingerprint: str | None) -> dict | None:
+        if not fingerprint:
+            return None
+        try:
+            return json.loads(self._path_for(fingerprint).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def set(self, fingerprint: str | None, payload: dict) -> None:
+        if not fingerprint:
+            return
+        path = self._path_for(fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
@@ -0,0 +1,345 @@
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (5, 20)
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+}
+# Respuestas transitorias que vale la pena reintentar
+RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+# El HttpClient del SDK de Firecrawl ya reintenta los errores de conexión, timeouts y 502: call_with_retries
+# solo reintenta lo que el SDK convierte en excepción sin reintentar, para no multiplicar intentos y créditos
+SDK_RETRIED_STATUS = frozenset({502})
+OUTER_RETRY_STATUS = RETRY_STATUS - SDK_RETRIED_STATUS
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Errores de la cuenta o de la petición: no dicen nada de la salud del sitio y no abren el circuito
+BREAKER_IGNORED_STATUS = frozenset({400, 401, 402})
+# Peticiones por segundo y ráfaga por host cuando ni la marca ni Firecrawl declaran un límite
+DEFAULT_HOST_RATE = (8.0, 16)
+FIRECRAWL_API_URL = "https://api.firecrawl.dev"
+# Límite del plan de Firecrawl (peticiones por minuto); se puede ajustar con FIRECRAWL_REQUESTS_PER_MINUTE
+FIRECRAWL_REQUESTS_PER_MINUTE = 100
+# Fallas seguidas de una marca que abren su circuito y segundos hasta el siguiente intento
+BREAKER_FAILURES = 5
+BREAKER_RESET = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """ Backoff exponencial con jitter completo: uniforme entre 0 y base * 2^intento (con tope) """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response) -> float | None:
+    """ Segundos que pide esperar el header Retry-After (en segundos o como fecha HTTP) """
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _host(url_or_host: str) -> str:
+    if "://" not in url_or_host:
+        return url_or_host.lower()
+    return (urlparse(url_or_host).hostname or "").lower()
+
+
+class TokenBucket:
+    """ Hasta `capacity` peticiones seguidas y luego `rate` por segundo """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """ Toma un token y devuelve cuánto hay que esperar para usarlo """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """ Frena el host (p. ej. tras un 429 con Retry-After) """
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Un token bucket por host. El límite de cada host sale de, en orden: set_limit (Firecrawl),
+    el "rate_limit" que declara la marca en brand.py ([peticiones por segundo, ráfaga]) o DEFAULT_HOST_RATE.
+    """
+
+    def __init__(self, default_rate: tuple[float, int] = DEFAULT_HOST_RATE):
+        self.default_rate = default_rate
+        self.limits: dict[str, tuple[float, int]] = {}
+        self.buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host: str, rate: float, burst: int) -> None:
+        host = _host(host)
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self.buckets.pop(host, None)
+
+    def _limit_for(self, host: str) -> tuple[float, int]:
+        if host in self.limits:
+            return self.limits[host]
+        from src.core.scraper.registry import get_brand, resolve_brand
+
+        brand = get_brand(resolve_brand(host) or "")
+        if brand and brand.get("rate_limit"):
+            rate, burst = brand["rate_limit"]
+            return float(rate), int(burst)
+        return self.default_rate
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        host = _host(url_or_host)
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            rate, burst = self._limit_for(host)
+            with self._lock:
+                bucket = self.buckets.setdefault(host, TokenBucket(rate, burst))
+        return bucket
+
+    def acquire(self, url_or_host: str) -> float:
+        return self.bucket(url_or_host).acquire()
+
+    def pause(self, url_or_host: str, seconds: float) -> None:
+        self.bucket(url_or_host).pause(seconds)
+
+
+class CircuitOpenError(RuntimeError):
+    """ La marca acumuló demasiadas fallas seguidas; no se le envían peticiones hasta que pase el reset """
+
+
+class CircuitBreaker:
+    """
+    Circuito por marca: tras `failure_threshold` fallas seguidas se abre y las peticiones fallan de
+    inmediato durante `reset_timeout` segundos. Luego deja pasar una de prueba (semiabierto): si
+    funciona se cierra, si falla vuelve a abrirse.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half_open" and self._trial):
+                raise CircuitOpenError(f"Circuito abierto para {self.name} ({self.failures} fallas seguidas)")
+            if state == "half_open":
+                self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release_trial(self) -> None:
+        """ La llamada de prueba terminó sin resultado (p. ej. se canceló): la siguiente vuelve a probar """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial:
+                    logger.warning("Circuito abierto para %s tras %d fallas", self.name, self.failures,
+                                   extra={"brand": self.name})
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_rate_limiter: RateLimiter | None = None
+_firecrawl_clients: dict[tuple, object] = {}
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _session_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def get_rate_limiter() -> RateLimiter:
+    """ Limitador compartido por todo el proceso; ya trae el límite del host de Firecrawl """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _session_lock:
+            if _rate_limiter is None:
+                limiter = RateLimiter()
+                per_minute = float(os.getenv("FIRECRAWL_REQUESTS_PER_MINUTE", FIRECRAWL_REQUESTS_PER_MINUTE))
+                limiter.set_limit(os.getenv("FIRECRAWL_API_URL") or FIRECRAWL_API_URL, per_minute / 60, max(1, int(per_minute // 10)))
+                _rate_limiter = limiter
+    return _rate_limiter
+
+
+def _status_of(exc: Exception) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_timeout(exc: Exception) -> bool:
+    """ La página no llegó a tiempo: timeout de lectura del cliente o 408 de Firecrawl (superó el timeout pedido) """
+    return isinstance(exc, requests.ReadTimeout) or _status_of(exc) == 408
+
+
+def call_with_retries(func, *args, host: str | None = None, breaker: str | None = None, retries: int = MAX_RETRIES, **kwargs):
+    """
+    Llama a func con el circuito `breaker` (normalmente la marca), el rate limit del host y
+    reintentos con backoff exponencial y jitter ante los status transitorios que el cliente no
+    reintenta por su cuenta (OUTER_RETRY_STATUS: 429, 5xx salvo 502). Los errores de conexión y
+    timeouts ya los reintenta el SDK de Firecrawl (o el Retry de urllib3 de get_session).
+    Un 429 frena además a todo el host por lo que pida Retry-After.
+    """
+    circuit = get_breaker(breaker) if breaker else None
+    if circuit is not None:
+        circuit.before_call()
+    limiter = get_rate_limiter()
+    outcome = None
+    try:
+        for attempt in range(retries + 1):
+            if host:
+                limiter.acquire(host)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                status = _status_of(exc)
+                if status not in OUTER_RETRY_STATUS or attempt == retries:
+                    # Los errores de la cuenta o de la petición no dicen nada de la salud del sitio
+                    outcome = "ok" if status in BREAKER_IGNORED_STATUS else "failure"
+                    raise
+                delay = retry_after_seconds(getattr(exc, "response", None))
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                elif host and status == 429:
+                    limiter.pause(host, delay)
+                logger.info("Reintento %d/%d en %.1fs (%s)", attempt + 1, retries, delay, status,
+                            extra={"breaker": breaker, "host": host})
+                time.sleep(delay)
+                continue
+            outcome = "ok"
+            return result
+    finally:
+        # El circuito se resuelve en toda salida: una llamada de prueba nunca queda pendiente
+        if circuit is not None:
+            if outcome == "ok":
+                circuit.record_success()
+            elif outcome == "failure":
+                circuit.record_failure()
+            else:
+                circuit.release_trial()
+
+
+class RateLimitedSession(requests.Session):
+    """ Session que pasa por el token bucket del host antes de cada petición """
+
+    def request(self, method, url, *args, **kwargs):
+        get_rate_limiter().acquire(url)
+        return super().request(method, url, *args, **kwargs)
+
+
+def get_session(pool_maxsize: int = 32) -> requests.Session:
+    """
+    Devuelve una sesión HTTP compartida por todo el proceso con conexiones keep-alive,
+    rate limit por host y reintentos con backoff y jitter (respeta Retry-After).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = RateLimitedSession()
+                retry = Retry(
+                    total=MAX_RETRIES,
+                    backoff_factor=BACKOFF_BASE,
+                    backoff_max=BACKOFF_MAX,
+                    backoff_jitter=BACKOFF_BASE,
+                    status_forcelist=RETRY_STATUS,
+                    respect_retry_after_header=True,
+                    # El llamador decide qué hacer con un status de error final (p. ej. 404 del prober)
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def get_firecrawl(api_key: str | None = None, api_url: str | None = None):
+    """ Cliente de Firecrawl compartido por todo el proceso (uno por api_key / api_url) """
+    api_key = api_key or os.getenv("FIRECRAWL_API_KEY")
+    # FIRECRAWL_API_URL permite apuntar a una instancia propia o a un servidor local de pruebas
+    api_url = api_url or os.getenv("FIRECRAWL_API_URL")
+    key = (api_key, api_url)
+    client = _firecrawl_clients.get(key)
+    if client is None:
+        with _session_lock:
+            client = _firecrawl_clients.get(key)
+            if client is None:
+                # Import diferido: el SDK de Firecrawl solo se carga cuando se crea el cliente
+                from firecrawl import Firecrawl
+
+                client = Firecrawl(api_key=api_key, api_url=api_url) if api_url else Firecrawl(api_key=api_key)
+                _firecrawl_clients[key] = client
+    return client
+
+
+def firecrawl_host() -> str:
+    return _host(os.getenv("FIRECRAWL_API_URL") or FIRECRAWL_API_URL)
@@ -1,8 +1,20 @@
 # No parece usarse
 
 from typing import Any
+from urllib.parse import urljoin
+import codecs
 import re
 
+def get_document_source_url(doc: Any) -> str | None:
+    """ Obtiene la URL original de un Document (metadata.source_url o metadata.url) """
+    metadata = getattr(doc, "metadata", None)
+    if metadata is None:
+        return None
+    if isinstance(metadata, dict):
+        return metadata.get("sourceURL") or metadata.get("source_url") or metadata.get("url")
+    return getattr(metadata, "source_url", None) or getattr(metadata, "url", None)
+
+
 def get_urls_from_firecrawl_map(url_list: Any):
     """ Obtiene las URLs de un sitio web desde la respuesta de Firecrawl """
     links = getattr(url_list, "links", []) or []
@@ -10,49 +22,119 @@ def get_urls_from_firecrawl_map(url_list: Any):
     return [tupla[0] for tupla in tuplas_urls]
 
 
-def extract_image_urls_from_html(html: str) -> list:
-    """ Extrae URLs de imágenes desde HTML sin depender de clases específicas """
-    if not html:
-        return []
+# Un solo patrón para las tres formas: <img ...>, srcset="..." (p. ej. en <source>) y url(...)
+_IMAGE_TOKEN_PATTERN = re.compile(
+    r"<img\b(?P<img>[^>]*)>"
+    r"|srcset\s*=\s*['\"](?P<srcset>[^'\"]+)['\"]"
+    r"|url\((?P<css>[^)]+)\)",
+    re.IGNORECASE,
+)
+# comentario en español: src / data-src / data-lazy-src / data-original / srcset dentro del <img>
+_IMG_ATTR_PATTERN = re.compile(
+    r"(?<![\w-])(src|data-src|data-lazy-src|data-original|srcset)\s*=\s*['\"]([^'\"]+)['\"]",
+    re.IGNORECASE,
+)
+_NON_IMAGE_EXTENSIONS = {"js", "css", "woff", "woff2", "ttf", "eot", "map"}
+
+
+def _split_srcset(srcset: str):
+    # comentario en español: srcset con multiples URLs
+    for part in srcset.split(","):
+        yield part.strip().split(" ")[0]
+
+
+def _is_non_image_resource(candidate: str) -> bool:
+    # comentario en español: evitar recursos no imagen en url(...)
+    path = candidate.split("?", 1)[0].split("#", 1)[0]
+    return path.rsplit(".", 1)[-1].lower() in _NON_IMAGE_EXTENSIONS if "." in path else False
+
 
-    urls = []
-    seen = set()
+class ImageUrlExtractor:
+    """
+    Extrae URLs de imágenes en una sola pasada. Acepta el HTML por partes (feed) para
+    empezar a entregar URLs mientras el documento todavía se está recibiendo.
+    Las URLs salen en el orden en que aparecen, sin repetir, y se resuelven contra base_url.
+    """
 
-    def add_url(url: str):
+    def __init__(self, base_url: str | None = None, max_token_size: int = 64 * 1024):
+        self.base_url = base_url
+        self.max_token_size = max_token_size
+        self._buffer = ""
+        self._seen = set()
+        self._last_end = 0
+
+    def _accept(self, url: str):
         if not url:
-            return
+            return None
         cleaned = url.strip().strip("\"'")
         if not cleaned or cleaned.startswith("data:"):
-            return
-        if cleaned in seen:
-            return
-        seen.add(cleaned)
-        urls.append(cleaned)
-
-    # comentario en español: src / data-src / data-lazy-src / data-original
-    img_src_pattern = re.compile(
-        r"<img[^>]+(?:src|data-src|data-lazy-src|data-original)\s*=\s*['\"]([^'\"]+)['\"]",
-        re.IGNORECASE,
-    )
-    for match in img_src_pattern.findall(html):
-        add_url(match)
+            return None
+        if self.base_url:
+            cleaned = urljoin(self.base_url, cleaned)
+        if cleaned in self._seen:
+            return None
+        self._seen.add(cleaned)
+        return cleaned
 
-    # comentario en español: srcset con multiples URLs
-    srcset_pattern = re.compile(
-        r"srcset\s*=\s*['\"]([^'\"]+)['\"]", re.IGNORECASE
-    )
-    for srcset in srcset_pattern.findall(html):
-        for part in srcset.split(","):
-            candidate = part.strip().split(" ")[0]
-            add_url(candidate)
-
-    # comentario en español: background-image en estilos inline o bloques
-    url_pattern = re.compile(r"url\(([^)]+)\)", re.IGNORECASE)
-    for match in url_pattern.findall(html):
-        candidate = match.strip().strip("\"'")
-        # comentario en español: evitar recursos no imagen
-        if re.search(r"\.(js|css|woff2?|ttf|eot|map)(\?|#|$)", candidate, re.IGNORECASE):
-            continue
-        add_url(candidate)
-
-    return urls
\ No newline at end of file
+    def _scan(self, text: str):
+        last_end = 0
+        for match in _IMAGE_TOKEN_PATTERN.finditer(text):
+            last_end = match.end()
+            if match.group("img") is not None:
+                for attr, value in _IMG_ATTR_PATTERN.findall(match.group("img")):
+                    candidates = _split_srcset(value) if attr.lower() == "srcset" else (value,)
+                    for candidate in candidates:
+                        url = self._accept(candidate)
+                        if url:
+                            yield url
+            elif match.group("srcset") is not None:
+                for candidate in _split_srcset(match.group("srcset")):
+                    url = self._accept(candidate)
+                    if url:
+                        yield url
+            else:
+                # En estilos inline las comillas suelen venir escapadas como &quot;
+                candidate = match.group("css").replace("&quot;", "").replace("&#39;", "").strip().strip("\"'")
+                if _is_non_image_resource(candidate):
+                    continue
+                url = self._accept(candidate)
+                if url:
+                    yield url
+        self._last_end = last_end
+
+    def feed(self, chunk: str):
+        """ Agrega una parte del HTML y entrega las URLs que ya se pueden resolver """
+        buffer = self._buffer + chunk
+        # Un tag sin cerrar al final puede completarse con la siguiente parte: se deja para después
+        cut = buffer.rfind("<")
+        if cut == -1 or buffer.find(">", cut) != -1 or len(buffer) - cut > self.max_token_size:
+            cut = len(buffer)
+        yield from self._scan(buffer[:cut])
+        keep_from = min(cut, max(self._last_end, len(buffer) - self.max_token_size))
+        self._buffer = buffer[keep_from:]
+
+    def close(self):
+        """ Procesa lo que quedó pendiente al terminar el documento """
+        buffer, self._buffer = self._buffer, ""
+        yield from self._scan(buffer)
+
+
+def iter_image_urls(html, base_url: str | None = None):
+    """ Genera URLs de imágenes desde un str de HTML o un iterable de partes (str o bytes) """
+    if not html:
+        return
+    extractor = ImageUrlExtractor(base_url=base_url)
+    # Decodificador incremental: un carácter multibyte puede quedar partido entre dos partes
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = (html,) if isinstance(html, str) else html
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield from extractor.feed(chunk)
+    yield from extractor.feed(decoder.decode(b"", final=True))
+    yield from extractor.close()
+
+
+def extract_image_urls_from_html(html: str, base_url: str | None = None) -> list:
+    """ Extrae URLs de imágenes desde HTML sin depender de clases específicas """
+    return list(iter_image_urls(html, base_url=base_url))
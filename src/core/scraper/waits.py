@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from src.config.settings import CACHE_DIR
+
+WAITS_PATH = CACHE_DIR / "waits.json"
+# Límites superiores (ms) de los buckets del histograma de latencia de render por marca
+LATENCY_BUCKETS = (500, 1000, 1500, 2000, 3000, 5000, 8000, 13000, 20000, 30000, 45000, 60000)
+# Timeout de Firecrawl (ms) mientras una marca no tiene suficientes muestras
+DEFAULT_TIMEOUT_MS = 30000
+MIN_TIMEOUT_MS = 5000
+MAX_TIMEOUT_MS = 60000
+MIN_SAMPLES = 10
+# Margen sobre el p95 observado
+TIMEOUT_FACTOR = 1.5
+# Cada muestra nueva pesa más que las viejas: el histograma sigue los cambios del sitio
+DECAY = 0.98
+# Peso acumulado de MIN_SAMPLES muestras con decaimiento (serie geométrica)
+_MIN_WEIGHT = (1 - DECAY ** MIN_SAMPLES) / (1 - DECAY)
+# wait_for de las peticiones que no declaran condición de listo (comportamiento anterior)
+DEFAULT_WAIT_FOR = 1200
+# Tiempo (ms) sin cambios que se considera "estable" y tope de espera para las condiciones por conteo
+STABLE_WINDOW_MS = 500
+STABLE_MAX_MS = 8000
+
+_STABLE_SCRIPT = """
+(async () => {{
+  const count = () => {measure};
+  const start = Date.now();
+  let last = count(), since = Date.now();
+  while (Date.now() - start < {max_ms}) {{
+    await new Promise(resolve => setTimeout(resolve, 100));
+    const current = count();
+    if (current !== last) {{ last = current; since = Date.now(); }}
+    else if (current >= {minimum} && Date.now() - since >= {window_ms}) break;
+  }}
+  return last;
+}})()
+"""
+_MEASURES = {
+    "images_stable": "document.querySelectorAll('img[src], img[srcset], source[srcset]').length",
+    "dom_stable": "document.body ? document.body.innerHTML.length : 0",
+}
+
+
+def _stable_action(kind: str, minimum: int = 1, max_ms: int = STABLE_MAX_MS) -> dict:
+    script = _STABLE_SCRIPT.format(measure=_MEASURES[kind], minimum=minimum, max_ms=max_ms, window_ms=STABLE_WINDOW_MS)
+    return {"type": "executeJavascript", "script": script.strip()}
+
+
+def readiness_actions(ready: list) -> list[dict]:
+    """
+    Convierte las condiciones de listo que declara la marca en acciones de Firecrawl:
+    - "div#specs" o {"selector": "div#specs"}: espera a que aparezca el selector
+    - {"images_stable": 3}: espera a que haya al menos 3 imágenes y el conteo deje de cambiar
+    - {"dom_stable": true}: espera a que el HTML deje de crecer (contenido lazy tras un scroll)
+    """
+    actions = []
+    for condition in ready or []:
+        if isinstance(condition, str):
+            condition = {"selector": condition}
+        if "selector" in condition:
+            actions.append({"type": "wait", "selector": condition["selector"]})
+        for kind in _MEASURES:
+            if condition.get(kind):
+                minimum = condition[kind] if isinstance(condition[kind], int) and condition[kind] is not True else 1
+                actions.append(_stable_action(kind, minimum))
+    return actions
+
+
+class WaitTuner:
+    """
+    Histograma de la latencia de render observada por marca. El timeout de cada petición sale
+    del p95 (con margen) en lugar de un valor fijo: las marcas rápidas dejan de pagar la espera del
+    peor caso y las lentas, cuyas peticiones vencen, suben su timeout en las siguientes corridas.
+    """
+
+    def __init__(self, path: Path | str | None = None, save_interval: float = 5.0):
+        self.path = Path(path or WAITS_PATH)
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self.histograms = self._load()
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        # Si cambiaron los buckets, el histograma guardado ya no sirve
+        return {brand: counts for brand, counts in data.items() if len(counts) == len(LATENCY_BUCKETS)}
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(self.histograms), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._last_save = time.time()
+
+    def record(self, brand: str | None, latency_ms: float) -> None:
+        """ Agrega una muestra; una petición que venció se registra con el timeout usado """
+        brand = brand or "default"
+        bucket = next((idx for idx, bound in enumerate(LATENCY_BUCKETS) if latency_ms <= bound), len(LATENCY_BUCKETS) - 1)
+        with self._lock:
+            counts = self.histograms.setdefault(brand, [0.0] * len(LATENCY_BUCKETS))
+            for idx in range(len(counts)):
+                counts[idx] *= DECAY
+            counts[bucket] += 1
+            should_save = time.time() - self._last_save >= self.save_interval
+        if should_save:
+            self.save()
+
+    def percentile(self, brand: str | None, quantile: float) -> int | None:
+        counts = self.histograms.get(brand or "default")
+        if not counts or sum(counts) < _MIN_WEIGHT - 1e-9:
+            return None
+        target = sum(counts) * quantile
+        cumulative = 0.0
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def timeout_for(self, brand: str | None) -> int:
+        """ Timeout (ms) para la próxima petición de la marca """
+        p95 = self.percentile(brand, 0.95)
+        if p95 is None:
+            return DEFAULT_TIMEOUT_MS
+        return int(min(MAX_TIMEOUT_MS, max(MIN_TIMEOUT_MS, p95 * TIMEOUT_FACTOR)))
+
+    def stats(self) -> dict:
+        return {
+            brand: {"p50": self.percentile(brand, 0.5), "p95": self.percentile(brand, 0.95), "timeout": self.timeout_for(brand)}
+            for brand in self.histograms
+        }
+
+
+_tuner: WaitTuner | None = None
+_tuner_lock = threading.Lock()
+
+
+def get_wait_tuner() -> WaitTuner:
+    """ Tuner compartido por todo el proceso """
+    global _tuner
+    if _tuner is None:
+        with _tuner_lock:
+            if _tuner is None:
+                _tuner = WaitTuner()
+    return _tuner
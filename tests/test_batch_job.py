@@ -0,0 +1,106 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.core.scraper.app import ScrapingUtils
+from src.core.scraper.batch_job import FirecrawlBatchJob
+
+JOB_ID = "job-1"
+PAGE_SIZE = 2
+URLS = [f"https://www.italika.mx/moto-{idx}" for idx in range(5)]
+
+
+class FakeFirecrawl(BaseHTTPRequestHandler):
+    """
+    Servidor de prueba con la forma de /v2/batch/scrape: cada consulta de estado deja listos
+    PAGE_SIZE Documents más y entrega páginas de PAGE_SIZE desde ?skip=
+    """
+
+    state: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: dict) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.state["submits"] += 1
+        self._send({"success": True, "id": JOB_ID, "url": f"{self.state['base']}/v2/batch/scrape/{JOB_ID}"})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        skip = int(parse_qs(parsed.query).get("skip", ["0"])[0])
+        self.state["skips"].append(skip)
+        self.state["ready"] = min(len(URLS), self.state["ready"] + PAGE_SIZE)
+        end = min(self.state["ready"], skip + PAGE_SIZE)
+        data = [{"markdown": f"# {url}", "metadata": {"sourceURL": url, "statusCode": 200}} for url in URLS[skip:end]]
+        done = self.state["ready"] == len(URLS)
+        more = end < self.state["ready"]
+        self._send({
+            "success": True,
+            "status": "completed" if done else "scraping",
+            "completed": self.state["ready"],
+            "total": len(URLS),
+            "creditsUsed": self.state["ready"],
+            "next": f"{self.state['base']}/v2/batch/scrape/{JOB_ID}?skip={end}" if more else None,
+            "data": data,
+        })
+
+
+@pytest.fixture
+def firecrawl_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeFirecrawl)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    FakeFirecrawl.state = {"base": base, "submits": 0, "skips": [], "ready": 0}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("FIRECRAWL_API_URL", base)
+    monkeypatch.setenv("FIRECRAWL_API_KEY", "fc-test")
+    yield FakeFirecrawl.state
+    server.shutdown()
+    server.server_close()
+
+
+def _job(tmp_path) -> FirecrawlBatchJob:
+    return FirecrawlBatchJob(ScrapingUtils(use_cache=False), "italika", state_dir=tmp_path,
+                             poll_interval=0.01, max_poll_interval=0.02)
+
+
+def test_batch_job_pages_by_skip(firecrawl_server, tmp_path):
+    job = _job(tmp_path)
+    received = [url for url, _ in job.run(URLS, formats=["markdown"])]
+
+    assert received == URLS
+    assert job.missing == []
+    assert firecrawl_server["submits"] == 1
+    # Cada poll pide desde el último Document leído, nunca el job completo otra vez
+    assert firecrawl_server["skips"] == [0, 2, 4]
+    assert not job.state_path.exists()
+
+
+def test_batch_job_resumes_from_state_file(firecrawl_server, tmp_path):
+    first = _job(tmp_path).run(URLS, formats=["markdown"])
+    assert [next(first)[0], next(first)[0]] == URLS[:2]
+    # Corte después de entregar el segundo Document, antes de confirmarlo en el estado
+    first.close()
+    state = json.loads((tmp_path / "italika.json").read_text(encoding="utf-8"))
+    assert state["job_id"] == JOB_ID
+    assert state["processed"] == URLS[:1]
+
+    job = _job(tmp_path)
+    received = [url for url, _ in job.run(URLS, formats=["markdown"])]
+
+    assert received == URLS[1:]
+    assert firecrawl_server["submits"] == 1
+    assert firecrawl_server["skips"][1] == state["offset"]
+    assert not job.state_path.exists()
@@ -0,0 +1,54 @@
+from src.core.scraper.structured_data import MODEL_FIELDS, extract_microdata, extract_model_fields
+
+BREADCRUMB = """
+<ol itemscope itemtype="https://schema.org/BreadcrumbList">
+  <li itemprop="itemListElement" itemscope itemtype="https://schema.org/ListItem">
+    <a itemprop="item" href="/"><span itemprop="name">Inicio</span></a>
+    <meta itemprop="position" content="1">
+  </li>
+  <li itemprop="itemListElement" itemscope itemtype="https://schema.org/ListItem">
+    <a itemprop="item" href="/motos"><span itemprop="name">Motos</span></a>
+    <meta itemprop="position" content="2">
+  </li>
+</ol>
+"""
+
+PRODUCT = """
+<div itemscope itemtype="http://schema.org/Product">
+  <h1 itemprop="name">FT150 Sport</h1>
+  <div itemprop="brand" itemscope itemtype="http://schema.org/Brand"><span itemprop="name">Italika</span></div>
+  <span itemprop="color">Rojo, Negro</span>
+  <div itemprop="offers" itemscope itemtype="http://schema.org/Offer">
+    <meta itemprop="priceCurrency" content="MXN">
+    <span itemprop="price" content="25999.00">$25,999.00</span>
+  </div>
+</div>
+"""
+
+
+def _microdata(html: str) -> tuple[dict, dict]:
+    fields, sources = dict.fromkeys(MODEL_FIELDS), {}
+    extract_microdata(html, fields, sources)
+    return fields, sources
+
+
+def test_breadcrumb_before_product_does_not_set_model():
+    fields, sources = _microdata(BREADCRUMB + PRODUCT)
+    assert fields["model"] == "FT150 Sport"
+    assert fields["net_price"] == 25999
+    assert fields["colors"] == ["Rojo", "Negro"]
+    assert sources["model"] == "microdata"
+
+
+def test_breadcrumb_without_product_leaves_model_for_the_llm():
+    html = BREADCRUMB + '<meta name="description" content="Motos"><input name="q" value="x"><span itemprop="price">25,999</span>'
+    fields, _ = _microdata(html)
+    assert fields["model"] is None
+    assert fields["net_price"] is None
+
+
+def test_opengraph_title_fills_model_when_there_is_no_product():
+    html = BREADCRUMB + '<meta property="og:title" content="Moto FT150 | Italika"><meta name="title" content="Inicio">'
+    fields, sources = extract_model_fields(html)
+    assert fields["model"] == "Moto FT150"
+    assert sources["model"] == "opengraph"